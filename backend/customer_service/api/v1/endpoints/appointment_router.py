@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -10,6 +10,7 @@ from schemas.appointment import (
     AppointmentCreate, AppointmentUpdate, AppointmentResponse, AppointmentStatusEnum
 )
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
 from .url import URLS
 
 
@@ -71,21 +72,30 @@ async def get_appointments_by_date_range(
     return appointments
 
 @router.get(URLS['APPOINTMENT']['GET_ALL'], response_model=List[AppointmentResponse])
-async def get_all_appointments(db: AsyncSession = Depends(get_db)):
+async def get_all_appointments(
+    response: Response,
+    skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
+    limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Lấy danh sách tất cả lịch hẹn.
     
     - Trả về danh sách các lịch hẹn trong cơ sở dữ liệu.
     """
-    appointments = await appointment_crud.get_all_appointments(db)
+    appointments = await appointment_crud.get_all_appointments(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, appointments, limit, "appointment_id")
     logger.info("Fetched all appointments successfully")
 
     return appointments
 
 @router.get(URLS['APPOINTMENT']['FILTER'], response_model=List[AppointmentResponse])
 async def get_appointments_(
+    response: Response,
     skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
     limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     customer_id: Optional[int] = Query(None, description="Lọc theo ID khách hàng"),
     status: Optional[AppointmentStatusEnum] = Query(None, description="Lọc theo trạng thái"),
     start_date: Optional[datetime] = Query(None, description="Ngày bắt đầu"),
@@ -96,7 +106,7 @@ async def get_appointments_(
     Lấy danh sách lịch hẹn với các tùy chọn lọc.
     
     - Có thể lọc theo ID khách hàng, trạng thái, hoặc khoảng thời gian.
-    - Có thể phân trang kết quả với tham số skip và limit.
+    - Có thể phân trang kết quả với tham số skip và limit, hoặc after (cursor) và limit.
     """
     # if customer_id is not None:
     #     appointments = await appointment_crud.get_appointments_by_customer(
@@ -114,8 +124,9 @@ async def get_appointments_(
     #     if status is not None:
     #         appointments = [a for a in appointments if a.status == status.value]
     appointments = await appointment_crud.get_appointment_with_filter(
-        db, skip=skip, limit=limit, customer_id=customer_id, status=status, start_date=start_date, end_date=end_date
+        db, skip=skip, limit=limit, after=after, customer_id=customer_id, status=status, start_date=start_date, end_date=end_date
     )
+    set_next_cursor(response, appointments, limit, "appointment_id")
 
     logger.info("Fetched appointments with filters successfully")
 
@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 
 from db.session import get_db
 from crud import customer as customer_crud
-from schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse, CustomerResponseWithMotocycles, CustomerLogin
+from schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse, CustomerResponseWithMotocycles, CustomerCheckInResponse, CustomerLogin
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
 from .url import URLS
 
 
@@ -36,12 +37,15 @@ async def create_customer(customer_data: CustomerCreate, db: AsyncSession = Depe
 
 @router.get(URLS['CUSTOMER']['GET_ALL_CUSTOMERS'], response_model=List[CustomerResponse])
 async def read_customers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)
 ):
     """Lấy danh sách khách hàng với phân trang"""
-    customers = await customer_crud.get_all_customers(db, skip=skip, limit=limit)
+    customers = await customer_crud.get_all_customers(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, customers, limit, "customer_id")
     return customers
 
 @router.get(URLS['CUSTOMER']['GET_CUSTOMER_BY_ID'], response_model=CustomerResponse)
@@ -85,6 +89,23 @@ async def get_customer_with_motorcycles(
     logger.info(f"Lấy thành công thông tin xe máy cho khách hàng: {customer.fullname}")
     return CustomerResponseWithMotocycles.from_orm(customer)
 
+@router.get(URLS['CUSTOMER']['GET_CUSTOMER_CHECK_IN'], response_model=CustomerCheckInResponse)
+async def get_customer_check_in(
+    phone_num: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Tiếp nhận khách tại quầy: thông tin khách hàng, xe máy, phiếu tiếp nhận chưa trả xe
+    và lịch hẹn hôm nay trong một request
+    """
+    customer = await customer_crud.get_customer_check_in(db, phone_num)
+    if customer is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Không tìm thấy khách hàng với số điện thoại này"
+        )
+    return CustomerCheckInResponse.model_validate(customer)
+
 # @router.put(URLS['CUSTOMER']['UPDATE_CUSTOMER'], response_model=CustomerResponse)
 # async def update_customer(
 #     customer_id: int,
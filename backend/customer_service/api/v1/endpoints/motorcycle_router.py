@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -9,6 +10,11 @@ from crud import motorcycle as motorcycle_crud
 from schemas.motocycle_type import MotocycleTypeResponse
 from schemas.motocycle import MotocycleResponse, MotocycleCreate, MotocycleUpdate
 from utils.logger import get_logger
+from utils.etag import check_not_modified
+from utils.responses import list_response
+from utils.pagination import set_next_cursor
+from utils.export import ExportFormat, export_response
+from models.models import MotocycleType
 from .url import URLS
 
 logger = get_logger(__name__)
@@ -25,8 +31,12 @@ async def get_all_motorcycle_by_customer_id(
     return db_motorcycles
 
 @router.get(URLS['MOTORCYCLE']['GET_ALL_MOTORCYCLE_TYPES'], response_model=List[MotocycleTypeResponse])
-async def get_all_motorcycle_types(db: AsyncSession = Depends(get_db)):
+async def get_all_motorcycle_types(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Lấy danh sách tất cả loại xe máy."""
+    # Bảng loại xe chỉ được sửa trực tiếp trong CSDL, ETag đổi theo mốc ETAG_TTL
+    not_modified = check_not_modified(request, response, MotocycleType.__tablename__)
+    if not_modified:
+        return not_modified
     try:
         motorcycle_types = await motorcycle_type_crud.get_all_motorcycle_types(db)
         if not motorcycle_types:
@@ -39,19 +49,48 @@ async def get_all_motorcycle_types(db: AsyncSession = Depends(get_db)):
             detail="Lỗi hệ thống khi lấy danh sách loại xe máy"
         )
 @router.get(URLS['MOTORCYCLE']['GET_ALL_MOTORCYCLES'], response_model=List[MotocycleResponse])
-async def get_all_motorcycle(db: AsyncSession = Depends(get_db)):
-    """Lấy danh sách tất cả xe máy."""
+async def get_all_motorcycle(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    customer_id: Optional[int] = Query(None, description="Lọc theo chủ xe"),
+    moto_type_id: Optional[int] = Query(None, description="Lọc theo loại xe"),
+    brand: Optional[str] = Query(None, max_length=50, description="Lọc theo hãng xe"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Lấy danh sách xe máy theo bộ lọc, có phân trang; lấy toàn bộ dùng /motorcycles/export."""
     try:
-        motorcycles = await motorcycle_crud.get_all_motorcycles(db)
-        if not motorcycles:
-            return []
-        return [MotocycleResponse.from_orm(motorcycle) for motorcycle in motorcycles]
+        motorcycles = await motorcycle_crud.get_all_motorcycles(
+            db, skip=skip, limit=limit, after=after,
+            customer_id=customer_id, moto_type_id=moto_type_id, brand=brand,
+        )
+        set_next_cursor(response, motorcycles, limit, "motocycle_id")
+        return list_response(motorcycles, MotocycleResponse, response)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Lỗi khi lấy thông tin xe máy: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Lỗi hệ thống khi lấy danh sách xe máy"
         )
+
+@router.get(URLS['MOTORCYCLE']['EXPORT'], response_class=StreamingResponse)
+async def export_motorcycles(
+    customer_id: Optional[int] = Query(None, description="Lọc theo chủ xe"),
+    moto_type_id: Optional[int] = Query(None, description="Lọc theo loại xe"),
+    brand: Optional[str] = Query(None, max_length=50, description="Lọc theo hãng xe"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv hoặc ndjson")
+):
+    """Xuất toàn bộ xe máy theo bộ lọc, gửi dần từng phần thay vì dựng cả danh sách trong bộ nhớ."""
+    return export_response(
+        motorcycle_crud.export_motorcycles_query(customer_id, moto_type_id, brand),
+        MotocycleResponse,
+        format,
+        "motorcycles",
+    )
+
 @router.get(URLS['MOTORCYCLE']['GET_MOTORCYCLE_BY_ID'], response_model=MotocycleResponse)
 async def get_motorcycle_by_id(
     motorcycle_id: int,
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -10,6 +11,9 @@ from schemas.reception_from import ReceptionFormCreate, ReceptionFormCreate2, Re
 from schemas.reception_image import ReceptionImageCreate, ReceptionImageResponse
 from db.session import get_db
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.responses import list_response
+from utils.export import ExportFormat, export_response
 from .url import URLS
 
 router = APIRouter()
@@ -25,10 +29,9 @@ async def create_reception_form(
     Tạo một biểu mẫu tiếp nhận mới.
     """
     try:
-        db_reception_form = await reception_crud.create_reception_form(db, reception_form)
-        # Tải trước dữ liệu liên quan
-        db_reception_form = await reception_crud.get_reception_form_by_id(db, db_reception_form.form_id)
-        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form.reception_images}")
+        # Kết quả được dựng sẵn từ dữ liệu vừa chèn, không cần truy vấn lại
+        db_reception_form = await reception_crud.create_reception_form_fast(db, reception_form)
+        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form.form_id}")
         
         return db_reception_form
     except Exception as e:
@@ -49,9 +52,7 @@ async def create_reception_form_without_motorcycle_id(
     try:
         # Tạo một biểu mẫu tiếp nhận mới
         db_reception_form = await reception_crud.create_reception_form_without_motorcycle_id(db, reception_form)
-        # Tải trước dữ liệu liên quan
-        db_reception_form = await reception_crud.get_reception_form_by_id(db, db_reception_form.form_id)
-        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form.reception_images}")
+        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form.form_id}")
         
         return db_reception_form
     except Exception as e:
@@ -72,11 +73,8 @@ async def create_reception_form_without_customer_id_and_without_motorcycle_id(
     """
     try:
         # Tạo một biểu mẫu tiếp nhận mới
-        db_reception_form_new = await reception_crud.create_reception_form_without_customer_id_and_without_motorcycle_id(db, reception_form)
-        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form_new.form_id}")
-        
-        # Tải thêm dữ liệu ảnh liên quan
-        db_reception_form = await reception_crud.get_reception_form_by_id(db, db_reception_form_new.form_id)
+        db_reception_form = await reception_crud.create_reception_form_without_customer_id_and_without_motorcycle_id(db, reception_form)
+        logger.info(f"Tạo biểu mẫu tiếp nhận thành công với ID: {db_reception_form.form_id}")
 
         return db_reception_form
     except Exception as e:
@@ -88,16 +86,20 @@ async def create_reception_form_without_customer_id_and_without_motorcycle_id(
 
 @router.get(URLS['RECEPTION']['GET_ALL'], response_model=List[ReceptionFormResponse])
 async def get_all_reception_forms(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
         Lấy danh sách tất cả biểu mẫu tiếp nhận.
     """
 
-    db_reception_forms = await reception_crud.get_all_reception_forms(db, skip, limit)
-    return db_reception_forms
+    db_reception_forms = await reception_crud.get_all_reception_forms(db, skip, limit, after)
+    set_next_cursor(response, db_reception_forms, limit, "form_id")
+    # Danh sách kèm ảnh có thể lớn, dựng JSON trực tiếp từ các dòng thay cho from_orm từng dòng
+    return list_response(db_reception_forms, ReceptionFormResponse, response)
 
 @router.get(URLS['RECEPTION']['GET_ALL_TODAY'], response_model=List[ReceptionFormResponse])
 async def get_all_reception_forms_today(
@@ -107,7 +109,7 @@ async def get_all_reception_forms_today(
         Lấy danh sách tất cả biểu mẫu tiếp nhận trong ngày hôm nay.
     """
     db_reception_forms = await reception_crud.get_reception_form_today(db)
-    return db_reception_forms
+    return list_response(db_reception_forms, ReceptionFormResponse)
 
 @router.get(URLS['RECEPTION']['GET_RECEPTION_BY_ID'], response_model=ReceptionFormResponse)
 async def get_reception_form(
@@ -131,7 +133,7 @@ async def get_reception_form_by_motorcycle_id(
     Lấy danh sách biểu mẫu tiếp nhận theo ID xe máy.
     """
     db_reception_forms = await reception_crud.get_reception_form_by_motorcycle_id(db, motocycle_id)
-    return db_reception_forms
+    return list_response(db_reception_forms, ReceptionFormResponse)
 
 @router.get(URLS['RECEPTION']['GET_RECEPTION_BY_DATE_RANGE'], response_model=List[ReceptionFormResponse])
 async def get_reception_form_by_date_range(
@@ -143,7 +145,28 @@ async def get_reception_form_by_date_range(
     Lấy danh sách biểu mẫu tiếp nhận theo khoảng thời gian.
     """
     db_reception_forms = await reception_crud.get_reception_form_by_range_date(db, start_date, end_date)
-    return db_reception_forms
+    return list_response(db_reception_forms, ReceptionFormResponse)
+
+@router.get(URLS['RECEPTION']['EXPORT'], response_class=StreamingResponse)
+async def export_reception_forms(
+    start_date: datetime = Query(..., description="Ngày bắt đầu (bao gồm)"),
+    end_date: datetime = Query(..., description="Ngày kết thúc (bao gồm)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv hoặc ndjson")
+):
+    """
+    Xuất toàn bộ biểu mẫu tiếp nhận kèm ảnh trong khoảng thời gian, gửi dần từng phần.
+    Với CSV, danh sách ảnh nằm trong một ô dạng JSON.
+    """
+    if start_date >= end_date:
+        raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
+    filename = f"receptions_{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+    return export_response(
+        reception_crud.export_reception_forms_query(start_date, end_date),
+        ReceptionFormResponse,
+        format,
+        filename,
+        extend=reception_crud.attach_reception_images,
+    )
 
 
 # @router.get("/", response_model=List[ReceptionFormResponse])
@@ -0,0 +1,31 @@
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from schemas.search import SearchResponse
+from utils.auth import get_current_staff
+from utils.logger import get_logger
+from utils.search_index import get_search_index
+from .url import URLS
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(URLS['SEARCH']['SEARCH'], response_model=SearchResponse)
+async def search_customers(
+    q: str = Query(..., min_length=1, max_length=100, description="Một phần họ tên (có dấu hoặc không), số điện thoại hoặc biển số"),
+    limit: int = Query(10, ge=1, le=50),
+    current_staff: dict = Depends(get_current_staff),
+):
+    """Tìm khách hàng theo họ tên, số điện thoại hoặc biển số xe, không truy vấn cơ sở dữ liệu"""
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Chỉ mục tìm kiếm đang được xây dựng, vui lòng thử lại sau"
+        )
+    started = time.perf_counter()
+    results = index.search(q, limit)
+    return {"query": q, "took_ms": round((time.perf_counter() - started) * 1000, 3), "results": results}
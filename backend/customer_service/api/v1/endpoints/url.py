@@ -8,11 +8,13 @@ URLS = {
         # 'UPDATE_CUSTOMER': '/customer/update/{customer_id}', # completed
         # 'DELETE_CUSTOMER': '/customer/delete/{customer_id}', # completed
         'GET_CUSTOMER_WITH_MOTORCYCLES': '/customer/phone/{phone_num}/with-motorcycles', # completed
+        'GET_CUSTOMER_CHECK_IN': '/customer/phone/{phone_num}/check-in',
     },
     'MOTORCYCLE': {
         'GET_ALL_MOTORCYCLE_BY_CUSTOMER_ID': 'motorcycle/customer/{customer_id}', # completed
         'GET_ALL_MOTORCYCLE_TYPES': '/motorcycle/types', # completed
         'GET_ALL_MOTORCYCLES': '/motorcycles', # completed
+        'EXPORT': '/motorcycles/export',
         'GET_MOTORCYCLE_BY_ID': '/motorcycle/{motorcycle_id}', # completed
         'CREATE_MOTORCYCLE': '/motorcycle/create', # completed
         # 'UPDATE_MOTORCYCLE': '/motorcycle/update/{motorcycle_id}', # completed
@@ -39,7 +41,19 @@ URLS = {
         'GET_RECEPTION_BY_CUSTOMER_ID': '/reception/customer/{customer_id}', 
         'GET_RECEPTION_BY_MOTORCYCLE_ID': '/reception/motorcycle/{motocycle_id}', 
         'GET_RECEPTION_BY_DATE_RANGE': '/receptions/date-range', # completed
+        'EXPORT': '/receptions/export',
         'UPDATE': '/reception/update/{form_id}', # completed
         'UPDATE_RETURN': '/reception/{form_id}/return', # completed
     },
+    'SEARCH': {
+        'SEARCH': '/search',
+    },
+    'EVENTS': {
+        'STREAM': '/events/stream',
+    },
+    'MONITORING': {
+        'DB_POOL': '/monitoring/db-pool',
+        'METRICS': '/metrics',
+        'SLOW_QUERIES': '/monitoring/slow-queries',
+    },
 }
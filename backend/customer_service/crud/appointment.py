@@ -7,6 +7,8 @@ from typing import List, Optional, Union, Dict, Any
 from fastapi import HTTPException, status
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.events import publish_event
 from models.models import Appointment, Customer
 from schemas.appointment import AppointmentCreate, AppointmentUpdate, AppointmentStatusEnum, AppointmentResponse
 
@@ -34,6 +36,7 @@ async def create_appointment(db: AsyncSession, appointment: AppointmentCreate) -
         await db.commit()
         await db.refresh(db_appointment)
         # logger.info(f"{(db_appointment.status)}") 
+        publish_event("appointment.created", db_appointment, AppointmentResponse)
         return db_appointment
     except IntegrityError as e:
         await db.rollback()
@@ -92,14 +95,12 @@ async def get_appointments_by_date_range(db: AsyncSession, start_date: datetime,
 
 async def get_all_appointments(db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[Appointment]:
     """Lấy tất cả lịch hẹn"""
     result = await db.execute(
-        select(Appointment)
-        .order_by(Appointment.appointment_id.asc())
-        .offset(skip)
-        .limit(limit)
+        paginate(select(Appointment), [Appointment.appointment_id], after, skip, limit)
     )
     return result.scalars().all()
 
@@ -124,7 +125,9 @@ async def update_appointment(db: AsyncSession,
             await db.execute(stmt)
         
         await db.commit()
-        return await get_appointment_by_id(db, appointment_id)
+        db_appointment = await get_appointment_by_id(db, appointment_id)
+        publish_event("appointment.updated", db_appointment, AppointmentResponse)
+        return db_appointment
         
     except Exception as e:
         await db.rollback()
@@ -153,7 +156,9 @@ async def update_appointment_status(
         await db.execute(stmt)
         await db.commit()
         
-        return await get_appointment_by_id(db, appointment_id)
+        db_appointment = await get_appointment_by_id(db, appointment_id)
+        publish_event("appointment.updated", db_appointment, AppointmentResponse)
+        return db_appointment
         
     except Exception as e:
         await db.rollback()
@@ -177,6 +182,7 @@ async def delete_appointment(
         stmt = delete(Appointment).where(Appointment.appointment_id == appointment_id)
         await db.execute(stmt)
         await db.commit()
+        publish_event("appointment.deleted", {"appointment_id": appointment_id})
         
         return True
         
@@ -213,7 +219,8 @@ async def get_appointment_with_filter(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[Appointment]:
     """Lấy danh sách lịch hẹn với các bộ lọc"""
     try:
@@ -241,16 +248,20 @@ async def get_appointment_with_filter(
                 )
             )
         
-        query = query.order_by(Appointment.appointment_id.asc()).offset(skip).limit(limit)
+        query = paginate(query, [Appointment.appointment_id], after, skip, limit)
         result = await db.execute(query)
 
+    except HTTPException:
+        # Cursor sai (400) từ paginate
+        raise
+    # Tham số `status` che fastapi.status trong hàm này nên ghi mã trực tiếp
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Lỗi khi lấy danh sách lịch hẹn: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Integrity Error")
+        raise HTTPException(status_code=409, detail="Integrity Error")
     except Exception as e:
         await db.rollback()
         logger.error(f"Lỗi khi lấy danh sách lịch hẹn: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
 
     return result.scalars().all()
\ No newline at end of file
@@ -1,11 +1,17 @@
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
+from typing import Optional
+from datetime import date, datetime, time, timedelta
 
 from utils.logger import get_logger
-from models.models import Customer
+from utils.pagination import paginate
+from utils.passwords import hash_password, verify_and_update
+from utils.events import publish_event
+from models.models import Customer, Appointment, ReceptionForm
 from schemas.customer import CustomerCreate, CustomerUpdate, CustomerResponse
 
 logger = get_logger(__name__)
@@ -18,11 +24,14 @@ async def create_customer(db: AsyncSession, customer: CustomerCreate) -> Custome
             phone_num=customer.phone_num,
             email=customer.email,
             is_guest=customer.is_guest,
-            password=customer.password
+            # Băm mật khẩu trong thread pool để không chặn event loop
+            password=await hash_password(customer.password) if customer.password else customer.password
         )
         db.add(db_customer)
         await db.commit()
         await db.refresh(db_customer)
+        # Chỉ phát id: sự kiện đi tới cả kênh SSE, chỉ mục tìm kiếm tự đọc lại dòng
+        publish_event("customer.created", {"customer_id": db_customer.customer_id})
         return CustomerResponse.from_orm(db_customer)
     except IntegrityError as e:
         await db.rollback()
@@ -47,9 +56,35 @@ async def get_customer_with_motorcycle_by_phone(db: AsyncSession, phone_num: str
     )
     return result.scalar_one_or_none()
 
-async def get_all_customers(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Customer]:
-    """Lấy danh sách khách hàng với phân trang"""
-    result = await db.execute(select(Customer).offset(skip).limit(limit))
+async def get_customer_check_in(db: AsyncSession, phone_num: str, day: Optional[date] = None) -> Optional[Customer]:
+    """
+    Thông tin tiếp nhận khách theo số điện thoại: xe máy, phiếu tiếp nhận chưa trả xe (kèm ảnh)
+    và lịch hẹn chưa hủy trong ngày, nạp bằng selectinload thay cho nhiều lần gọi API riêng.
+    Số truy vấn cố định (khách hàng + 4 lượt IN) dù khách có bao nhiêu xe hay phiếu.
+    """
+    day_start = datetime.combine(day or date.today(), time.min)
+    day_end = day_start + timedelta(days=1)
+    result = await db.execute(
+        select(Customer)
+        .where(Customer.phone_num == phone_num)
+        .options(
+            selectinload(Customer.motocycles),
+            selectinload(Customer.reception_forms.and_(ReceptionForm.is_returned.isnot(True)))
+            .selectinload(ReceptionForm.reception_images),
+            selectinload(Customer.appointments.and_(
+                Appointment.appointment_date >= day_start,
+                Appointment.appointment_date < day_end,
+                Appointment.status != 'cancelled',
+            )),
+        )
+        # Các collection được lọc: không dùng lại bản đầy đủ có thể đã nằm trong session
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+async def get_all_customers(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Customer]:
+    """Lấy danh sách khách hàng với phân trang (offset hoặc cursor)"""
+    result = await db.execute(paginate(select(Customer), [Customer.customer_id], after, skip, limit))
     return result.scalars().all()
 
 async def update_customer(db: AsyncSession, customer_id: int, customer: CustomerUpdate) -> Customer:
@@ -61,10 +96,13 @@ async def update_customer(db: AsyncSession, customer_id: int, customer: Customer
         
         # Xây dựng dictionary chỉ với các trường cần cập nhật
         update_data = customer.dict(exclude_unset=True)
+        if update_data.get("password"):
+            update_data["password"] = await hash_password(update_data["password"])
         
         stmt = update(Customer).where(Customer.customer_id == customer_id).values(**update_data)
         await db.execute(stmt)
         await db.commit()
+        publish_event("customer.updated", {"customer_id": customer_id})
         return await get_customer_by_id(db, customer_id)
     except IntegrityError:
         await db.rollback()
@@ -80,23 +118,39 @@ async def delete_customer(db: AsyncSession, customer_id: int) -> bool:
     stmt = delete(Customer).where(Customer.customer_id == customer_id)
     await db.execute(stmt)
     await db.commit()
+    publish_event("customer.deleted", {"customer_id": customer_id})
     return True
 
 async def get_customer_by_email_and_password(db: AsyncSession, email: str, password: str) -> Customer:
     """Lấy thông tin khách hàng theo email và mật khẩu"""
     try:
-        # logger.info(f"Đang tìm kiếm khách hàng với email: {email} và mật khẩu: {password}")
+        # Lấy theo email rồi kiểm tra mật khẩu bằng bcrypt (chạy trong thread pool)
         query = select(Customer).where(
             Customer.email == email,
-            Customer.password == password
+            Customer.password.isnot(None)
         )
         result = await db.execute(query)
-        customer_db = result.scalar_one_or_none()
-        # logger.info(f"Đã tìm thấy khách hàng: {CustomerResponse.from_orm(customer_db)} với email: {email} và mật khẩu: {password}")
-        return customer_db
-    except MultipleResultsFound:
-        logger.error("Nhiều kết quả được tìm thấy với email và mật khẩu này")
+        for customer_db in result.scalars().all():
+            valid, new_hash = await verify_and_update(password, customer_db.password)
+            if not valid:
+                continue
+            if new_hash:
+                # Mật khẩu cũ dạng rõ hoặc độ khó bcrypt đã đổi: lưu chuỗi băm mới
+                customer_id = customer_db.customer_id
+                try:
+                    await db.execute(
+                        update(Customer).where(Customer.customer_id == customer_id).values(password=new_hash)
+                    )
+                    await db.commit()
+                except Exception as e:
+                    # Không lưu được thì vẫn cho đăng nhập, lần sau sẽ thử lại
+                    await db.rollback()
+                    logger.error(f"Lỗi khi cập nhật mật khẩu đã băm cho khách hàng {customer_id}: {str(e)}")
+                customer_db = await get_customer_by_id(db, customer_id)
+            return customer_db
         return None
+    except HTTPException:
+        # 503 khi hàng đợi băm mật khẩu đầy, không đổi thành sai mật khẩu
+        raise
     except Exception as e:
         logger.error(f"Lỗi khi lấy thông tin khách hàng: {str(e)}")
-
@@ -2,8 +2,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
 from sqlalchemy.exc import IntegrityError
+from typing import Optional
 
 from utils.logger import get_logger
+from utils.events import publish_event
+from utils.pagination import paginate
 from models.models import Motocycle
 from schemas.motocycle import MotocycleResponse, MotocycleCreate, MotocycleUpdate
 from utils.logger import get_logger
@@ -11,19 +14,47 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-async def get_all_motorcycles(db: AsyncSession) -> list[Motocycle]:
-    """Lấy danh sách tất cả các loại xe máy."""
+def _filter_motorcycles(query, customer_id: Optional[int] = None, moto_type_id: Optional[int] = None, brand: Optional[str] = None):
+    # Mỗi điều kiện có index (cột lọc, motocycle_id) tương ứng
+    if customer_id is not None:
+        query = query.where(Motocycle.customer_id == customer_id)
+    if moto_type_id is not None:
+        query = query.where(Motocycle.moto_type_id == moto_type_id)
+    if brand:
+        query = query.where(Motocycle.brand == brand)
+    return query
+
+async def get_all_motorcycles(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = None,
+    customer_id: Optional[int] = None,
+    moto_type_id: Optional[int] = None,
+    brand: Optional[str] = None,
+) -> list[Motocycle]:
+    """Lấy danh sách xe máy theo bộ lọc, phân trang theo motocycle_id (offset hoặc cursor)."""
+    # Cursor sai trả 400 ngay khi dựng truy vấn
+    query = paginate(
+        _filter_motorcycles(select(Motocycle), customer_id, moto_type_id, brand),
+        [Motocycle.motocycle_id], after, skip, limit
+    )
     try:
-        result = await db.execute(select(Motocycle))
+        result = await db.execute(query)
         motorcycles = result.scalars().all()
-        logger.info("Lấy danh sách tất cả các loại xe máy thành công")
+        logger.debug("Lấy danh sách xe máy thành công")
         return motorcycles
     except IntegrityError as e:
-        logger.error(f"Lỗi khi lấy danh sách loại xe máy: {str(e)}")
-        raise IntegrityError("Lỗi khi lấy danh sách loại xe máy")
+        logger.error(f"Lỗi khi lấy danh sách xe máy: {str(e)}")
+        raise IntegrityError("Lỗi khi lấy danh sách xe máy")
     except Exception as e:
         logger.error(f"Lỗi không xác định: {str(e)}")
         raise e
+
+def export_motorcycles_query(customer_id: Optional[int] = None, moto_type_id: Optional[int] = None, brand: Optional[str] = None):
+    """Truy vấn xuất toàn bộ xe máy theo bộ lọc, theo thứ tự motocycle_id"""
+    return _filter_motorcycles(select(Motocycle), customer_id, moto_type_id, brand).order_by(Motocycle.motocycle_id)
+
 async def get_motorcycle_by_id(db: AsyncSession, motorcycle_id: int) -> Motocycle:
     """Lấy thông tin loại xe máy theo ID."""
     try:
@@ -43,7 +74,8 @@ async def create_motorcycle(db: AsyncSession, motorcycle: MotocycleCreate) -> Mo
         db.add(new_motorcycle)
         await db.commit()
         await db.refresh(new_motorcycle)
-        logger.info(f"Tạo loại xe máy mới thành công: {new_motorcycle}")
+        publish_event("motorcycle.created", {"motocycle_id": new_motorcycle.motocycle_id})
+        logger.debug("Tạo loại xe máy mới thành công: %s", new_motorcycle)
         return new_motorcycle
     except IntegrityError as e:
         await db.rollback()
@@ -62,6 +94,7 @@ async def update_motorcycle(db: AsyncSession, motorcycle_id: int, motorcycle_upd
         )
         await db.execute(stmt)
         await db.commit()
+        publish_event("motorcycle.updated", {"motocycle_id": motorcycle_id})
         logger.info(f"Cập nhật loại xe máy với ID {motorcycle_id} thành công")
         return await get_motorcycle_by_id(db, motorcycle_id)
     except IntegrityError as e:
@@ -77,6 +110,7 @@ async def delete_motorcycle(db: AsyncSession, motorcycle_id: int) -> bool:
         stmt = delete(Motocycle).where(Motocycle.motocycle_id == motorcycle_id)
         await db.execute(stmt)
         await db.commit()
+        publish_event("motorcycle.deleted", {"motocycle_id": motorcycle_id})
         logger.info(f"Xóa loại xe máy với ID {motorcycle_id} thành công")
         return True
     except IntegrityError as e:
@@ -5,26 +5,61 @@ from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException, status
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.events import publish_event
+from db.bulk import bulk_insert
+from utils.responses import orm_to_dict
 from models.models import ReceptionForm, ReceptionImage, Motocycle, Customer
 from schemas.reception_from import (
     ReceptionFormCreate, 
     ReceptionFormUpdate, 
     ReceptionFormCreate2, 
     ReceptionFormCreateNoCustomerIdNoMotoCycleId, 
+    ReceptionFormResponse,
     ReceptionImageCreate
     )
+from schemas.reception_image import ReceptionImageResponse
 
 logger = get_logger(__name__)
 
 # CRUD for ReceptionForm
-async def create_reception_form(db: AsyncSession, reception_form: ReceptionFormCreate) -> ReceptionForm:
-    """Tạo một biểu mẫu tiếp nhận mới"""
+async def _insert_reception_form(
+    db: AsyncSession,
+    images: Optional[List[ReceptionImageCreate]],
+    **form_values
+) -> ReceptionFormResponse:
+    """Chèn biểu mẫu và toàn bộ hình ảnh (chưa commit), dựng response từ dữ liệu trong bộ nhớ"""
+    form_values["created_at"] = datetime.now()
+    form_values["is_returned"] = form_values.get("is_returned") or False
+
+    result = await db.execute(insert(ReceptionForm).values(**form_values))
+    form_id = result.inserted_primary_key[0]
+
+    # Toàn bộ hình ảnh được chèn trong một câu lệnh
+    image_rows = [
+        {"form_id": form_id, "URL": image.URL, "decription": image.decription}
+        for image in images or []
+    ]
+    img_ids = await bulk_insert(db, ReceptionImage, image_rows)
+
+    return ReceptionFormResponse(
+        form_id=form_id,
+        reception_images=[
+            ReceptionImageResponse(img_id=img_id, **row)
+            for img_id, row in zip(img_ids, image_rows)
+        ],
+        **form_values
+    )
+
+async def create_reception_form_fast(db: AsyncSession, reception_form: ReceptionFormCreate) -> ReceptionFormResponse:
+    """Tạo biểu mẫu tiếp nhận kèm hình ảnh, trả về kết quả mà không cần truy vấn lại"""
     try:
-        # Tạo đối tượng biểu mẫu tiếp nhận
-        db_reception_form = ReceptionForm(
+        db_reception_form = await _insert_reception_form(
+            db,
+            reception_form.images,
             motocycle_id=reception_form.motocycle_id,
             customer_id=reception_form.customer_id,
             staff_id=reception_form.staff_id,
@@ -32,22 +67,8 @@ async def create_reception_form(db: AsyncSession, reception_form: ReceptionFormC
             initial_conditon=reception_form.initial_conditon,
             note=reception_form.note,
         )
-        
-        db.add(db_reception_form)
-        await db.flush()  # Để lấy được ID của biểu mẫu mới tạo
-        
-        # Thêm các hình ảnh (nếu có)
-        if reception_form.images:
-            for image in reception_form.images:
-                db_image = ReceptionImage(
-                    form_id=db_reception_form.form_id,
-                    URL=image.URL,
-                    decription=image.decription
-                )
-                db.add(db_image)
-        
         await db.commit()
-        await db.refresh(db_reception_form)
+        publish_event("reception.created", db_reception_form)
         return db_reception_form
     except IntegrityError as e:
         await db.rollback()
@@ -61,13 +82,9 @@ async def create_reception_form(db: AsyncSession, reception_form: ReceptionFormC
 async def create_reception_form_without_motorcycle_id(
     db: AsyncSession, 
     reception_form: ReceptionFormCreate2
-) -> ReceptionForm:
+) -> ReceptionFormResponse:
     """Tạo một biểu mẫu tiếp nhận mới mà không cần ID xe máy"""
     try:
-        # Tạo đối tượng biểu mẫu tiếp nhận
-        # Tạo câu lệnh insert với returning
-        # ...existing code...
-
         stmt = insert(Motocycle).values(
             moto_type_id=reception_form.moto_type_id,
             customer_id=reception_form.customer_id,
@@ -76,39 +93,25 @@ async def create_reception_form_without_motorcycle_id(
             license_plate=reception_form.license_plate
         )
 
-        # Thực thi câu lệnh INSERT
-        await db.execute(stmt)
-
-        # Lấy ID của xe máy vừa được chèn
-        result = await db.execute(select(Motocycle.motocycle_id).order_by(Motocycle.motocycle_id.desc()).limit(1))
-        motocycle_id = result.scalar_one()
+        # Lấy ID của xe máy vừa chèn từ chính câu lệnh INSERT (lastrowid),
+        # không đọc lại bản ghi mới nhất để tránh gắn nhầm xe của khách khác
+        result = await db.execute(stmt)
+        motocycle_id = result.inserted_primary_key[0]
 
-        # ...existing code...
-        
-        db_reception_form = ReceptionForm(
+        db_reception_form = await _insert_reception_form(
+            db,
+            reception_form.images,
             customer_id=reception_form.customer_id,
             motocycle_id=motocycle_id,
             staff_id=reception_form.staff_id,
             is_returned=reception_form.is_returned,
             initial_conditon=reception_form.initial_conditon,
-            note=reception_form.note
+            note=reception_form.note,
         )
-        
-        db.add(db_reception_form)
-        await db.flush()  # Để lấy được ID của biểu mẫu mới tạo
-        
-        # Thêm các hình ảnh (nếu có)
-        if reception_form.images:
-            for image in reception_form.images:
-                db_image = ReceptionImage(
-                    form_id=db_reception_form.form_id,
-                    URL=image.URL,
-                    decription=image.decription
-                )
-                db.add(db_image)
-        
+
         await db.commit()
-        await db.refresh(db_reception_form)
+        publish_event("motorcycle.created", {"motocycle_id": motocycle_id})
+        publish_event("reception.created", db_reception_form)
         return db_reception_form
     except IntegrityError as e:
         await db.rollback()
@@ -122,7 +125,7 @@ async def create_reception_form_without_motorcycle_id(
 async def create_reception_form_without_customer_id_and_without_motorcycle_id(
     db: AsyncSession, 
     reception_form: ReceptionFormCreateNoCustomerIdNoMotoCycleId
-) -> ReceptionForm:
+) -> ReceptionFormResponse:
     """Tạo một biểu mẫu tiếp nhận mới mà không cần ID khách hàng và ID xe máy"""
     # Tạo customer
     customer = Customer(
@@ -146,7 +149,7 @@ async def create_reception_form_without_customer_id_and_without_motorcycle_id(
     await db.flush()  # Để lấy được ID của xe máy mới tạo
     motocycle_id = motocycle.motocycle_id
 
-    db_reception_form = await create_reception_form(
+    db_reception_form = await create_reception_form_fast(
         db,
         ReceptionFormCreate(
             customer_id=customer_id,
@@ -159,6 +162,10 @@ async def create_reception_form_without_customer_id_and_without_motorcycle_id(
         )
     )
 
+    # Khách hàng và xe được commit cùng biểu mẫu trong create_reception_form_fast
+    publish_event("customer.created", {"customer_id": customer_id})
+    publish_event("motorcycle.created", {"motocycle_id": motocycle_id})
+
     # logger.info(f"Đã tạo biểu mẫu tiếp nhận mới với ID: {db_reception_form.form_id}")
 
     return db_reception_form
@@ -175,6 +182,33 @@ async def get_reception_form_today(db: AsyncSession) -> List[ReceptionForm]:
     )
     return result.scalars().all()
 
+def export_reception_forms_query(start_date: datetime, end_date: datetime):
+    """
+    Truy vấn xuất biểu mẫu tiếp nhận trong khoảng thời gian, theo thứ tự ngày tạo.
+    Ảnh không nạp cùng truy vấn (cursor đang mở chiếm kết nối), attach_reception_images bổ sung theo từng lượt.
+    """
+    return (
+        select(ReceptionForm)
+        .options(noload(ReceptionForm.reception_images))
+        .where(ReceptionForm.created_at >= start_date, ReceptionForm.created_at <= end_date)
+        .order_by(ReceptionForm.created_at, ReceptionForm.form_id)
+    )
+
+async def attach_reception_images(db: AsyncSession, forms: List[Dict[str, Any]]) -> None:
+    """Gắn danh sách ảnh vào các biểu mẫu (dạng dict) bằng một truy vấn cho cả lượt"""
+    if not forms:
+        return
+    result = await db.execute(
+        select(ReceptionImage)
+        .where(ReceptionImage.form_id.in_([form["form_id"] for form in forms]))
+        .order_by(ReceptionImage.form_id, ReceptionImage.img_id)
+    )
+    images: Dict[int, List[dict]] = {}
+    for image in result.scalars().all():
+        images.setdefault(image.form_id, []).append(orm_to_dict(image, ReceptionImageResponse))
+    for form in forms:
+        form["reception_images"] = images.get(form["form_id"], [])
+
 async def get_reception_form_by_range_date(
     db: AsyncSession, 
     start_date: datetime, 
@@ -238,17 +272,20 @@ async def get_reception_forms_by_motorcycle(
 async def get_all_reception_forms(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[ReceptionForm]:
     """Lấy tất cả biểu mẫu tiếp nhận"""
     try:
         result = await db.execute(
-        select(ReceptionForm)
-        .options(selectinload(ReceptionForm.reception_images))
-        .order_by(ReceptionForm.form_id.asc())  
-        .offset(skip)
-        .limit(limit)
-    )
+            paginate(
+                select(ReceptionForm).options(selectinload(ReceptionForm.reception_images)),
+                [ReceptionForm.form_id], after, skip, limit
+            )
+        )
+    except HTTPException:
+        # Cursor sai (400) từ paginate
+        raise
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Lỗi khi lấy danh sách biểu mẫu tiếp nhận: {str(e)}")
@@ -281,7 +318,9 @@ async def update_reception_form(
             await db.execute(stmt)
         
         await db.commit()
-        return await get_reception_form_by_id(db, form_id)
+        db_reception_form = await get_reception_form_by_id(db, form_id)
+        publish_event("reception.updated", db_reception_form, ReceptionFormResponse)
+        return db_reception_form
         
     except Exception as e:
         await db.rollback()
@@ -305,7 +344,9 @@ async def update_return_status(
         await db.execute(stmt)
         await db.commit()
         
-        return await get_reception_form_by_id(db, form_id)
+        db_reception_form = await get_reception_form_by_id(db, form_id)
+        publish_event("reception.updated", db_reception_form, ReceptionFormResponse)
+        return db_reception_form
         
     except Exception as e:
         await db.rollback()
@@ -329,6 +370,7 @@ async def delete_reception_form(
         stmt = delete(ReceptionForm).where(ReceptionForm.form_id == form_id)
         await db.execute(stmt)
         await db.commit()
+        publish_event("reception.deleted", {"form_id": form_id})
         
         return True
         
@@ -0,0 +1,60 @@
+from typing import List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Kết quả kiểm tra cấu hình auto-increment của MySQL, None là chưa kiểm tra
+_consecutive_ids: Optional[bool] = None
+
+
+async def _mysql_ids_are_consecutive(db: AsyncSession) -> bool:
+    """
+    InnoDB chỉ cấp id liên tiếp cho một câu INSERT nhiều dòng khi innodb_autoinc_lock_mode
+    là 0 hoặc 1 và auto_increment_increment = 1. Mode 2 (mặc định từ MySQL 8.0) có thể xen kẽ.
+    Chỉ kiểm tra một lần cho mỗi process.
+    """
+    global _consecutive_ids
+    if _consecutive_ids is None:
+        result = await db.execute(text("SELECT @@innodb_autoinc_lock_mode, @@auto_increment_increment"))
+        lock_mode, increment = result.one()
+        _consecutive_ids = int(lock_mode) in (0, 1) and int(increment) == 1
+        if not _consecutive_ids:
+            logger.warning(
+                f"innodb_autoinc_lock_mode={lock_mode}, auto_increment_increment={increment}: "
+                "id không chắc liên tiếp, chèn từng dòng"
+            )
+    return _consecutive_ids
+
+
+async def bulk_insert(db: AsyncSession, model, rows: List[dict]) -> List[int]:
+    """Chèn nhiều dòng trong một câu lệnh và trả về khóa chính theo đúng thứ tự của rows."""
+    if not rows:
+        return []
+
+    pk_column = model.__mapper__.primary_key[0]
+    dialect = db.get_bind().dialect
+
+    # CSDL hỗ trợ RETURNING (MariaDB, PostgreSQL, SQLite...): lấy id ngay trong lệnh INSERT
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        result = await db.execute(
+            insert(model).returning(pk_column, sort_by_parameter_order=True),
+            rows
+        )
+        return list(result.scalars().all())
+
+    # MySQL: một câu INSERT nhiều dòng, lastrowid là id của dòng đầu tiên
+    if await _mysql_ids_are_consecutive(db):
+        result = await db.execute(insert(model).values(rows))
+        first_id = result.lastrowid
+        return list(range(first_id, first_id + len(rows)))
+
+    # Không chắc id liên tiếp: chèn từng dòng để lấy đúng id
+    ids = []
+    for row in rows:
+        result = await db.execute(insert(model).values(row))
+        ids.append(result.inserted_primary_key[0])
+    return ids
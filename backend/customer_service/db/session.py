@@ -4,6 +4,10 @@ import os
 from dotenv import load_dotenv
 
 from models.models import Base
+from db.pool import MeteredAsyncPool, get_pool_settings, get_pool_status
+from db.indexes import ensure_indexes
+from utils.metrics import instrument_engine
+from utils.slow_query import install_slow_query_log
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,11 +23,25 @@ DB_HOST = os.getenv("DB_HOST")
 DB_NAME = os.getenv("DB_NAME")
 DB_PORT = os.getenv("DB_PORT")
 
+SERVICE_NAME = "customer_service"
+
 # Cấu hình kết nối bất đồng bộ cho MySQL
 SQLALCHEMY_DATABASE_URL = f"mysql+aiomysql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Cấu hình pool đọc từ biến môi trường (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...)
+POOL_SETTINGS = get_pool_settings(SERVICE_NAME)
+
 # Tạo engine bất đồng bộ
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=False)
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=False,
+    poolclass=MeteredAsyncPool,
+    **POOL_SETTINGS,
+)
+# Đếm số truy vấn và thời gian truy vấn cho /metrics
+instrument_engine(engine)
+# Ghi truy vấn vượt ngưỡng SLOW_QUERY_THRESHOLD_MS, xem tại /monitoring/slow-queries
+install_slow_query_log(engine)
 AsyncSessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
 async def get_db():
@@ -33,11 +51,17 @@ async def get_db():
         finally:
             await db.close()
 
+def get_db_pool_status() -> dict:
+    """Lấy trạng thái pool kết nối của service."""
+    return get_pool_status(engine, POOL_SETTINGS)
+
 async def init_db():
     try:
         # Khởi tạo cơ sở dữ liệu bất đồng bộ
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            # Bổ sung index còn thiếu cho các bảng đã tồn tại
+            await conn.run_sync(ensure_indexes)
         logger.info(f"Database initialized successfully")
         print(f"{MAGENTA}Database initialized successfully.{RESET}")
         print(f"{MAGENTA}Connection established successfully.{RESET}")
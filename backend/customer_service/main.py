@@ -5,18 +5,30 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import OperationalError
 
 from db.session import init_db
+from utils.auth import start_revocation_refresher, stop_revocation_refresher
+from utils.metrics import MetricsMiddleware
+from utils.events import start_event_backend, stop_event_backend
+from utils.search_index import start_search_index, stop_search_index
+from utils.responses import FastJSONResponse
 from api.v1.endpoints.customer_router import router as customer_router
 from api.v1.endpoints.motorcycle_router import router as motorcycle_router
 from api.v1.endpoints.appointment_router import router as appointment_router
 from api.v1.endpoints.reception_form_router import router as reception_router
+from api.v1.endpoints.monitoring_router import router as monitoring_router
+from api.v1.endpoints.events_router import router as events_router
+from api.v1.endpoints.search_router import router as search_router
 
-app = FastAPI(title="Customer Service API", version="1.0.0")
+# Response mặc định tuần tự hóa bằng orjson (nếu có)
+app = FastAPI(title="Customer Service API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Đăng ký các router
 app.include_router(customer_router, prefix="/api/v1", tags=["Customer"])
 app.include_router(motorcycle_router, prefix="/api/v1", tags=["Motorcycle"])
 app.include_router(appointment_router, prefix="/api/v1", tags=["Appointment"])
 app.include_router(reception_router, prefix="/api/v1", tags=["Reception"])
+app.include_router(monitoring_router, prefix="/api/v1", tags=["Monitoring"])
+app.include_router(events_router, prefix="/api/v1", tags=["Events"])
+app.include_router(search_router, prefix="/api/v1", tags=["Search"])
 
 # Cấu hình CORS cho phép truy cập từ các nguồn khác nhau
 app.add_middleware(
@@ -25,7 +37,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor phân trang keyset
 )
+# Đo thời gian xử lý và số truy vấn của mỗi request (thêm sau cùng để bao ngoài các middleware khác)
+app.add_middleware(MetricsMiddleware)
 
 # @asynccontextmanager
 # async def lifespan(app: FastAPI):
@@ -74,9 +89,22 @@ async def operational_error_handler(request, exc):
 async def startup_event():
     """Khởi động ứng dụng và kết nối đến cơ sở dữ liệu."""
     await init_db()
+    # Làm mới định kỳ danh sách nhân viên bị khóa cho phần xác thực JWT
+    start_revocation_refresher()
+    # Kênh phát sự kiện cho SSE (/events/stream)
+    await start_event_backend()
+    # Dựng chỉ mục tìm kiếm khách hàng trong nền, cập nhật theo sự kiện customer/motorcycle
+    start_search_index()
     print("Accset docs: http://localhost:8001/docs")
     print("Server is running...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Dừng các tác vụ nền khi tắt ứng dụng."""
+    await stop_revocation_refresher()
+    await stop_search_index()
+    await stop_event_backend()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="localhost", port=8001, log_level="info", reload=True)
\ No newline at end of file
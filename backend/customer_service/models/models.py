@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Unicode, String, Boolean, ForeignKey, DateTime, Text, Enum, CheckConstraint
+from sqlalchemy import Column, Integer, Unicode, String, Boolean, ForeignKey, DateTime, Text, Enum, CheckConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -40,6 +40,13 @@ class Motocycle(Base):
     license_plate = Column(String(20), nullable=False)
     brand = Column(Unicode(50))
     model = Column(Unicode(50))
+
+    # Index cho lọc danh sách xe theo chủ xe, loại xe, hãng; kèm khóa chính để phân trang keyset không cần sắp xếp lại
+    __table_args__ = (
+        Index('ix_motocycle_customer_id', 'customer_id', 'motocycle_id'),
+        Index('ix_motocycle_type_id', 'moto_type_id', 'motocycle_id'),
+        Index('ix_motocycle_brand_id', 'brand', 'motocycle_id'),
+    )
     
     # Relationships
     customer = relationship("Customer", back_populates="motocycles") # checked
@@ -58,6 +65,12 @@ class Appointment(Base):
     note = Column(Text(collation='utf8mb4_unicode_ci'))
     created_at = Column(DateTime, default=datetime.now)
     
+    # Index cho lọc theo khoảng ngày (+ trạng thái) và lịch hẹn của từng khách hàng
+    __table_args__ = (
+        Index('ix_appointment_date_status', 'appointment_date', 'status'),
+        Index('ix_appointment_customer_date', 'customer_id', 'appointment_date'),
+    )
+    
     # Relationships
     customer = relationship("Customer", back_populates="appointments") # checked
     # service_type = relationship("ServiceType", back_populates="appointment")
@@ -88,6 +101,13 @@ class ReceptionForm(Base):
     is_returned = Column(Boolean, default=False)  # Xe được bàn giao lại cho khách hay chưa
     returned_at = Column(DateTime)  # Thời gian trả xe
 
+    # Index cho lọc theo ngày tiếp nhận và lịch sử tiếp nhận theo khách hàng / xe
+    __table_args__ = (
+        Index('ix_receptionform_created_at', 'created_at'),
+        Index('ix_receptionform_customer_created', 'customer_id', 'created_at'),
+        Index('ix_receptionform_motocycle_created', 'motocycle_id', 'created_at'),
+    )
+
     # Relationships
     motocycle = relationship("Motocycle", back_populates="reception_forms") # checked
     customer = relationship("Customer", back_populates="reception_forms") # checked
@@ -4,6 +4,8 @@ import re
 # Thêm để lấy list motocycles
 from typing import List
 from schemas.motocycle import MotocycleResponse
+from schemas.appointment import AppointmentResponse
+from schemas.reception_from import ReceptionFormResponse
 
 class CustomerBase(BaseModel):
     """Base model cho Customer"""
@@ -56,7 +58,6 @@ class CustomerResponse(BaseModel):
     fullname: str 
     phone_num: str
     email: Optional[EmailStr] = None
-    password: Optional[str] = None
     is_guest: Optional[bool] = True
     
     model_config = {
@@ -67,7 +68,6 @@ class CustomerResponse(BaseModel):
                 "fullname": "Người Dùng Demo",
                 "phone_num": "0000000000",
                 "email": "demo@gmail.com",
-                "password": "000000",
                 "is_guest": True
             }
         }
@@ -78,7 +78,6 @@ class CustomerResponseWithMotocycles(BaseModel):
     fullname: str
     phone_num: str
     email: Optional[EmailStr] = None
-    password: Optional[str] = None
     is_guest: Optional[bool] = True
     motocycles: List[MotocycleResponse] = []  # Danh sách xe máy
 
@@ -90,7 +89,6 @@ class CustomerResponseWithMotocycles(BaseModel):
                 "fullname": "Người Dùng Demo",
                 "phone_num": "0000000000",
                 "email": "demo@gmail.com",
-                "password": "000000",
                 "is_guest": True,
                 "motocycles": [
                     {
@@ -103,6 +101,20 @@ class CustomerResponseWithMotocycles(BaseModel):
             }
         }
 
+class CustomerCheckInResponse(BaseModel):
+    """Thông tin tiếp nhận khách tại quầy: xe máy, phiếu chưa trả xe và lịch hẹn hôm nay"""
+    customer_id: int
+    fullname: str
+    phone_num: str
+    email: Optional[EmailStr] = None
+    is_guest: Optional[bool] = True
+    motocycles: List[MotocycleResponse] = []
+    open_reception_forms: List[ReceptionFormResponse] = Field([], validation_alias="reception_forms")
+    today_appointments: List[AppointmentResponse] = Field([], validation_alias="appointments")
+
+    class Config:
+        from_attributes = True
+
 class CustomerLogin(BaseModel):
     """Schema để đăng nhập Customer"""
     email: EmailStr = Field(..., description="Email của khách hàng")
@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class SearchResult(BaseModel):
+    """Một khách hàng khớp từ khóa"""
+    customer_id: int
+    fullname: Optional[str] = None
+    phone_num: Optional[str] = None
+    license_plate: Optional[str] = Field(None, description="Biển số khớp (khi khớp theo biển số)")
+    matched_field: str = Field(..., description="fullname, phone_num hoặc license_plate")
+    match: str = Field(..., description="exact, prefix, word hoặc contains")
+
+
+class SearchResponse(BaseModel):
+    """Kết quả tìm kiếm khách hàng"""
+    query: str
+    took_ms: float
+    results: List[SearchResult] = []
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "query": "nguyen van",
+                "took_ms": 0.42,
+                "results": [
+                    {
+                        "customer_id": 1,
+                        "fullname": "Nguyễn Văn An",
+                        "phone_num": "0901234567",
+                        "license_plate": None,
+                        "matched_field": "fullname",
+                        "match": "prefix"
+                    }
+                ]
+            }
+        }
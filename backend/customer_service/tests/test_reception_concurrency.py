@@ -0,0 +1,73 @@
+"""
+Tiếp nhận xe vãng lai (create_reception_form_without_motorcycle_id) chạy song song:
+mỗi biểu mẫu phải gắn với đúng chiếc xe và đúng hình ảnh do chính request đó tạo.
+"""
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud import reception as reception_crud
+from models.models import Customer, Motocycle, MotocycleType, ReceptionImage
+from schemas.reception_from import ReceptionFormCreate2
+from schemas.reception_image import ReceptionImageCreate
+
+PARALLEL_RECEPTIONS = 20
+
+
+def _walk_in(i: int) -> ReceptionFormCreate2:
+    return ReceptionFormCreate2(
+        customer_id=i + 1,
+        moto_type_id=1,
+        brand="Honda",
+        model="Vision",
+        license_plate=f"59X1-{i:05d}",
+        staff_id=1,
+        initial_conditon="Xe không nổ máy",
+        note=None,
+        images=[
+            ReceptionImageCreate(URL=f"/uploads/reception/{i}-{n}.jpg", decription=f"Ảnh {n}")
+            for n in range(2)
+        ],
+    )
+
+
+def test_parallel_walk_in_receptions_link_their_own_motorcycle(run_db):
+    async def check(engine):
+        async with AsyncSession(engine) as db:
+            db.add(MotocycleType(moto_type_id=1, name="Xe ga"))
+            db.add_all(
+                Customer(customer_id=i + 1, fullname=f"Khách {i}", phone_num=f"09{i:08d}")
+                for i in range(PARALLEL_RECEPTIONS)
+            )
+            await db.commit()
+
+        async def receive(i: int):
+            async with AsyncSession(engine) as db:
+                return await reception_crud.create_reception_form_without_motorcycle_id(db, _walk_in(i))
+
+        forms = await asyncio.gather(*(receive(i) for i in range(PARALLEL_RECEPTIONS)))
+
+        async with AsyncSession(engine) as db:
+            motorcycles = {
+                moto.motocycle_id: moto
+                for moto in (await db.execute(select(Motocycle))).scalars().all()
+            }
+            images = {
+                image.img_id: image
+                for image in (await db.execute(select(ReceptionImage))).scalars().all()
+            }
+
+        assert len(motorcycles) == PARALLEL_RECEPTIONS
+        for i, form in enumerate(forms):
+            moto = motorcycles[form.motocycle_id]
+            assert moto.license_plate == f"59X1-{i:05d}"
+            assert moto.customer_id == form.customer_id == i + 1
+            assert [image.URL for image in form.reception_images] == [
+                f"/uploads/reception/{i}-{n}.jpg" for n in range(2)
+            ]
+            for image in form.reception_images:
+                stored = images[image.img_id]
+                assert stored.form_id == form.form_id
+                assert stored.URL == image.URL
+    run_db(check)
@@ -0,0 +1,109 @@
+"""
+ETag / Last-Modified cho các danh mục ít thay đổi (loại xe, dịch vụ, phụ tùng, bảng giá).
+
+Mỗi bảng có một bộ đếm phiên bản trong process, crud tăng bộ đếm sau khi commit.
+ETag ghép từ boot id của process, phiên bản các bảng, tham số truy vấn và một mốc thời gian
+(ETAG_TTL giây): khi chạy nhiều worker, thay đổi ở worker khác được nhìn thấy chậm nhất sau một mốc.
+Request có If-None-Match khớp được trả 304 ngay, không truy vấn cơ sở dữ liệu.
+"""
+import hashlib
+import os
+import threading
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+# Độ dài (giây) của mỗi mốc thời gian trong ETag
+ETAG_TTL = int(os.getenv("ETAG_TTL", "60"))
+
+# Đổi mỗi lần process khởi động để ETag cũ không trùng với bộ đếm mới bắt đầu từ 0
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class TableVersions:
+    """Bộ đếm phiên bản và thời điểm ghi gần nhất của từng bảng"""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._modified: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def bump(self, *tables: str) -> None:
+        now = time.time()
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._modified[table] = now
+
+    def version(self, table: str) -> int:
+        return self._versions.get(table, 0)
+
+    def last_modified(self, table: str) -> float:
+        return self._modified.get(table, self.started_at)
+
+
+table_versions = TableVersions()
+
+
+def _current_bucket() -> int:
+    return int(time.time() // ETAG_TTL) if ETAG_TTL > 0 else 0
+
+
+def build_etag(request: Request, *tables: str) -> str:
+    bucket = _current_bucket()
+    versions = "-".join(f"{table}.{table_versions.version(table)}" for table in tables)
+    query = hashlib.blake2s(str(sorted(request.query_params.multi_items())).encode(), digest_size=6).hexdigest()
+    return f'W/"{BOOT_ID}-{versions}-{bucket}-{query}"'
+
+
+def _last_modified(*tables: str) -> float:
+    # Sang mốc thời gian mới thì dữ liệu có thể đã đổi ở worker khác
+    bucket_start = _current_bucket() * ETAG_TTL
+    return max([bucket_start] + [table_versions.last_modified(table) for table in tables])
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # So sánh yếu: bỏ tiền tố W/ ở cả hai phía
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def check_not_modified(request: Request, response: Response, *tables: str) -> Optional[Response]:
+    """
+    Gắn ETag/Last-Modified vào response; trả về response 304 nếu client đã có bản mới nhất.
+    Gọi đầu endpoint, trước mọi truy vấn:
+        not_modified = check_not_modified(request, response, Part.__tablename__)
+        if not_modified:
+            return not_modified
+    """
+    etag = build_etag(request, *tables)
+    last_modified = _last_modified(*tables)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        # Trình duyệt luôn hỏi lại máy chủ, nhận 304 nếu không đổi
+        "Cache-Control": "no-cache",
+    }
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return None
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return None
+        if int(last_modified) <= int(since):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
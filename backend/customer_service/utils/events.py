@@ -0,0 +1,271 @@
+"""
+Phát sự kiện thay đổi dữ liệu tới các dashboard qua Server-Sent Events.
+
+Crud gọi publish_event(topic, data[, schema]) sau khi commit; mỗi kết nối SSE là một Subscription nhận
+các sự kiện có topic khớp tiền tố đã đăng ký (ví dụ "reception" nhận "reception.created").
+
+Backend:
+- memory (mặc định): chỉ trong process, đủ khi chạy một worker
+- redis: EVENTS_BACKEND=redis, các worker cùng publish/subscribe một kênh Redis (cần gói redis);
+  id sự kiện được cấp một lần trên Redis nên mọi worker dùng chung id (Last-Event-ID đúng ở worker nào cũng được)
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from utils.logger import get_logger, SERVICE_NAME
+
+logger = get_logger(__name__)
+
+EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "memory").lower()
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", "redis://localhost:6379/0")
+# Mỗi service một kênh: client SSE của service này không nhận sự kiện của service khác
+EVENTS_REDIS_CHANNEL = os.getenv("EVENTS_REDIS_CHANNEL", f"suachuaxemay:{SERVICE_NAME}:events")
+# Số sự kiện tối đa chờ gửi cho mỗi kết nối; client chậm hơn sẽ được yêu cầu tải lại
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Số sự kiện gần nhất giữ lại để client kết nối lại (Last-Event-ID) nhận bù
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "512"))
+# Chu kỳ (giây) gửi comment giữ kết nối qua proxy
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Đánh dấu kết nối bị quá tải, client cần tải lại toàn bộ dữ liệu
+_RESYNC = object()
+
+
+class Subscription:
+    """Một kết nối SSE: hàng đợi riêng và các tiền tố topic quan tâm"""
+
+    def __init__(self, topics: Iterable[str], maxsize: int):
+        self.topics = tuple(topic for topic in topics if topic)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def matches(self, topic: str) -> bool:
+        if not self.topics:
+            return True
+        return any(topic == prefix or topic.startswith(prefix + ".") for prefix in self.topics)
+
+    def offer(self, event: dict) -> bool:
+        """Đưa sự kiện vào hàng đợi không chờ; đầy thì thay bằng tín hiệu tải lại"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+            return False
+
+
+class EventBroker:
+    """Phân phối sự kiện tới các Subscription trong process"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, replay_size: int = EVENTS_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay_size)
+        self._last_id = 0
+        self.published = 0
+        self.overflows = 0
+
+    def subscribe(self, topics: Iterable[str] = (), last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(topics, self.queue_size)
+        if last_event_id is not None and last_event_id > self._last_id:
+            # Id của process khác hoặc trước khi khởi động lại, không gửi bù được
+            subscription.offer(_RESYNC)
+        elif last_event_id is not None:
+            missed = [event for event in self._recent if event["id"] > last_event_id and subscription.matches(event["topic"])]
+            if self._recent and self._recent[0]["id"] > last_event_id + 1:
+                # Sự kiện cần gửi bù đã bị đẩy khỏi bộ đệm
+                subscription.offer(_RESYNC)
+            else:
+                for event in missed:
+                    subscription.offer(event)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def dispatch(self, event: dict) -> None:
+        """Gửi sự kiện cho mọi kết nối khớp topic; không bao giờ chờ. Sự kiện chưa có id (backend memory) được gán id trong process"""
+        if event.get("id") is None:
+            self._last_id += 1
+            event = {**event, "id": self._last_id}
+        else:
+            self._last_id = max(self._last_id, event["id"])
+        self._recent.append(event)
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if subscription.matches(event["topic"]) and not subscription.offer(event):
+                self.overflows += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": EVENTS_BACKEND,
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "overflows": self.overflows,
+            "last_event_id": self._last_id,
+        }
+
+
+broker = EventBroker()
+
+
+class MemoryBackend:
+    """Sự kiện chỉ đi trong process hiện tại"""
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(self, event: dict) -> None:
+        broker.dispatch(event)
+
+
+# Cấp id (INCR) và publish trong cùng một lệnh: id tăng đúng theo thứ tự các worker nhận được.
+# Thêm id vào đầu chuỗi JSON thay vì decode/encode lại bằng cjson (giữ nguyên số và mảng rỗng).
+_PUBLISH_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], '{"id":' .. id .. ',' .. string.sub(ARGV[2], 2))
+return id
+"""
+
+
+class RedisBackend:
+    """Các worker publish lên một kênh Redis và cùng nghe kênh đó để phát lại cho client của mình"""
+
+    def __init__(self, url: str, channel: str):
+        self.url = url
+        self.channel = channel
+        self.sequence_key = f"{channel}:last_id"
+        self._redis = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("EVENTS_BACKEND=redis cần cài gói redis (pip install redis)")
+        self._redis = redis.from_url(self.url)
+        self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        broker.dispatch(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lỗi khi nhận sự kiện từ Redis: {str(e)}")
+                await asyncio.sleep(1)
+
+    def publish(self, event: dict) -> None:
+        if self._redis is None:
+            broker.dispatch(event)
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._redis.eval(_PUBLISH_SCRIPT, 1, self.sequence_key, self.channel, json.dumps(event))
+        )
+        task.add_done_callback(_log_publish_error)
+
+
+def _log_publish_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Lỗi khi gửi sự kiện lên Redis: {str(task.exception())}")
+
+
+def _build_backend():
+    if EVENTS_BACKEND == "redis":
+        return RedisBackend(EVENTS_REDIS_URL, EVENTS_REDIS_CHANNEL)
+    return MemoryBackend()
+
+
+_backend = _build_backend()
+
+
+def set_event_backend(backend) -> None:
+    """Dùng backend khác (đối tượng có start/stop/publish), gọi trước khi app khởi động"""
+    global _backend
+    _backend = backend
+
+
+async def start_event_backend() -> None:
+    """Khởi động backend sự kiện (gọi khi khởi động app)"""
+    global _backend
+    try:
+        await _backend.start()
+    except Exception as e:
+        logger.error(f"Không khởi động được backend sự kiện {EVENTS_BACKEND}, dùng memory: {str(e)}")
+        _backend = MemoryBackend()
+
+
+async def stop_event_backend() -> None:
+    await _backend.stop()
+
+
+def publish_event(topic: str, data: Any, schema: Optional[Any] = None) -> None:
+    """
+    Phát sự kiện, gọi sau khi commit. Lỗi khi phát chỉ được ghi log,
+    không làm hỏng request đã ghi dữ liệu thành công.
+    Có schema thì data là đối tượng ORM, payload được dựng bằng schema.from_orm trong cùng guard.
+    """
+    try:
+        if schema is not None:
+            data = schema.from_orm(data)
+        _backend.publish({
+            "topic": topic,
+            "service": SERVICE_NAME,
+            "time": datetime.now().isoformat(),
+            "data": jsonable_encoder(data),
+        })
+    except Exception as e:
+        logger.error(f"Lỗi khi phát sự kiện {topic}: {str(e)}")
+
+
+def _format_sse(event: dict) -> str:
+    payload = {key: event[key] for key in ("topic", "service", "time", "data")}
+    return f"id: {event['id']}\nevent: {event['topic']}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+async def event_stream(topics: List[str], last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """Sinh các khung SSE cho một kết nối, kèm heartbeat; tự hủy đăng ký khi client ngắt"""
+    subscription = broker.subscribe(topics, last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+            if event is _RESYNC:
+                # Client nhận sự kiện không kịp: báo tải lại toàn bộ rồi đóng, client sẽ kết nối lại
+                yield "event: resync\ndata: {}\n\n"
+                return
+            yield _format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
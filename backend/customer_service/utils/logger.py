@@ -1,23 +1,45 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import random
 import sys
+import threading
 from datetime import datetime
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, SocketHandler
 import copy
 
-# Tạo thư mục logs nếu chưa tồn tại
-log_dir = Path("logs")
-log_dir.mkdir(exist_ok=True)
+# Thư mục chứa file log
+log_dir = Path(os.getenv("LOG_DIR", "logs"))
+
+# Mỗi service một file log duy nhất; mặc định lấy theo tên thư mục service đang chạy
+SERVICE_NAME = os.getenv("SERVICE_NAME", Path.cwd().name)
+# Khi chạy nhiều worker, đặt LOG_SOCKET_PORT để mọi worker gửi log về một tiến trình ghi duy nhất
+# (python -m utils.log_server) thay vì cùng ghi và xoay vòng một file
+LOG_SOCKET_HOST = os.getenv("LOG_SOCKET_HOST", "127.0.0.1")
+LOG_SOCKET_PORT = os.getenv("LOG_SOCKET_PORT")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10*1024*1024)))  # 10MB
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+
+# Cấu hình qua biến môi trường
+LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG").upper()
+CONSOLE_LOG_LEVEL = os.getenv("CONSOLE_LOG_LEVEL", "INFO").upper()
+# "text" (mặc định) hoặc "json" (mỗi dòng một object, dễ đưa vào hệ thống thu log)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+# Số record tối đa ghi trong một lượt trước khi flush
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
 
 # Định dạng log cho file
 file_formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
+    '%(asctime)s - %(process)d - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 
 class ColoredFormatter(logging.Formatter):
     """Định dạng log với màu sắc cho console"""
-    
+
     COLORS = {
         'DEBUG': '\033[37m',     # Trắng
         'INFO': '\033[32m',      # Xanh lá
@@ -35,40 +57,180 @@ class ColoredFormatter(logging.Formatter):
         colored_record.msg = f"{color}{colored_record.msg}{self.RESET}"
         return super().format(colored_record)
 
+class JsonFormatter(logging.Formatter):
+    """Định dạng log thành một dòng JSON"""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "service": getattr(record, "service", SERVICE_NAME),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+            "process": record.process,
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """
+    Giữ lại một tỉ lệ record theo từng level, ví dụ LOG_SAMPLE_INFO=0.1 chỉ ghi 10% log INFO.
+    Mặc định giữ tất cả; WARNING trở lên nên để 1.
+    """
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+def _sample_rates() -> dict:
+    rates = {}
+    for level_name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"):
+        raw = os.getenv(f"LOG_SAMPLE_{level_name}")
+        if raw:
+            try:
+                rates[logging.getLevelName(level_name)] = min(max(float(raw), 0.0), 1.0)
+            except ValueError:
+                pass
+    return rates
+
+class _DeferredFlushMixin:
+    """Handler không flush sau mỗi record; QueueListener flush một lần cho cả lượt"""
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        super().flush()
+
+class BatchStreamHandler(_DeferredFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchRotatingFileHandler(_DeferredFlushMixin, RotatingFileHandler):
+    pass
+
+class ServiceFilter(logging.Filter):
+    """Gắn tên service vào record để tiến trình ghi log phân biệt được nguồn"""
+
+    def filter(self, record):
+        record.service = SERVICE_NAME
+        return True
+
+def _build_sink() -> logging.Handler:
+    """Đích ghi log của service: socket tới tiến trình ghi chung, hoặc một file xoay vòng"""
+    if LOG_SOCKET_PORT:
+        handler = SocketHandler(LOG_SOCKET_HOST, int(LOG_SOCKET_PORT))
+    else:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        handler = BatchRotatingFileHandler(
+            log_dir / f"{SERVICE_NAME}.log",
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding='utf-8',
+            delay=True
+        )
+        if LOG_FORMAT == "json":
+            handler.setFormatter(JsonFormatter())
+        else:
+            handler.setFormatter(file_formatter)
+    handler.setLevel(logging.DEBUG)
+    return handler
+
+class BatchingQueueListener(QueueListener):
+    """Luồng nền lấy record từ queue theo lượt và ghi ra các handler, flush một lần mỗi lượt"""
+
+    def __init__(self, log_queue, *handlers, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is self._sentinel:
+                    stop = True
+                    continue
+                self.handle(record)
+            for handler in self.handlers:
+                if hasattr(handler, "flush_batch"):
+                    handler.flush_batch()
+            if stop:
+                break
+
+_log_queue = queue.SimpleQueue()
+_queue_handler = None
+_listener = None
+_pipeline_lock = threading.Lock()
+
+def _build_pipeline() -> QueueHandler:
+    """Tạo queue dùng chung cho cả process và khởi động luồng ghi log"""
+    global _queue_handler, _listener
+    with _pipeline_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
+        # Handler cho console với màu sắc
+        console_handler = BatchStreamHandler(sys.stdout)
+        console_handler.setLevel(CONSOLE_LOG_LEVEL)
+        if LOG_FORMAT == "json":
+            console_handler.setFormatter(JsonFormatter())
+        else:
+            console_handler.setFormatter(ColoredFormatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            ))
+        # Một đích ghi duy nhất cho cả service thay vì một file cho mỗi module
+        sink_handler = _build_sink()
+
+        # Thread của event loop chỉ đưa record vào queue, việc format và ghi file do listener làm
+        _queue_handler = QueueHandler(_log_queue)
+        _queue_handler.setLevel(LOG_LEVEL)
+        _queue_handler.addFilter(SamplingFilter(_sample_rates()))
+        _queue_handler.addFilter(ServiceFilter())
+
+        _listener = BatchingQueueListener(_log_queue, console_handler, sink_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _queue_handler
+
+def shutdown_logging() -> None:
+    """Ghi nốt các record còn trong queue và dừng luồng ghi log"""
+    global _listener
+    with _pipeline_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
 def setup_logger(name: str, log_file: str = None, allow_propagate: bool = False) -> logging.Logger:
-    """Thiết lập logger với tên và file log cụ thể"""
+    """
+    Thiết lập logger với tên cụ thể, ghi qua queue dùng chung của process.
+    log_file được giữ để tương thích, mọi logger giờ ghi chung vào đích của service.
+    """
     logger = logging.getLogger(name)
-    
+
     # Nếu logger đã được cấu hình, trả về logger đó
     if logger.handlers:
         return logger
-    
+
     logger.setLevel(logging.DEBUG)
     # Ngăn log được truyền lên logger cha (default logger) để tránh in trùng lặp
     logger.propagate = allow_propagate
-
-    # Handler cho console với màu sắc
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_formatter = ColoredFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-
-    # Handler cho file nếu được chỉ định
-    if log_file:
-        file_path = log_dir / f"{log_file}.log"
-        file_handler = RotatingFileHandler(
-            file_path,
-            maxBytes=10*1024*1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+    logger.addHandler(_build_pipeline())
 
     return logger
 
@@ -77,4 +239,4 @@ def setup_logger(name: str, log_file: str = None, allow_propagate: bool = False)
 
 def get_logger(name: str) -> logging.Logger:
     """Lấy logger theo tên module"""
-    return setup_logger(f"{name}", name, False)
\ No newline at end of file
+    return setup_logger(f"{name}", name, False)
@@ -0,0 +1,163 @@
+"""
+Tuần tự hóa JSON nhanh cho response.
+
+- FastJSONResponse: response_class mặc định của app, dùng orjson nếu đã cài, không thì json của thư viện chuẩn
+- list_response(rows, Schema, response): trả danh sách lớn, đọc thẳng thuộc tính của các dòng ORM
+  theo trường của schema thay cho from_orm + kiểm tra response_model trên từng dòng
+
+Dữ liệu đọc từ CSDL đã đúng kiểu nên bỏ qua bước kiểm tra của Pydantic; schema có validator
+thì vẫn đi qua model_validate để giữ nguyên kết quả.
+"""
+import enum
+import json
+import typing
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from uuid import UUID
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson là tùy chọn
+    orjson = None
+
+
+def _default(value: Any):
+    """Kiểu mà orjson/json không tự xử lý, chuyển giống jsonable_encoder của FastAPI"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (UUID, bytes)):
+        return value.decode() if isinstance(value, bytes) else str(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Không tuần tự hóa được kiểu {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse dùng orjson (nếu có), nhận được cả datetime, Enum, Decimal, model Pydantic"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Cách lấy từng trường: (tên, loại, schema con, giá trị mặc định)
+_VALUE, _INT, _FLOAT, _MODEL, _MODEL_LIST = range(5)
+_plans: Dict[type, Optional[List[Tuple[str, int, Optional[type], Any]]]] = {}
+
+
+def _unwrap_optional(annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _has_validators(schema: Type[BaseModel]) -> bool:
+    # Validator và serializer đều làm kết quả khác với giá trị đọc thẳng từ CSDL
+    decorators = schema.__pydantic_decorators__
+    return bool(
+        decorators.validators
+        or decorators.field_validators
+        or decorators.model_validators
+        or decorators.field_serializers
+        or decorators.model_serializers
+    )
+
+
+def _plan(schema: Type[BaseModel]):
+    """Danh sách trường của schema cùng cách đọc, tính một lần cho mỗi schema; None nếu phải đi qua Pydantic (có validator/serializer)"""
+    if schema in _plans:
+        return _plans[schema]
+    plan = []
+    if _has_validators(schema):
+        plan = None
+    else:
+        for name, field in schema.model_fields.items():
+            if field.alias and field.alias != name:
+                plan = None
+                break
+            annotation = _unwrap_optional(field.annotation)
+            origin = typing.get_origin(annotation)
+            default = None if field.is_required() else field.get_default(call_default_factory=True)
+            if _is_model(annotation):
+                plan.append((name, _MODEL, annotation, default))
+            elif origin in (list, List) and typing.get_args(annotation) and _is_model(typing.get_args(annotation)[0]):
+                plan.append((name, _MODEL_LIST, typing.get_args(annotation)[0], default))
+            elif annotation is int:
+                plan.append((name, _INT, None, default))
+            elif annotation is float:
+                plan.append((name, _FLOAT, None, default))
+            else:
+                plan.append((name, _VALUE, None, default))
+    _plans[schema] = plan
+    return plan
+
+
+_MISSING = object()
+
+
+def orm_to_dict(obj: Any, schema: Type[BaseModel]) -> Optional[dict]:
+    """Dựng dict theo các trường của schema từ đối tượng ORM (hoặc dict), không qua kiểm tra Pydantic"""
+    if obj is None:
+        return None
+    plan = _plan(schema)
+    if plan is None:
+        return schema.model_validate(obj).model_dump()
+    # Thuộc tính đã nạp của đối tượng ORM nằm sẵn trong __dict__, đọc thẳng nhanh hơn qua descriptor
+    values = obj if isinstance(obj, dict) else getattr(obj, "__dict__", {})
+    data = {}
+    for name, kind, sub_schema, default in plan:
+        value = values.get(name, _MISSING)
+        if value is _MISSING:
+            value = default if values is obj else getattr(obj, name, default)
+        if value is None:
+            pass
+        elif kind == _INT:
+            if type(value) is not int:
+                value = int(value)
+        elif kind == _FLOAT:
+            if type(value) is not float:
+                value = float(value)
+        elif kind == _MODEL:
+            value = orm_to_dict(value, sub_schema)
+        elif kind == _MODEL_LIST:
+            value = [orm_to_dict(item, sub_schema) for item in value]
+        data[name] = value
+    return data
+
+
+def list_response(rows: Iterable[Any], schema: Type[BaseModel], response: Optional[Response] = None) -> FastJSONResponse:
+    """
+    Trả danh sách theo schema mà không qua response_model (FastAPI bỏ qua bước kiểm tra khi endpoint trả Response).
+    Header đã gắn vào response được tiêm vào endpoint (X-Next-Cursor, ETag, ...) được giữ lại.
+    """
+    content = [orm_to_dict(row, schema) for row in rows]
+    result = FastJSONResponse(content)
+    if response is not None:
+        result.headers.raw.extend(
+            (key, value) for key, value in response.headers.raw if key not in (b"content-length", b"content-type")
+        )
+        if response.status_code:
+            result.status_code = response.status_code
+    return result
@@ -0,0 +1,425 @@
+"""
+Tìm khách hàng theo một phần họ tên, số điện thoại hoặc biển số xe, chỉ mục nằm trong bộ nhớ.
+
+- Văn bản được bỏ dấu tiếng Việt (NFD, bỏ dấu kết hợp, đ -> d), chữ thường; số điện thoại và biển số
+  chỉ giữ chữ và số ("59A-123.45" -> "59a12345")
+- Tìm theo tiền tố trên danh sách đã sắp xếp (bisect), tìm chuỗi con bằng trigram rồi kiểm tra lại từng ứng viên
+- Chỉ mục được dựng từ CSDL trong tác vụ nền khi khởi động (chưa xong thì /search trả 503), sau đó cập nhật
+  từng dòng theo sự kiện customer.* / motorcycle.* mà crud phát sau khi commit. Sự kiện chỉ mang id,
+  dòng mới được đọc lại từ CSDL (không đưa họ tên, số điện thoại lên kênh SSE).
+  Chạy nhiều worker cần EVENTS_BACKEND=redis để worker nào cũng nhận được thay đổi.
+"""
+import asyncio
+import bisect
+import os
+import re
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+
+from utils.events import broker
+from utils.logger import get_logger, SERVICE_NAME
+
+logger = get_logger(__name__)
+
+# Tắt (0) trên worker không cần tìm kiếm: chỉ mục 500k khách hàng chiếm vài trăm MB
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "1") != "0"
+# Số dòng đọc mỗi lượt khi dựng chỉ mục
+SEARCH_LOAD_BATCH_SIZE = int(os.getenv("SEARCH_LOAD_BATCH_SIZE", "5000"))
+# Số ứng viên tối đa kiểm tra cho một truy vấn chuỗi con, giữ thời gian trả lời khi từ khóa quá phổ biến
+SEARCH_MAX_SCAN = int(os.getenv("SEARCH_MAX_SCAN", "50000"))
+# Chờ trước khi dựng lại khi không đọc được CSDL
+SEARCH_RETRY_SECONDS = float(os.getenv("SEARCH_RETRY_SECONDS", "10"))
+
+SEARCH_TOPICS = ("customer", "motorcycle")
+
+# Loại văn bản của mỗi doc
+NAME, PHONE, PLATE = 0, 1, 2
+FIELD_NAMES = ("fullname", "phone_num", "license_plate")
+
+# Mức khớp, nhỏ hơn xếp trước
+EXACT, PREFIX, WORD, CONTAINS = 0, 1, 2, 3
+MATCH_NAMES = ("exact", "prefix", "word", "contains")
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold_text(value: Optional[str]) -> str:
+    """Bỏ dấu tiếng Việt, chữ thường, ký tự khác chữ/số thành một khoảng trắng: "Nguyễn  Văn Đức" -> "nguyen van duc" """
+    if not value:
+        return ""
+    # đ không tách được bằng NFD
+    value = unicodedata.normalize("NFD", value.replace("đ", "d").replace("Đ", "D"))
+    # Sau NFD dấu là ký tự kết hợp (ngoài ASCII), bỏ khi mã hóa ASCII
+    value = value.encode("ascii", "ignore").decode("ascii").lower()
+    return _NON_ALNUM.sub(" ", value).strip()
+
+
+def compact_text(value: Optional[str]) -> str:
+    """Như fold_text nhưng bỏ cả khoảng trắng, dùng cho số điện thoại và biển số"""
+    return fold_text(value).replace(" ", "")
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """
+    Mỗi khách hàng có hai doc liền nhau (họ tên, số điện thoại), mỗi xe một doc biển số.
+    Doc không bao giờ bị xóa khỏi danh sách; khi đổi nội dung, trigram cũ còn trỏ tới doc
+    nhưng bị loại ở bước kiểm tra lại văn bản hiện tại.
+    """
+
+    def __init__(self):
+        self._texts: List[Optional[str]] = []  # văn bản đã chuẩn hóa, None nếu đã xóa
+        self._raw: List[Optional[str]] = []  # giá trị gốc để trả về
+        self._kinds = array("b")
+        self._owners = array("i")  # customer_id của doc
+        self._customer_docs: Dict[int, int] = {}  # customer_id -> doc họ tên (doc số điện thoại = +1)
+        self._plate_docs: Dict[int, int] = {}  # motocycle_id -> doc biển số
+        self._grams: Dict[str, array] = {}
+        # Theo từng loại: văn bản đã sắp xếp và doc tương ứng, cho tìm theo tiền tố
+        self._sorted_texts: List[List[str]] = [[], [], []]
+        self._sorted_docs: List[array] = [array("i"), array("i"), array("i")]
+        self._loading = True
+
+    def __len__(self) -> int:
+        return len(self._customer_docs)
+
+    def stats(self) -> dict:
+        return {
+            "customers": len(self._customer_docs),
+            "motorcycles": len(self._plate_docs),
+            "docs": len(self._texts),
+            "trigrams": len(self._grams),
+            "postings": sum(len(postings) for postings in self._grams.values()),
+        }
+
+    # Cập nhật
+
+    def _new_doc(self, kind: int, owner: int) -> int:
+        doc = len(self._texts)
+        self._texts.append(None)
+        self._raw.append(None)
+        self._kinds.append(kind)
+        self._owners.append(owner)
+        return doc
+
+    def _set_text(self, doc: int, raw: Optional[str], text: str) -> None:
+        old = self._texts[doc]
+        # Số điện thoại thường không cần chuẩn hóa: dùng chung một chuỗi cho hai danh sách
+        text = raw if text == raw else (text or None)
+        self._raw[doc] = raw
+        if old == text:
+            return
+        if old is not None and not self._loading:
+            self._sorted_remove(doc, old)
+        self._texts[doc] = text
+        if text is None:
+            return
+        grams = self._grams
+        for gram in (_trigrams(text) - _trigrams(old)) if old else _trigrams(text):
+            postings = grams.get(gram)
+            if postings is None:
+                postings = grams[gram] = array("i")
+            postings.append(doc)
+        if not self._loading:
+            kind = self._kinds[doc]
+            position = bisect.bisect_left(self._sorted_texts[kind], text)
+            self._sorted_texts[kind].insert(position, text)
+            self._sorted_docs[kind].insert(position, doc)
+
+    def _sorted_remove(self, doc: int, text: str) -> None:
+        texts, docs = self._sorted_texts[self._kinds[doc]], self._sorted_docs[self._kinds[doc]]
+        position = bisect.bisect_left(texts, text)
+        while position < len(texts) and texts[position] == text:
+            if docs[position] == doc:
+                del texts[position]
+                del docs[position]
+                return
+            position += 1
+
+    def upsert_customer(self, customer_id: int, fullname: Optional[str], phone_num: Optional[str]) -> None:
+        doc = self._customer_docs.get(customer_id)
+        if doc is None:
+            doc = self._new_doc(NAME, customer_id)
+            self._new_doc(PHONE, customer_id)
+            self._customer_docs[customer_id] = doc
+        self._set_text(doc, fullname, fold_text(fullname))
+        self._set_text(doc + 1, phone_num, compact_text(phone_num))
+
+    def remove_customer(self, customer_id: int) -> None:
+        doc = self._customer_docs.pop(customer_id, None)
+        if doc is not None:
+            self._set_text(doc, None, "")
+            self._set_text(doc + 1, None, "")
+
+    def upsert_motorcycle(self, motocycle_id: int, customer_id: Optional[int], license_plate: Optional[str]) -> None:
+        doc = self._plate_docs.get(motocycle_id)
+        if doc is not None and self._owners[doc] != (customer_id or 0):
+            # Xe đổi chủ: bỏ doc cũ, tạo doc mới cho chủ mới
+            self._set_text(doc, None, "")
+            doc = None
+        if doc is None:
+            doc = self._new_doc(PLATE, customer_id or 0)
+            self._plate_docs[motocycle_id] = doc
+        self._set_text(doc, license_plate, compact_text(license_plate))
+
+    def remove_motorcycle(self, motocycle_id: int) -> None:
+        doc = self._plate_docs.pop(motocycle_id, None)
+        if doc is not None:
+            self._set_text(doc, None, "")
+
+    def finish_load(self) -> None:
+        """Sắp xếp một lần sau khi nạp hàng loạt; từ đây mỗi thay đổi chèn thẳng vào danh sách đã sắp xếp"""
+        for kind in (NAME, PHONE, PLATE):
+            order = sorted(
+                (doc for doc, text in enumerate(self._texts) if text is not None and self._kinds[doc] == kind),
+                key=self._texts.__getitem__,
+            )
+            self._sorted_texts[kind] = [self._texts[doc] for doc in order]
+            self._sorted_docs[kind] = array("i", order)
+        self._loading = False
+
+    # Tìm kiếm
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        top-k khách hàng khớp query, mỗi khách hàng một dòng với lần khớp tốt nhất.
+        Thứ tự: khớp toàn bộ, khớp đầu (theo chữ cái), khớp đầu một từ trong họ tên, chứa chuỗi (theo thứ tự thêm vào).
+        """
+        text = fold_text(query)
+        compact = text.replace(" ", "")
+        if not compact:
+            return []
+        if compact.isdigit():
+            passes = [(compact, (PHONE, PLATE))]
+        else:
+            passes = [(text, (NAME,)), (compact, (PLATE,))]
+
+        best: Dict[int, Tuple[tuple, int]] = {}
+        for value, kinds in passes:
+            self._prefix_matches(value, kinds, limit, best)
+        if sum(1 for rank, _ in best.values() if rank[0] <= PREFIX) < limit:
+            for value, kinds in passes:
+                self._substring_matches(value, kinds, limit, best)
+
+        results = []
+        for rank, doc in sorted(best.values())[:limit]:
+            owner = self._owners[doc]
+            customer_doc = self._customer_docs.get(owner)
+            if customer_doc is None:
+                continue
+            kind = self._kinds[doc]
+            results.append({
+                "customer_id": owner,
+                "fullname": self._raw[customer_doc],
+                "phone_num": self._raw[customer_doc + 1],
+                "license_plate": self._raw[doc] if kind == PLATE else None,
+                "matched_field": FIELD_NAMES[kind],
+                "match": MATCH_NAMES[rank[0]],
+            })
+        return results
+
+    def _offer(self, best: Dict[int, Tuple[tuple, int]], doc: int, rank: tuple) -> bool:
+        """Giữ lần khớp tốt nhất cho mỗi khách hàng; True nếu khách hàng mới"""
+        owner = self._owners[doc]
+        current = best.get(owner)
+        if current is None or rank < current[0]:
+            best[owner] = (rank, doc)
+        return current is None
+
+    def _prefix_matches(self, value: str, kinds: Tuple[int, ...], limit: int, best: dict) -> None:
+        for kind in kinds:
+            texts, docs = self._sorted_texts[kind], self._sorted_docs[kind]
+            position = bisect.bisect_left(texts, value)
+            found = 0
+            while position < len(texts) and found < limit and texts[position].startswith(value):
+                doc = docs[position]
+                tier = EXACT if texts[position] == value else PREFIX
+                found += self._offer(best, doc, (tier, texts[position], doc))
+                position += 1
+
+    def _substring_matches(self, value: str, kinds: Tuple[int, ...], limit: int, best: dict) -> None:
+        grams = _trigrams(value)
+        if not grams:
+            return
+        postings = []
+        for gram in grams:
+            candidates = self._grams.get(gram)
+            if candidates is None:
+                return
+            postings.append(candidates)
+        # Duyệt danh sách ngắn nhất, kiểm tra lại văn bản hiện tại của từng doc
+        candidates = min(postings, key=len)
+        texts, doc_kinds = self._texts, self._kinds
+        word = " " + value
+        strong = sum(1 for rank, _ in best.values() if rank[0] <= WORD)
+        for doc in candidates[:SEARCH_MAX_SCAN]:
+            if doc_kinds[doc] not in kinds:
+                continue
+            text = texts[doc]
+            if text is None or value not in text:
+                continue
+            if text.startswith(value):
+                rank = (EXACT if text == value else PREFIX, text, doc)
+            elif word in text:
+                rank = (WORD, "", doc)
+            else:
+                rank = (CONTAINS, "", doc)
+            previous = best.get(self._owners[doc])
+            self._offer(best, doc, rank)
+            if rank[0] <= WORD and (previous is None or previous[0][0] > WORD):
+                strong += 1
+                # Đủ kết quả khớp đầu từ thì các doc còn lại không thể xếp trên
+                if strong >= limit:
+                    return
+
+
+_index: Optional[SearchIndex] = None
+_task: Optional[asyncio.Task] = None
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Chỉ mục hiện tại, None khi đang dựng lần đầu hoặc bị tắt"""
+    return _index
+
+
+async def _load(index: SearchIndex) -> None:
+    from db.session import AsyncSessionLocal
+    from models.models import Customer, Motocycle
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select(Customer.customer_id, Customer.fullname, Customer.phone_num)
+            .execution_options(yield_per=SEARCH_LOAD_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            for customer_id, fullname, phone_num in rows:
+                index.upsert_customer(customer_id, fullname, phone_num)
+        result = await db.stream(
+            select(Motocycle.motocycle_id, Motocycle.customer_id, Motocycle.license_plate)
+            .execution_options(yield_per=SEARCH_LOAD_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            for motocycle_id, customer_id, license_plate in rows:
+                index.upsert_motorcycle(motocycle_id, customer_id, license_plate)
+
+
+async def _refresh(index: SearchIndex, events: List[dict]) -> None:
+    """Đọc lại các dòng được nhắc tới trong sự kiện; dòng không còn thì bỏ khỏi chỉ mục"""
+    from db.session import AsyncSessionLocal
+    from models.models import Customer, Motocycle
+
+    customer_ids, moto_ids = set(), set()
+    for event in events:
+        if event.get("service") != SERVICE_NAME:
+            continue
+        data = event.get("data") or {}
+        if event["topic"].startswith("customer.") and data.get("customer_id") is not None:
+            customer_ids.add(data["customer_id"])
+        elif event["topic"].startswith("motorcycle.") and data.get("motocycle_id") is not None:
+            moto_ids.add(data["motocycle_id"])
+    if not customer_ids and not moto_ids:
+        return
+
+    async with AsyncSessionLocal() as db:
+        if customer_ids:
+            result = await db.execute(
+                select(Customer.customer_id, Customer.fullname, Customer.phone_num)
+                .where(Customer.customer_id.in_(customer_ids))
+            )
+            for customer_id, fullname, phone_num in result.all():
+                index.upsert_customer(customer_id, fullname, phone_num)
+                customer_ids.discard(customer_id)
+        if moto_ids:
+            result = await db.execute(
+                select(Motocycle.motocycle_id, Motocycle.customer_id, Motocycle.license_plate)
+                .where(Motocycle.motocycle_id.in_(moto_ids))
+            )
+            for motocycle_id, customer_id, license_plate in result.all():
+                index.upsert_motorcycle(motocycle_id, customer_id, license_plate)
+                moto_ids.discard(motocycle_id)
+    for customer_id in customer_ids:
+        index.remove_customer(customer_id)
+    for motocycle_id in moto_ids:
+        index.remove_motorcycle(motocycle_id)
+
+
+def _drain(subscription) -> Tuple[List[dict], bool]:
+    """Lấy hết sự kiện đang chờ; True nếu hàng đợi từng bị tràn (đã mất sự kiện)"""
+    events, overflowed = [], False
+    while not subscription.queue.empty():
+        event = subscription.queue.get_nowait()
+        if isinstance(event, dict):
+            events.append(event)
+        else:
+            overflowed = True
+    return events, overflowed
+
+
+async def build_search_index(subscription=None) -> SearchIndex:
+    """Dựng chỉ mục mới từ CSDL rồi thay chỉ mục đang dùng; sự kiện đến trong lúc dựng được áp dụng sau khi nạp xong"""
+    global _index
+    while True:
+        started = time.perf_counter()
+        index = SearchIndex()
+        await _load(index)
+        # Sắp xếp mất vài giây với 500k khách hàng: chạy trong thread để event loop vẫn phục vụ request
+        await asyncio.to_thread(index.finish_load)
+        if subscription is None:
+            break
+        events, overflowed = _drain(subscription)
+        if not overflowed:
+            await _refresh(index, events)
+            break
+    _index = index
+    logger.info(
+        f"Đã dựng chỉ mục tìm kiếm trong {time.perf_counter() - started:.1f}s: "
+        f"{len(index)} khách hàng, {index.stats()['motorcycles']} xe"
+    )
+    return index
+
+
+async def _run() -> None:
+    subscription = broker.subscribe(SEARCH_TOPICS)
+    try:
+        while True:
+            try:
+                index = await build_search_index(subscription)
+                while True:
+                    event = await subscription.queue.get()
+                    events, overflowed = _drain(subscription)
+                    if overflowed or not isinstance(event, dict):
+                        logger.warning("Hàng đợi sự kiện của chỉ mục tìm kiếm bị tràn, dựng lại chỉ mục")
+                        break
+                    await _refresh(index, [event] + events)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Lỗi khi cập nhật chỉ mục tìm kiếm: {str(e)}")
+                await asyncio.sleep(SEARCH_RETRY_SECONDS)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+def start_search_index() -> None:
+    """Dựng chỉ mục và theo dõi thay đổi trong tác vụ nền (gọi khi khởi động app)"""
+    global _task
+    if SEARCH_INDEX_ENABLED and (_task is None or _task.done()):
+        _task = asyncio.get_running_loop().create_task(_run())
+
+
+async def stop_search_index() -> None:
+    global _task
+    if _task is not None:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
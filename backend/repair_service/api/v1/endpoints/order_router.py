@@ -1,13 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 
 from utils.logger import get_logger
+from utils.auth import require_roles
+from utils.pagination import set_next_cursor
+from utils.responses import list_response
+from utils.export import ExportFormat, export_response
 from db.session import get_db
-from schemas.order import OrderCreate, OrderUpdate, OrderResponse
+from schemas.order_status_history import OrderStatusEnum
+from schemas.order import OrderCreate, OrderUpdate, OrderResponse, OrderBoardItem, OrderBundleResponse, OrderTotalsRecomputeResponse
 from crud import order as order_crud
+from crud import order_total as order_total_crud
 from .url import URLS
 
 router = APIRouter()
@@ -15,10 +22,42 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get(URLS['ORDER']['GET_ALL_ORDERS'], response_model=List[OrderResponse])
-async def get_all_orders(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_all_orders(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    db: AsyncSession = Depends(get_db)
+):
     """Lấy danh sách đơn hàng"""
-    db_order = await order_crud.get_all(db, skip=skip, limit=limit)
-    return db_order
+    db_order = await order_crud.get_all(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_order, limit, "order_id")
+    return list_response(db_order, OrderResponse, response)
+
+@router.get(URLS['ORDER']['GET_ORDER_BOARD'], response_model=List[OrderBoardItem])
+async def get_order_board(
+    staff_id: Optional[int] = None,
+    statuses: List[OrderStatusEnum] = Query([], description="Lọc theo trạng thái, bỏ trống để lấy các đơn chưa giao"),
+    limit: int = Query(500, ge=1, le=2000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Các đơn đang xử lý cùng trạng thái hiện tại trong một truy vấn, thay cho việc gọi lịch sử từng đơn"""
+    board = await order_crud.get_order_board(
+        db, staff_id=staff_id, statuses=[s.value for s in statuses], limit=limit
+    )
+    return list_response(board, OrderBoardItem)
+
+@router.get(URLS['ORDER']['EXPORT_ORDERS'], response_class=StreamingResponse)
+async def export_orders(
+    start_date: datetime = Query(..., description="Ngày bắt đầu (bao gồm)"),
+    end_date: datetime = Query(..., description="Ngày kết thúc (bao gồm)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv hoặc ndjson")
+):
+    """Xuất toàn bộ đơn hàng trong khoảng thời gian (không giới hạn số dòng), gửi dần từng phần"""
+    if start_date >= end_date:
+        raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
+    filename = f"orders_{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+    return export_response(order_crud.export_orders_query(start_date, end_date), OrderResponse, format, filename)
 
 @router.get(URLS['ORDER']['GET_ORDER_BY_ID'], response_model=OrderResponse)
 async def get_orders_by_id(order_id: int, db: AsyncSession = Depends(get_db)):
@@ -27,10 +66,18 @@ async def get_orders_by_id(order_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Không tìm thấy đơn hàng")
     return OrderResponse.from_orm(db_order)
 
+@router.get(URLS['ORDER']['GET_ORDER_BUNDLE'], response_model=OrderBundleResponse)
+async def get_order_bundle(order_id: int, db: AsyncSession = Depends(get_db)):
+    """Lấy đơn hàng cùng chẩn đoán, chi tiết dịch vụ, phụ tùng và lịch sử trạng thái trong một lần gọi"""
+    db_order = await order_crud.get_order_bundle(db, order_id=order_id)
+    if db_order is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy đơn hàng")
+    return OrderBundleResponse.from_orm(db_order)
+
 @router.get(URLS['ORDER']['GET_ALL_ORDERS_BY_MOTO_ID'], response_model=List[OrderResponse])
 async def get_orders_by_moto_id(motocycle_id: int, db: AsyncSession = Depends(get_db)):
     db_orders = await order_crud.get_orders_by_motorcycle_id(db, motocycle_id=motocycle_id)
-    return db_orders
+    return list_response(db_orders, OrderResponse)
 
 @router.post(URLS['ORDER']['CREATE_ORDER'], response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_order(order: OrderCreate, db: AsyncSession = Depends(get_db)):
@@ -83,9 +130,23 @@ async def get_all_orders_by_staff_id_today(staff_id: int, db: AsyncSession = Dep
     try:
         date = datetime.now().date()
         db_orders = await order_crud.get_orders_with_filters(db, staff_id=staff_id, date=date)
-        return db_orders
+        return list_response(db_orders, OrderResponse)
     except IntegrityError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         logger.error(f"Lỗi khi lấy danh sách đơn hàng của nhân viên trong ngày: {str(e)}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post(URLS['ORDER']['RECOMPUTE_TOTALS'], response_model=OrderTotalsRecomputeResponse)
+async def recompute_order_totals(
+    order_ids: List[int] = Query([], description="Danh sách đơn hàng cần kiểm tra, bỏ trống để kiểm tra tất cả"),
+    dry_run: bool = Query(False, description="Chỉ báo cáo các đơn lệch, không sửa"),
+    db: AsyncSession = Depends(get_db),
+    current_staff: dict = Depends(require_roles("manager"))
+):
+    """Kiểm tra và tính lại tổng tiền đơn hàng từ các dòng chi tiết được chọn (chỉ quản lý)"""
+    try:
+        return await order_total_crud.recompute_order_totals(db, order_ids=order_ids, dry_run=dry_run)
+    except Exception as e:
+        logger.error(f"Lỗi khi tính lại tổng tiền đơn hàng: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Lỗi hệ thống khi tính lại tổng tiền đơn hàng")
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
 from db.session import get_db
 from schemas.part_order_detail import PartOrderDetailCreate, PartOrderDetailUpdate, PartOrderDetailResponse
 from crud import part_order_detail as crud
@@ -13,8 +14,15 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get(URLS['PART_ORDER_DETAIL']['GET_ALL_PART_ORDER_DETAILS'], response_model=List[PartOrderDetailResponse])
-async def get_all_part_order_details(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    db_part_order_details = await crud.get_all_part_order_details(db, skip=skip, limit=limit)
+async def get_all_part_order_details(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    db: AsyncSession = Depends(get_db)
+):
+    db_part_order_details = await crud.get_all_part_order_details(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_part_order_details, limit, "part_detail_ID")
     return db_part_order_details
 
 @router.get(URLS['PART_ORDER_DETAIL']['GET_ALL_PART_ORDER_DETAILS_BY_ORDER'], response_model=List[PartOrderDetailResponse])
@@ -33,7 +41,7 @@ async def get_part_order_detail_by_id(part_detail_ID: int, db: AsyncSession = De
 async def create_part_order_detail(part_detail: List[PartOrderDetailCreate], db: AsyncSession = Depends(get_db)):
     try:
         db_part_detail = await crud.create_part_order_details(db=db, part_detail=part_detail)
-        return [PartOrderDetailResponse.from_orm(part) for part in db_part_detail]
+        return db_part_detail
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Lỗi toàn vẹn dữ liệu khi tạo chi tiết phụ tùng đơn hàng: {str(e)} | Dữ liệu: {part_detail.dict()}")
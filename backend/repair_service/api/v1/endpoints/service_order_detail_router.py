@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
 from db.session import get_db
 from schemas.service_order_detail import ServiceOrderDetailCreate, ServiceOrderDetailUpdate, ServiceOrderDetailResponse
 from crud import service_order_detail as crud
@@ -13,8 +14,15 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get(URLS['SERVICE_ORDER_DETAIL']['GET_ALL_SERVICE_ORDER_DETAILS'], response_model=List[ServiceOrderDetailResponse])
-async def get_all_service_order_details(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    db_service_detail = await crud.get_all_service_order_details(db, skip=skip, limit=limit)
+async def get_all_service_order_details(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
+    db: Session = Depends(get_db)
+):
+    db_service_detail = await crud.get_all_service_order_details(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_service_detail, limit, "service_detail_ID")
     return db_service_detail
 
 @router.get(URLS['SERVICE_ORDER_DETAIL']['GET_SERVICE_ORDER_DETAIL_BY_ID'], response_model=ServiceOrderDetailResponse)
@@ -34,7 +42,7 @@ async def create_service_order_details(service_detail: List[ServiceOrderDetailCr
     """Create a new service order detail"""
     try:
         db_service_detail = await crud.create_service_order_detail(db=db, service_detail=service_detail)
-        return [ServiceOrderDetailResponse.from_orm(service) for service in db_service_detail]
+        return db_service_detail
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Lỗi toàn vẹn dữ liệu khi tạo chi tiết phụ tùng đơn hàng: {str(e)} | Dữ liệu: {service_detail.dict()}")
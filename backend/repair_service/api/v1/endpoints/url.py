@@ -2,11 +2,15 @@ URLS = {
     'ORDER': {
         'CREATE_ORDER':'/order/create',
         'GET_ALL_ORDERS':'/orders',
+        'GET_ORDER_BOARD':'/orders/board',
         'GET_ALL_ORDERS_BY_MOTO_ID':'/orders/motorcycle/{motocycle_id}',
         'GET_ORDER_BY_ID':'/order/{order_id}',
+        'GET_ORDER_BUNDLE':'/order/{order_id}/bundle',
         'UPDATE_ORDER':'/order/update/{order_id}',
         'ASSIGN_STAFF':'/order/{order_id}/assign-staff/{staff_id}',
         'GET_ALL_ORDERS_BY_STAFF_ID_TODAY':'/orders/staff/{staff_id}/today',
+        'RECOMPUTE_TOTALS':'/orders/recompute-totals',
+        'EXPORT_ORDERS':'/orders/export',
     },
     'DIAGNOSIS':{
         'CREATE_DIAGNOSIS':'/diagnosis/create',
@@ -32,5 +36,13 @@ URLS = {
         'GET_SERVICE_ORDER_DETAIL_BY_ID':'/service-order-detail/{service_detail_ID}',
         'GET_SERVICE_ORDER_DETAILS_BY_ORDER':'/order/service-order-details/{order_id}',
         'UPDATE_SERVICE_ORDER_DETAIL':'/service-order-detail/update/{service_detail_ID}'
-    }
-}
\ No newline at end of file
+    },
+    'EVENTS': {
+        'STREAM': '/events/stream',
+    },
+    'MONITORING': {
+        'DB_POOL': '/monitoring/db-pool',
+        'METRICS': '/metrics',
+        'SLOW_QUERIES': '/monitoring/slow-queries',
+    },
+}
@@ -1,20 +1,29 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import update, delete
+from sqlalchemy import update, delete, func
 from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
+from typing import List, Optional
 
 from utils.logger import get_logger
-from models.models import Order
+from utils.pagination import paginate
+from utils.events import publish_event
+from utils.responses import orm_to_dict
+from models.models import Order, OrderStatusHistory
 from schemas.order import OrderCreate, OrderUpdate, OrderResponse
+from schemas.order_status_history import OrderStatusHistoryCreate, OrderStatusHistoryResponse
+from crud.order_status_history import add_order_status_history
 
 logger = get_logger(__name__)
 
+# Các trạng thái còn hiển thị trên bảng theo dõi của kỹ thuật viên
+ACTIVE_ORDER_STATUSES = ('received', 'checking', 'wait_confirm', 'repairing', 'wait_delivery')
+
 async def create_order(db: AsyncSession, order: OrderCreate) -> Order:
     """Tạo đơn hàng mới trong cơ sở dữ liệu"""
     try:
-        logger.info(f"Tạo đơn hàng mới với thông tin: {order}")
+        logger.debug("Tạo đơn hàng mới với thông tin: %s", order)
         db_order = None
         if order.staff_id == 0:
             db_order = Order(motocycle_id=order.motocycle_id, status=order.status)
@@ -24,23 +33,77 @@ async def create_order(db: AsyncSession, order: OrderCreate) -> Order:
         db.add(db_order)
         await db.commit()
         await db.refresh(db_order)
+        publish_event("order.created", db_order, OrderResponse)
         return db_order
     except Exception as e:
         await db.rollback()
         logger.error(f"Lỗi không xác định khi tạo đơn hàng: {str(e)}")
         raise ValueError("Lỗi không xác định khi tạo đơn hàng")
     
-async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Order]:
-    """Lấy danh sách đơn hàng với phân trang"""
-    result = await db.execute(select(Order).order_by(Order.order_id.asc()).offset(skip).limit(limit))
+async def get_all(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Order]:
+    """Lấy danh sách đơn hàng với phân trang (offset hoặc cursor)"""
+    result = await db.execute(paginate(select(Order), [Order.order_id], after, skip, limit))
     return result.scalars().all()
 
+def export_orders_query(start_date: datetime, end_date: datetime):
+    """Truy vấn xuất đơn hàng trong khoảng thời gian, theo thứ tự ngày tạo"""
+    return (
+        select(Order)
+        .where(Order.created_at >= start_date, Order.created_at <= end_date)
+        .order_by(Order.created_at, Order.order_id)
+    )
+
 async def get_order_by_id(db: AsyncSession, order_id: int) -> Order:
     """Lấy thông tin đơn hàng theo ID"""
     result = await db.execute(select(Order).where(Order.order_id == order_id))
     db_order = result.scalar_one_or_none()
     return db_order
 
+async def get_order_bundle(db: AsyncSession, order_id: int) -> Optional[Order]:
+    """
+    Lấy đơn hàng kèm chẩn đoán, chi tiết dịch vụ, phụ tùng và lịch sử trạng thái.
+    Mỗi quan hệ được nạp bằng một câu IN, tổng số truy vấn cố định (5) bất kể số dòng chi tiết.
+    """
+    result = await db.execute(
+        select(Order)
+        .where(Order.order_id == order_id)
+        .options(
+            selectinload(Order.diagnosis),
+            selectinload(Order.service_details),
+            selectinload(Order.part_details),
+            selectinload(Order.status_history),
+        )
+    )
+    return result.scalar_one_or_none()
+
+async def get_order_board(db: AsyncSession, staff_id: Optional[int] = None, statuses: Optional[List[str]] = None, limit: int = 500) -> list:
+    """
+    Bảng theo dõi: các đơn đang xử lý cùng trạng thái hiện tại và thời điểm đổi trạng thái gần nhất.
+    Order.status được cập nhật cùng lịch sử nên chỉ cần một truy vấn; mốc thời gian lấy bằng
+    subquery tương quan trên index (order_id, changed_at) của OrderStatusHistory.
+    """
+    status_changed_at = (
+        select(func.max(OrderStatusHistory.changed_at))
+        .where(OrderStatusHistory.order_id == Order.order_id)
+        .correlate(Order)
+        .scalar_subquery()
+        .label("status_changed_at")
+    )
+    query = (
+        select(Order, status_changed_at)
+        .where(Order.status.in_(statuses or ACTIVE_ORDER_STATUSES))
+        .order_by(Order.created_at, Order.order_id)
+        .limit(limit)
+    )
+    if staff_id:
+        query = query.where(Order.staff_id == staff_id)
+    result = await db.execute(query)
+    # Dựng dict trực tiếp từ dòng ORM (orm_to_dict), không kiểm tra Pydantic trên từng đơn
+    return [
+        {**orm_to_dict(db_order, OrderResponse), "status_changed_at": changed_at}
+        for db_order, changed_at in result.all()
+    ]
+
 async def get_orders_by_motorcycle_id(db: AsyncSession, motocycle_id: int) -> list[Order]:
     result = await db.execute(select(Order).where(Order.motocycle_id == motocycle_id))
     db_order = result.scalars().all()
@@ -53,11 +116,25 @@ async def update_order(db: AsyncSession, order_id: int, order: OrderUpdate) -> O
         raise ValueError(f"Không tìm thấy đơn hàng với ID: {order_id}")
 
     update_data = order.dict(exclude_unset=True)
+    new_status = update_data.pop("status", None)
     for key, value in update_data.items():
         setattr(db_order, key, value)
 
+    # Đổi trạng thái qua lịch sử để Order.status và OrderStatusHistory không lệch nhau
+    db_status_history = None
+    if new_status is not None and new_status != db_order.status:
+        db_status_history = await add_order_status_history(db, OrderStatusHistoryCreate(
+            order_id=order_id,
+            status=new_status,
+            changed_by=db_order.staff_id or 0,
+        ))
+
     await db.commit()
     await db.refresh(db_order)
+    publish_event("order.updated", db_order, OrderResponse)
+    if db_status_history is not None:
+        await db.refresh(db_status_history)
+        publish_event("order.status_changed", db_status_history, OrderStatusHistoryResponse)
     return db_order
 
 async def delete_order(db: AsyncSession, order_id: int) -> str:
@@ -68,13 +145,14 @@ async def delete_order(db: AsyncSession, order_id: int) -> str:
 
     await db.delete(db_order)
     await db.commit()
+    publish_event("order.deleted", {"order_id": order_id})
 
     return f"Đơn hàng với ID {order_id} đã được xóa thành công."
 
-async def get_orders_with_filters(db: AsyncSession, staff_id: int = None, status: str = None, start_date: datetime = None, end_date: datetime = None, date: datetime.date = None, skip: int = 0, limit: int = 100) -> list[Order]:
+async def get_orders_with_filters(db: AsyncSession, staff_id: int = None, status: str = None, start_date: datetime = None, end_date: datetime = None, date: datetime.date = None, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Order]:
     """Lấy danh sách đơn hàng với các bộ lọc"""
     try:
-        query = select(Order).order_by(Order.order_id.asc()).offset(skip).limit(limit)
+        query = select(Order)
 
         if staff_id:
             query = query.where(Order.staff_id == staff_id)
@@ -93,6 +171,7 @@ async def get_orders_with_filters(db: AsyncSession, staff_id: int = None, status
         elif end_date:
             query = query.where(Order.created_at <= end_date)
 
+        query = paginate(query, [Order.order_id], after, skip, limit)
         result = await db.execute(query)
         logger.info("Lấy thành công các đơn hàng với bộ lọc")
         return result.scalars().all()
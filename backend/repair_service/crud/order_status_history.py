@@ -2,9 +2,11 @@ from pymysql import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from sqlalchemy.future import select
+from sqlalchemy import exists, update
 from utils.logger import get_logger
+from utils.events import publish_event
 
-from models.models import OrderStatusHistory
+from models.models import Order, OrderStatusHistory
 from schemas.order_status_history import OrderStatusHistoryCreate, OrderStatusHistoryResponse
 
 logger = get_logger(__name__)
@@ -16,19 +18,47 @@ async def get_order_status_history_by_id(db: AsyncSession, history_id: int) -> O
     return db_status_history
 
 async def get_status_history_by_order(db: AsyncSession, order_id: int) -> List[OrderStatusHistory]:
-    """Lấy lịch sử trạng thái đơn hàng theo order_id"""
-    result = await db.execute(select(OrderStatusHistory).where(OrderStatusHistory.order_id == order_id))
+    """Lấy lịch sử trạng thái đơn hàng theo order_id, sắp theo thời gian thay đổi"""
+    result = await db.execute(
+        select(OrderStatusHistory)
+        .where(OrderStatusHistory.order_id == order_id)
+        .order_by(OrderStatusHistory.changed_at, OrderStatusHistory.history_id)
+    )
     db_status_history = result.scalars().all()
     return db_status_history
 
-async def create_order_status_history(db: AsyncSession, status_history: OrderStatusHistoryCreate) -> OrderStatusHistory:
-    """Tạo lịch sử thay đổi trạng thái đơn hàng mới trong cơ sở dữ liệu"""
+async def add_order_status_history(db: AsyncSession, status_history: OrderStatusHistoryCreate) -> OrderStatusHistory:
+    """
+    Thêm mốc trạng thái và cập nhật Order.status trong transaction hiện tại, không commit.
+    Order.status chỉ đổi khi bản ghi mới là mốc muộn nhất, ghi bù một mốc cũ không làm lùi trạng thái.
+    """
     db_status_history = OrderStatusHistory(**status_history.dict())
+    logger.debug("Creating order status history: %s", db_status_history)
+    db.add(db_status_history)
+    await db.flush()
+    newer_history = (
+        select(OrderStatusHistory.history_id)
+        .where(
+            OrderStatusHistory.order_id == db_status_history.order_id,
+            OrderStatusHistory.changed_at > db_status_history.changed_at,
+        )
+    )
+    await db.execute(
+        update(Order)
+        .where(Order.order_id == db_status_history.order_id, ~exists(newer_history))
+        .values(status=db_status_history.status)
+        .execution_options(synchronize_session=False)
+    )
+    return db_status_history
+
+async def create_order_status_history(db: AsyncSession, status_history: OrderStatusHistoryCreate) -> OrderStatusHistory:
+    """Tạo lịch sử thay đổi trạng thái đơn hàng và cập nhật Order.status trong cùng transaction"""
     try:
-        logger.info(f"Creating order status history: {db_status_history}")
-        db.add(db_status_history)
+        db_status_history = await add_order_status_history(db, status_history)
         await db.commit()
         await db.refresh(db_status_history)
+        # Bảng theo dõi cập nhật trạng thái đơn từ sự kiện này thay vì tải lại lịch sử
+        publish_event("order.status_changed", db_status_history, OrderStatusHistoryResponse)
         return db_status_history
 
     except Exception as e:
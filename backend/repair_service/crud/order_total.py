@@ -0,0 +1,196 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from utils.logger import get_logger
+from models.models import Order, ServiceOrderDetail, PartOrderDetail
+
+logger = get_logger(__name__)
+
+# Số đơn hàng được kiểm tra trong mỗi lượt khi tính lại hàng loạt
+RECOMPUTE_BATCH_SIZE = 500
+# Số đơn lệch tối đa được liệt kê chi tiết trong báo cáo
+MAX_REPORTED_MISMATCHES = 1000
+
+
+def service_line_total(price: Optional[int], is_selected: Optional[bool]) -> int:
+    """Thành tiền của một dòng dịch vụ (dịch vụ luôn có số lượng 1)"""
+    return (price or 0) if is_selected else 0
+
+
+def part_line_total(price: Optional[int], quantity: Optional[int], is_selected: Optional[bool]) -> int:
+    """Thành tiền của một dòng phụ tùng"""
+    return (price or 0) * (1 if quantity is None else quantity) if is_selected else 0
+
+
+class OrderTotalDelta:
+    """Gom chênh lệch tổng tiền theo đơn hàng để ghi một lần trước khi commit"""
+
+    def __init__(self):
+        self._deltas: Dict[int, int] = defaultdict(int)
+
+    def add(self, order_id: Optional[int], amount: int) -> None:
+        if order_id is not None and amount:
+            self._deltas[order_id] += amount
+
+    def add_service_lines(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.add(row.get("order_id"), service_line_total(row.get("price"), row.get("is_selected")))
+
+    def add_part_lines(self, rows: Iterable[dict]) -> None:
+        for row in rows:
+            self.add(row.get("order_id"), part_line_total(row.get("price"), row.get("quantity"), row.get("is_selected")))
+
+    async def apply(self, db: AsyncSession) -> None:
+        """
+        Cộng chênh lệch vào Order.total_price ngay trong transaction hiện tại.
+        Dùng total_price = total_price + delta để các request đồng thời không ghi đè lẫn nhau.
+        """
+        for order_id in sorted(self._deltas):
+            amount = self._deltas[order_id]
+            if not amount:
+                continue
+            await db.execute(
+                update(Order)
+                .where(Order.order_id == order_id)
+                .values(total_price=func.coalesce(Order.total_price, 0) + amount)
+                .execution_options(synchronize_session=False)
+            )
+        self._deltas.clear()
+
+
+def _computed_total_expression():
+    # Tổng tiền tính từ chi tiết, dạng subquery tương quan theo Order.order_id
+    service_total = (
+        select(func.coalesce(func.sum(ServiceOrderDetail.price), 0))
+        .where(ServiceOrderDetail.order_id == Order.order_id, ServiceOrderDetail.is_selected.is_(True))
+        .scalar_subquery()
+    )
+    part_total = (
+        select(func.coalesce(func.sum(PartOrderDetail.price * func.coalesce(PartOrderDetail.quantity, 1)), 0))
+        .where(PartOrderDetail.order_id == Order.order_id, PartOrderDetail.is_selected.is_(True))
+        .scalar_subquery()
+    )
+    return service_total + part_total
+
+
+def _computed_totals_query(order_ids: List[int]):
+    service_totals = (
+        select(
+            ServiceOrderDetail.order_id.label("order_id"),
+            func.sum(case((ServiceOrderDetail.is_selected.is_(True), ServiceOrderDetail.price), else_=0)).label("total"),
+        )
+        .where(ServiceOrderDetail.order_id.in_(order_ids))
+        .group_by(ServiceOrderDetail.order_id)
+        .subquery()
+    )
+    part_totals = (
+        select(
+            PartOrderDetail.order_id.label("order_id"),
+            func.sum(
+                case(
+                    (PartOrderDetail.is_selected.is_(True), PartOrderDetail.price * func.coalesce(PartOrderDetail.quantity, 1)),
+                    else_=0,
+                )
+            ).label("total"),
+        )
+        .where(PartOrderDetail.order_id.in_(order_ids))
+        .group_by(PartOrderDetail.order_id)
+        .subquery()
+    )
+    return (
+        select(
+            Order.order_id,
+            Order.total_price,
+            (func.coalesce(service_totals.c.total, 0) + func.coalesce(part_totals.c.total, 0)).label("computed_total"),
+        )
+        .outerjoin(service_totals, service_totals.c.order_id == Order.order_id)
+        .outerjoin(part_totals, part_totals.c.order_id == Order.order_id)
+        .where(Order.order_id.in_(order_ids))
+        .order_by(Order.order_id)
+    )
+
+
+async def recompute_order_totals(db: AsyncSession, order_ids: Optional[List[int]] = None, dry_run: bool = False, batch_size: int = RECOMPUTE_BATCH_SIZE) -> dict:
+    """
+    Tính lại tổng tiền từ các dòng chi tiết và sửa những đơn hàng bị lệch.
+    Không truyền order_ids thì duyệt toàn bộ đơn hàng theo từng lượt batch_size đơn.
+    """
+    checked = 0
+    mismatched = 0
+    mismatches = []
+    last_order_id = 0
+    pending_ids = sorted(set(order_ids)) if order_ids else None
+
+    try:
+        while True:
+            if pending_ids is not None:
+                batch_ids, pending_ids = pending_ids[:batch_size], pending_ids[batch_size:]
+            else:
+                result = await db.execute(
+                    select(Order.order_id)
+                    .where(Order.order_id > last_order_id)
+                    .order_by(Order.order_id)
+                    .limit(batch_size)
+                )
+                batch_ids = list(result.scalars().all())
+            if not batch_ids:
+                break
+            last_order_id = batch_ids[-1]
+
+            result = await db.execute(_computed_totals_query(batch_ids))
+            batch_mismatches = []
+            for row in result.all():
+                checked += 1
+                computed_total = int(row.computed_total or 0)
+                if (row.total_price or 0) != computed_total:
+                    batch_mismatches.append({
+                        "order_id": row.order_id,
+                        "stored_total": row.total_price or 0,
+                        "computed_total": computed_total,
+                    })
+
+            if batch_mismatches and not dry_run:
+                # Tính lại ngay trong câu UPDATE để không ghi đè chênh lệch của request khác vừa commit
+                await db.execute(
+                    update(Order)
+                    .where(Order.order_id.in_([mismatch["order_id"] for mismatch in batch_mismatches]))
+                    .values(total_price=_computed_total_expression())
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            mismatched += len(batch_mismatches)
+            mismatches.extend(batch_mismatches[:MAX_REPORTED_MISMATCHES - len(mismatches)])
+
+        if mismatched:
+            logger.warning(f"Phát hiện {mismatched}/{checked} đơn hàng lệch tổng tiền (dry_run={dry_run})")
+        return {
+            "checked": checked,
+            "mismatched": mismatched,
+            "fixed": 0 if dry_run else mismatched,
+            "dry_run": dry_run,
+            "mismatches": mismatches,
+        }
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Lỗi khi tính lại tổng tiền đơn hàng: {str(e)}")
+        raise ValueError("Lỗi khi tính lại tổng tiền đơn hàng")
+
+
+async def _recompute_all(dry_run: bool) -> dict:
+    from db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await recompute_order_totals(db, dry_run=dry_run)
+
+
+if __name__ == "__main__":
+    # Chạy riêng từ thư mục service: python -m crud.order_total [--dry-run]
+    import sys
+
+    report = asyncio.run(_recompute_all(dry_run="--dry-run" in sys.argv))
+    print(f"Đã kiểm tra {report['checked']} đơn hàng, lệch {report['mismatched']}, đã sửa {report['fixed']}")
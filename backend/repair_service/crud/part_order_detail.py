@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -7,29 +7,29 @@ from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from db.bulk import bulk_insert
+from crud.order_total import OrderTotalDelta, part_line_total
 from models.models import PartOrderDetail
 from schemas.part_order_detail import PartOrderDetailCreate, PartOrderDetailUpdate, PartOrderDetailResponse
 
 logger = get_logger(__name__)
 
-async def create_part_order_details(db: AsyncSession, part_detail: List[PartOrderDetailCreate]) -> list[PartOrderDetail]:
+async def create_part_order_details(db: AsyncSession, part_detail: List[PartOrderDetailCreate]) -> list[PartOrderDetailResponse]:
     """Tạo mới một danh sách chi tiết đơn hàng phụ tùng"""
     try:
-        db_part_order_details = []
-        for part in part_detail:
-            # Tạo đối tượng PartOrderDetail từ từng phần tử trong danh sách
-            db_part_order_detail = PartOrderDetail(**part.dict())
-            db.add(db_part_order_detail)
-            db_part_order_details.append(db_part_order_detail)
+        rows = [part.dict() for part in part_detail]
 
-        # Commit tất cả thay đổi
-        await db.commit()
+        # Cập nhật tổng tiền trước khi chèn chi tiết, cùng một transaction
+        totals = OrderTotalDelta()
+        totals.add_part_lines(rows)
+        await totals.apply(db)
 
-        # Làm mới tất cả các đối tượng đã thêm
-        for db_part_order_detail in db_part_order_details:
-            await db.refresh(db_part_order_detail)
+        # Chèn tất cả các dòng bằng một câu lệnh, không refresh từng dòng sau khi commit
+        ids = await bulk_insert(db, PartOrderDetail, rows)
+        await db.commit()
 
-        return db_part_order_details
+        return [PartOrderDetailResponse(part_detail_ID=part_detail_ID, **row) for part_detail_ID, row in zip(ids, rows)]
     except IntegrityError as e:
         logger.error(f"Lỗi toàn vẹn dữ liệu khi tạo chi tiết phụ tùng đơn hàng: {str(e)}")
         await db.rollback()
@@ -39,9 +39,9 @@ async def create_part_order_details(db: AsyncSession, part_detail: List[PartOrde
         await db.rollback()
         raise e
 
-async def get_all_part_order_details(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[PartOrderDetail]:
+async def get_all_part_order_details(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[PartOrderDetail]:
     """Lấy tất cả chi tiết đơn hàng phụ tùng"""
-    result = await db.execute(select(PartOrderDetail).order_by(PartOrderDetail.part_detail_ID.asc()).offset(skip).limit(limit))
+    result = await db.execute(paginate(select(PartOrderDetail), [PartOrderDetail.part_detail_ID], after, skip, limit))
     return result.scalars().all()
 
 async def get_all_part_order_details_by_order_id(db: AsyncSession, order_id: int) -> list[PartOrderDetail]:
@@ -57,14 +57,25 @@ async def get_part_order_detail_by_id(db: AsyncSession, part_detail_ID: int) ->
 
 async def update_part_order_detail(db: AsyncSession, part_detail_ID: int, part_detail: PartOrderDetailUpdate) -> PartOrderDetail:
     """Cập nhật thông tin chi tiết đơn hàng phụ tùng"""
-    db_part_order_detail = await get_part_order_detail_by_id(db, part_detail_ID)
+    # Khóa dòng chi tiết để hai lần cập nhật đồng thời không tính chênh lệch trên cùng giá trị cũ
+    result = await db.execute(
+        select(PartOrderDetail).where(PartOrderDetail.part_detail_ID == part_detail_ID).with_for_update()
+    )
+    db_part_order_detail = result.scalars().one_or_none()
     if not db_part_order_detail:
         raise  ValueError(f"Không tìm thấy chi tiết đơn hàng phụ tùng với ID: {part_detail_ID}")
-    
+
+    old_total = part_line_total(db_part_order_detail.price, db_part_order_detail.quantity, db_part_order_detail.is_selected)
     update_data = part_detail.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_part_order_detail, key, value)
-    
+
+    totals = OrderTotalDelta()
+    totals.add(
+        db_part_order_detail.order_id,
+        part_line_total(db_part_order_detail.price, db_part_order_detail.quantity, db_part_order_detail.is_selected) - old_total
+    )
+    await totals.apply(db)
     await db.commit()
     await db.refresh(db_part_order_detail)
     return db_part_order_detail
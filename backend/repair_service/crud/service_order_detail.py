@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import update, delete
@@ -6,30 +6,30 @@ from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from db.bulk import bulk_insert
+from crud.order_total import OrderTotalDelta, service_line_total
 from models.models import ServiceOrderDetail
 from schemas.service_order_detail import ServiceOrderDetailCreate, ServiceOrderDetailUpdate, ServiceOrderDetailResponse
 
 logger = get_logger(__name__)
 
-async def create_service_order_detail(db: AsyncSession, service_detail: List[ServiceOrderDetailCreate]) -> List[ServiceOrderDetail]:
+async def create_service_order_detail(db: AsyncSession, service_detail: List[ServiceOrderDetailCreate]) -> List[ServiceOrderDetailResponse]:
     """Tạo mới ServiceOrderDetail"""
     
     try:
-        db_service_order_details = []
-        for service in service_detail:
-            # Tạo đối tượng PartOrderDetail từ từng phần tử trong danh sách
-            db_service_order_detail = ServiceOrderDetail(**service.dict())
-            db.add(db_service_order_detail)
-            db_service_order_details.append(db_service_order_detail)
-
-        # Commit tất cả thay đổi
-        await db.commit()
+        rows = [service.dict() for service in service_detail]
+
+        # Cập nhật tổng tiền trước khi chèn chi tiết, cùng một transaction
+        totals = OrderTotalDelta()
+        totals.add_service_lines(rows)
+        await totals.apply(db)
 
-        # Làm mới tất cả các đối tượng đã thêm
-        for db_service_order_detail in db_service_order_details:
-            await db.refresh(db_service_order_detail)
+        # Chèn tất cả các dòng bằng một câu lệnh, không refresh từng dòng sau khi commit
+        ids = await bulk_insert(db, ServiceOrderDetail, rows)
+        await db.commit()
 
-        return db_service_order_details
+        return [ServiceOrderDetailResponse(service_detail_ID=service_detail_ID, **row) for service_detail_ID, row in zip(ids, rows)]
     except IntegrityError as e:
         logger.error(f"Lỗi toàn vẹn dữ liệu khi tạo chi tiết phụ tùng đơn hàng: {str(e)}")
         await db.rollback()
@@ -65,10 +65,13 @@ async def create_service_order_detail(db: AsyncSession, service_detail: List[Ser
     #     await db.rollback()
     #     raise e
 
-async def get_all_service_order_details(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[ServiceOrderDetail]:
+async def get_all_service_order_details(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[ServiceOrderDetail]:
     """Lấy tất cả ServiceOrderDetail"""
     result = await db.execute(
-        select(ServiceOrderDetail).options(selectinload(ServiceOrderDetail.order)).order_by(ServiceOrderDetail.service_detail_ID.asc()).offset(skip).limit(limit)
+        paginate(
+            select(ServiceOrderDetail).options(selectinload(ServiceOrderDetail.order)),
+            [ServiceOrderDetail.service_detail_ID], after, skip, limit
+        )
     )
     return result.scalars().all()
 
@@ -86,14 +89,25 @@ async def get_all_service_details_by_order_id(db: AsyncSession, order_id: int) -
 
 async def update_service_order_detail(db: AsyncSession, service_detail_ID: int, service_detail: ServiceOrderDetailUpdate) -> ServiceOrderDetail:
     """Cập nhật ServiceOrderDetail""" 
-    db_service_order_detail = await get_service_order_detail_by_id(db, service_detail_ID)
+    # Khóa dòng chi tiết để hai lần cập nhật đồng thời không tính chênh lệch trên cùng giá trị cũ
+    result = await db.execute(
+        select(ServiceOrderDetail).where(ServiceOrderDetail.service_detail_ID == service_detail_ID).with_for_update()
+    )
+    db_service_order_detail = result.scalars().one_or_none()
     if not db_service_order_detail:
         raise ValueError(f"Không tìm dịch vụ với ID: {service_detail_ID}")
-        
+
+    old_total = service_line_total(db_service_order_detail.price, db_service_order_detail.is_selected)
     update_data = service_detail.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_service_order_detail, key, value)
-        
+
+    totals = OrderTotalDelta()
+    totals.add(
+        db_service_order_detail.order_id,
+        service_line_total(db_service_order_detail.price, db_service_order_detail.is_selected) - old_total
+    )
+    await totals.apply(db)
     await db.commit()
     await db.refresh(db_service_order_detail)
     return db_service_order_detail
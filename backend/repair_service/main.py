@@ -5,13 +5,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import OperationalError
 
 from db.session import init_db
+from utils.auth import start_revocation_refresher, stop_revocation_refresher
+from utils.metrics import MetricsMiddleware
+from utils.events import start_event_backend, stop_event_backend
+from utils.responses import FastJSONResponse
 from api.v1.endpoints.diagnosis_router import router as diagnosis_router
 from api.v1.endpoints.order_router import router as order_router
 from api.v1.endpoints.order_status_history_router import router as order_status_history_router
 from api.v1.endpoints.part_order_detail_router import router as part_order_detail_router
 from api.v1.endpoints.service_order_detail_router import router as service_order_detail_router
+from api.v1.endpoints.monitoring_router import router as monitoring_router
+from api.v1.endpoints.events_router import router as events_router
 
-app = FastAPI(title="Repair Service API", version="1.0.0")
+# Response mặc định tuần tự hóa bằng orjson (nếu có)
+app = FastAPI(title="Repair Service API", version="1.0.0", default_response_class=FastJSONResponse)
 
 # Đăng ký các router
 app.include_router(order_router, prefix="/api/v1", tags=["order"])
@@ -19,6 +26,8 @@ app.include_router(diagnosis_router, prefix="/api/v1", tags=["diagnosis"])
 app.include_router(order_status_history_router, prefix="/api/v1", tags=["order-status-history"])
 app.include_router(part_order_detail_router, prefix="/api/v1", tags=["part-order-detail"])
 app.include_router(service_order_detail_router, prefix="/api/v1", tags=["service-order-detail"])
+app.include_router(monitoring_router, prefix="/api/v1", tags=["monitoring"])
+app.include_router(events_router, prefix="/api/v1", tags=["events"])
 
 # Cấu hình CORS cho phép truy cập từ các nguồn khác nhau
 app.add_middleware(
@@ -27,7 +36,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor phân trang keyset
 )
+# Đo thời gian xử lý và số truy vấn của mỗi request (thêm sau cùng để bao ngoài các middleware khác)
+app.add_middleware(MetricsMiddleware)
 
 # @asynccontextmanager
 # async def lifespan(app: FastAPI):
@@ -76,9 +88,19 @@ async def operational_error_handler(request, exc):
 async def startup_event():
     """Khởi động ứng dụng và kết nối đến cơ sở dữ liệu."""
     await init_db()
+    # Làm mới định kỳ danh sách nhân viên bị khóa cho phần xác thực JWT
+    start_revocation_refresher()
+    # Kênh phát sự kiện cho SSE (/events/stream)
+    await start_event_backend()
     print("Accset docs: http://localhost:8002/docs")
     print("Server is running...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Dừng các tác vụ nền khi tắt ứng dụng."""
+    await stop_revocation_refresher()
+    await stop_event_backend()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="localhost", port=8002, log_level="info", reload=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Unicode, String, Boolean, ForeignKey, DateTime, Text, Enum, CheckConstraint
+from sqlalchemy import Column, Integer, Unicode, String, Boolean, ForeignKey, DateTime, Text, Enum, CheckConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -15,7 +15,7 @@ class Diagnosis(Base):
     estimated_cost = Column(Integer)
     
     # Relationships
-    # order = relationship("Order", back_populates="diagnosis")
+    order = relationship("Order", back_populates="diagnosis")
     
 
 class Order(Base):
@@ -30,14 +30,22 @@ class Order(Base):
     status = Column(Enum('received',  'checking',   'wait_confirm', 'repairing', 'wait_delivery', 'delivered', name='order_status'), default = 'received')
     total_price = Column(Integer, default=0)
     
+    # Index cho các bộ lọc theo ngày tạo, nhân viên, trạng thái và xe
+    __table_args__ = (
+        Index('ix_order_created_at', 'created_at'),
+        Index('ix_order_staff_created', 'staff_id', 'created_at'),
+        Index('ix_order_status_created', 'status', 'created_at'),
+        Index('ix_order_motocycle_id', 'motocycle_id'),
+    )
+    
     # Relationships
-    # diagnosis = relationship("Order", back_populates="order")
+    diagnosis = relationship("Diagnosis", back_populates="order", uselist=False)
     # staff = relationship("Staff", back_populates="orders")
     # motocycle_id = relationship("Motocycle", back_populates="orders")
     service_details = relationship("ServiceOrderDetail", back_populates="order")
     part_details = relationship("PartOrderDetail", back_populates="order")
     # invoices = relationship("Invoice", back_populates="order")
-    status_history = relationship("OrderStatusHistory", back_populates="order")
+    status_history = relationship("OrderStatusHistory", back_populates="order", order_by="OrderStatusHistory.changed_at")
 
 class ServiceOrderDetail(Base):
     __tablename__ = 'ServiceOrderDetail'
@@ -96,6 +104,11 @@ class OrderStatusHistory(Base):
     # changed_by = Column(Integer, ForeignKey('Staff.staff_id'))
     changed_by = Column(Integer) 
     
+    # Lịch sử trạng thái luôn được đọc theo đơn hàng, sắp xếp theo thời gian
+    __table_args__ = (
+        Index('ix_orderstatushistory_order_changed', 'order_id', 'changed_at'),
+    )
+    
     # Relationships
     order = relationship("Order", back_populates="status_history")
     # changed_by_staff = relationship("Staff", back_populates="status_changes")
\ No newline at end of file
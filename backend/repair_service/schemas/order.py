@@ -5,6 +5,8 @@ from enum import Enum
 
 from schemas.service_order_detail import ServiceOrderDetailResponse
 from schemas.part_order_detail import PartOrderDetailResponse
+from schemas.order_status_history import OrderStatusHistoryResponse
+from schemas.diagnosis import DiagnosisResponse
 
 class OrderStatusEnum(str, Enum):
 
@@ -36,16 +38,15 @@ class OrderCreate(BaseModel):
         }
 
 class OrderUpdate(BaseModel):
+    # total_price do server tính từ các dòng chi tiết được chọn, không nhận từ client
     staff_id: Optional[int] = None
     status: Optional[OrderStatusEnum] = None
-    total_price: Optional[int] = None
     class Config:
         from_attributes = True
         json_schema_extra = {
             "example": {
                 "staff_id": 1,
-                "status": "wait_confirm",
-                "total_price": 300
+                "status": "wait_confirm"
             }
         }
 
@@ -69,6 +70,72 @@ class OrderResponse(BaseModel):
                 "created_at": "2023-10-01T12:00:00"
             }
         }
+class OrderBoardItem(OrderResponse):
+    """Đơn hàng trên bảng theo dõi, kèm thời điểm đổi sang trạng thái hiện tại"""
+    status_changed_at: Optional[datetime] = None
+
+class OrderBundleResponse(OrderResponse):
+    """Đơn hàng kèm chẩn đoán, chi tiết dịch vụ, phụ tùng và lịch sử trạng thái"""
+    diagnosis: Optional[DiagnosisResponse] = None
+    service_details: List[ServiceOrderDetailResponse] = []
+    part_details: List[PartOrderDetailResponse] = []
+    status_history: List[OrderStatusHistoryResponse] = []
+
+    class Config:
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "order_id": 1,
+                "motocycle_id": 1,
+                "staff_id": 1,
+                "status": OrderStatusEnum.CHECKING,
+                "total_price": 250000,
+                "created_at": "2023-10-01T12:00:00",
+                "diagnosis": {
+                    "diagnosis_id": 1,
+                    "form_id": 1,
+                    "order_id": 1,
+                    "problem": "Xe không khởi động được",
+                    "created_at": "2023-10-01T12:30:00",
+                    "estimated_cost": 500000
+                },
+                "service_details": [
+                    {"service_detail_ID": 1, "order_id": 1, "service_id": 1, "price": 100000, "is_selected": True}
+                ],
+                "part_details": [
+                    {"part_detail_ID": 1, "order_id": 1, "part_id": 1, "price": 150000, "quantity": 1, "is_selected": True}
+                ],
+                "status_history": [
+                    {"order_id": 1, "status": "received", "changed_at": "2023-10-01T12:00:00", "changed_by": 1}
+                ]
+            }
+        }
+
+class OrderTotalMismatch(BaseModel):
+    order_id: int = Field(..., description='Mã đơn hàng')
+    stored_total: int = Field(..., description='Tổng tiền đang lưu')
+    computed_total: int = Field(..., description='Tổng tiền tính từ các dòng chi tiết được chọn')
+
+class OrderTotalsRecomputeResponse(BaseModel):
+    checked: int = Field(..., description='Số đơn hàng đã kiểm tra')
+    mismatched: int = Field(..., description='Số đơn hàng bị lệch tổng tiền')
+    fixed: int = Field(..., description='Số đơn hàng đã được sửa')
+    dry_run: bool = Field(..., description='Chỉ kiểm tra, không ghi')
+    mismatches: List[OrderTotalMismatch] = Field(default_factory=list, description='Danh sách đơn lệch (tối đa 1000)')
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "checked": 1200,
+                "mismatched": 1,
+                "fixed": 1,
+                "dry_run": False,
+                "mismatches": [
+                    {"order_id": 15, "stored_total": 0, "computed_total": 250000}
+                ]
+            }
+        }
+
 # class OrderInDB(OrderBase):
 #     order_id: int
 #     created_at: datetime
@@ -21,7 +21,8 @@ class OrderStatusHistoryBase(BaseModel):
 class OrderStatusHistoryCreate(BaseModel):
     order_id: int = Field(..., description='Mã đơn hàng')
     status: OrderStatusEnum = Field(..., description='Trạng thái đơn hàng')
-    changed_at: datetime = Field(default= datetime.now(), description='Thời gian thay đổi trạng thái')
+    # default_factory: lấy thời điểm tạo request, không phải thời điểm nạp module
+    changed_at: datetime = Field(default_factory=datetime.now, description='Thời gian thay đổi trạng thái')
     changed_by: int = Field(..., description='Mã nhân viên thay đổi trạng thái')
     
     class Config:
@@ -0,0 +1,162 @@
+import asyncio
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+import jwt
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import column, select, table
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ba service dùng chung khóa ký để token do resource_service cấp được xác thực ở mọi nơi.
+# Giá trị mặc định chỉ dùng khi phát triển, môi trường thật phải đặt JWT_SECRET_KEY.
+JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "Su@chuedXem_jffffgM&ar")
+JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
+
+# Chu kỳ (giây) làm mới danh sách nhân viên bị khóa và số ID tối đa được giữ.
+# Chưa có API khóa/xóa nhân viên, trạng thái được đổi trực tiếp trong bảng Staff nên
+# token của nhân viên vừa bị khóa vẫn dùng được tối đa REVOCATION_REFRESH_SECONDS giây.
+REVOCATION_REFRESH_SECONDS = int(os.getenv("AUTH_REVOCATION_REFRESH_SECONDS", "30"))
+REVOCATION_CACHE_SIZE = int(os.getenv("AUTH_REVOCATION_CACHE_SIZE", "4096"))
+
+# Trạng thái nhân viên không còn được phép gọi API
+DISABLED_STAFF_STATUSES = ("off",)
+
+# Chỉ cần hai cột của bảng Staff, khai báo nhẹ để service nào cũng truy vấn được
+_staff_table = table("Staff", column("staff_id"), column("status"))
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/staff/login", auto_error=False)
+
+
+class RevokedStaffCache:
+    """LRU các ID nhân viên bị khóa, được làm mới định kỳ từ bảng Staff."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._ids: "OrderedDict[int, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.last_refresh: Optional[float] = None
+
+    def is_revoked(self, staff_id: int) -> bool:
+        with self._lock:
+            if staff_id in self._ids:
+                self._ids.move_to_end(staff_id)
+                return True
+            return False
+
+    def replace(self, staff_ids: Iterable[int]) -> None:
+        staff_ids = list(staff_ids)
+        if len(staff_ids) > self.maxsize:
+            logger.warning(f"Có {len(staff_ids)} nhân viên bị khóa, vượt quá AUTH_REVOCATION_CACHE_SIZE={self.maxsize}")
+        now = time.time()
+        with self._lock:
+            self._ids = OrderedDict((staff_id, now) for staff_id in staff_ids[-self.maxsize:])
+            self.last_refresh = now
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+revoked_staff = RevokedStaffCache(REVOCATION_CACHE_SIZE)
+_refresher_task: Optional[asyncio.Task] = None
+
+
+async def refresh_revoked_staff() -> int:
+    """Đọc lại danh sách nhân viên bị khóa, trả về số ID đang bị chặn"""
+    from db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(_staff_table.c.staff_id).where(_staff_table.c.status.in_(DISABLED_STAFF_STATUSES))
+        )
+        revoked_staff.replace(result.scalars().all())
+    return len(revoked_staff)
+
+
+async def _refresh_loop():
+    while True:
+        try:
+            await refresh_revoked_staff()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Giữ danh sách cũ nếu không đọc được, thử lại ở lượt sau
+            logger.error(f"Lỗi khi làm mới danh sách nhân viên bị khóa: {str(e)}")
+        await asyncio.sleep(REVOCATION_REFRESH_SECONDS)
+
+
+def start_revocation_refresher() -> None:
+    """Chạy tác vụ nền làm mới danh sách nhân viên bị khóa (gọi khi khởi động app)"""
+    global _refresher_task
+    if _refresher_task is None or _refresher_task.done():
+        _refresher_task = asyncio.get_running_loop().create_task(_refresh_loop())
+
+
+async def stop_revocation_refresher() -> None:
+    global _refresher_task
+    if _refresher_task is not None:
+        _refresher_task.cancel()
+        try:
+            await _refresher_task
+        except asyncio.CancelledError:
+            pass
+        _refresher_task = None
+
+
+def decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """Giải mã và kiểm tra chữ ký, hạn dùng của token; trả về None nếu không hợp lệ"""
+    try:
+        return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM], options={"require": ["exp", "sub"]})
+    except jwt.PyJWTError:
+        return None
+
+
+async def get_current_staff(token: Optional[str] = Depends(oauth2_scheme)) -> Dict[str, Any]:
+    """
+    Lấy nhân viên hiện tại từ JWT mà không truy vấn cơ sở dữ liệu.
+    Vai trò và trạng thái đọc từ claim của token, nhân viên bị khóa bị chặn qua revoked_staff.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if not token:
+        raise credentials_exception
+
+    payload = decode_token(token)
+    if payload is None:
+        raise credentials_exception
+    try:
+        staff_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        raise credentials_exception
+
+    if payload.get("status") in DISABLED_STAFF_STATUSES or revoked_staff.is_revoked(staff_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Tài khoản đã bị khóa")
+
+    return {
+        "staff_id": staff_id,
+        "email": payload.get("email"),
+        "role": payload.get("role"),
+        "status": payload.get("status"),
+        "fullname": payload.get("fullname"),
+    }
+
+
+def require_roles(*roles: str):
+    """Dependency chỉ cho phép các vai trò được liệt kê, ví dụ Depends(require_roles("manager"))"""
+    allowed = {getattr(role, "value", role) for role in roles}
+
+    async def dependency(current_staff: Dict[str, Any] = Depends(get_current_staff)) -> Dict[str, Any]:
+        if current_staff["role"] not in allowed:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền thực hiện thao tác này")
+        return current_staff
+
+    return dependency
@@ -0,0 +1,128 @@
+"""
+Xuất dữ liệu lớn dạng CSV hoặc NDJSON, trả về từng phần trong lúc đọc.
+
+Truy vấn chạy trên session riêng với server-side cursor (stream_scalars + yield_per):
+mỗi lượt chỉ giữ EXPORT_BATCH_SIZE dòng trong bộ nhớ dù kết quả có bao nhiêu dòng.
+"""
+import csv
+import io
+import os
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Type
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from utils.logger import get_logger
+from utils.responses import dumps, orm_to_dict
+
+logger = get_logger(__name__)
+
+# Số dòng đọc từ cursor và ghi ra mỗi lượt
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Excel cần BOM để nhận đúng tiếng Việt trong file CSV UTF-8
+CSV_BOM = "\ufeff"
+
+# Bổ sung dữ liệu cho từng lượt (ví dụ ảnh của biểu mẫu), chạy trên session thứ hai
+BatchExtender = Callable[[Any, List[dict]], Awaitable[None]]
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        # Ghi giống NDJSON (true/false), kiểm tra trước vì bool là int
+        return "true" if value else "false"
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        # Trường lồng (danh sách ảnh, ...) ghi dạng JSON trong một ô
+        return dumps(value).decode("utf-8")
+    return value
+
+
+def _encode_csv(rows: List[dict], fields: List[str]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([_csv_value(row.get(field)) for field in fields] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(rows: List[dict]) -> bytes:
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+async def _stream(
+    query,
+    schema: Type[BaseModel],
+    export_format: ExportFormat,
+    extend: Optional[BatchExtender],
+    batch_size: int,
+    label: str,
+) -> AsyncIterator[bytes]:
+    # Session riêng: session của request (get_db) có thể đã đóng khi response bắt đầu gửi
+    from db.session import AsyncSessionLocal
+
+    fields = list(schema.model_fields)
+    if export_format == ExportFormat.CSV:
+        yield (CSV_BOM + ",".join(fields) + "\r\n").encode("utf-8")
+
+    exported = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            # Cursor đang mở chiếm kết nối, truy vấn bổ sung phải chạy trên kết nối khác
+            side_db = AsyncSessionLocal() if extend is not None else None
+            try:
+                result = await db.stream_scalars(query.execution_options(yield_per=batch_size))
+                async for partition in result.partitions():
+                    rows = [orm_to_dict(obj, schema) for obj in partition]
+                    if extend is not None:
+                        await extend(side_db, rows)
+                    if export_format == ExportFormat.CSV:
+                        yield _encode_csv(rows, fields)
+                    else:
+                        yield _encode_ndjson(rows)
+                    # identity map giữ tham chiếu yếu, đối tượng của lượt đã ghi được giải phóng
+                    exported += len(rows)
+            finally:
+                if side_db is not None:
+                    await side_db.close()
+        logger.info(f"Đã xuất {exported} dòng {label} ({export_format.value})")
+    except Exception as e:
+        # Header đã gửi, không đổi được mã lỗi: ngắt kết nối để client biết file bị thiếu
+        logger.error(f"Lỗi khi xuất {label} sau {exported} dòng: {str(e)}")
+        raise
+
+
+def export_response(
+    query,
+    schema: Type[BaseModel],
+    export_format: ExportFormat,
+    filename: str,
+    extend: Optional[BatchExtender] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    StreamingResponse xuất kết quả của query (select một model ORM) theo các trường của schema.
+    filename không gồm phần mở rộng; query nên có order_by để file ổn định giữa các lần xuất.
+    """
+    return StreamingResponse(
+        _stream(query, schema, export_format, extend, batch_size, filename),
+        media_type=_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
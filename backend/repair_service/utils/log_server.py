@@ -0,0 +1,83 @@
+"""
+Tiến trình ghi log duy nhất cho các worker của service.
+
+Chạy từ thư mục service:
+    python -m utils.log_server            # nghe ở 127.0.0.1:9020
+rồi khởi động các worker với LOG_SOCKET_PORT=9020. Mỗi service được ghi vào logs/<service>.log,
+chỉ tiến trình này mở và xoay vòng file nên nhiều worker không tranh nhau.
+
+Record được gửi dạng pickle (logging.handlers.SocketHandler), chỉ nên nghe trên địa chỉ nội bộ.
+"""
+import logging
+import os
+import pickle
+import socketserver
+import struct
+import threading
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from utils.logger import JsonFormatter, LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT, file_formatter, log_dir
+
+DEFAULT_LOG_SERVER_PORT = 9020
+
+_handlers = {}
+_handlers_lock = threading.Lock()
+
+
+def _handler_for(service: str) -> RotatingFileHandler:
+    with _handlers_lock:
+        handler = _handlers.get(service)
+        if handler is None:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            handler = RotatingFileHandler(
+                Path(log_dir) / f"{service}.log",
+                maxBytes=LOG_MAX_BYTES,
+                backupCount=LOG_BACKUP_COUNT,
+                encoding='utf-8'
+            )
+            handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else file_formatter)
+            _handlers[service] = handler
+        return handler
+
+
+class LogRecordStreamHandler(socketserver.StreamRequestHandler):
+    """Đọc các record (4 byte độ dài + pickle) từ một worker và ghi ra file của service"""
+
+    def handle(self):
+        while True:
+            header = self.connection.recv(4)
+            if len(header) < 4:
+                break
+            length = struct.unpack(">L", header)[0]
+            payload = self.connection.recv(length)
+            while len(payload) < length:
+                chunk = self.connection.recv(length - len(payload))
+                if not chunk:
+                    return
+                payload += chunk
+            record = logging.makeLogRecord(pickle.loads(payload))
+            service = getattr(record, "service", None) or "app"
+            _handler_for(service).handle(record)
+
+
+class LogRecordSocketReceiver(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_LOG_SERVER_PORT) -> None:
+    with LogRecordSocketReceiver((host, port), LogRecordStreamHandler) as server:
+        print(f"Log server đang nghe tại {host}:{port}, ghi vào {log_dir}/")
+        try:
+            server.serve_forever()
+        finally:
+            for handler in _handlers.values():
+                handler.close()
+
+
+if __name__ == "__main__":
+    serve(
+        os.getenv("LOG_SOCKET_HOST", "127.0.0.1"),
+        int(os.getenv("LOG_SOCKET_PORT", str(DEFAULT_LOG_SERVER_PORT))),
+    )
@@ -0,0 +1,266 @@
+"""
+Số liệu thời gian xử lý request và truy vấn cơ sở dữ liệu, xuất theo định dạng text của Prometheus.
+
+- MetricsMiddleware: đo thời gian mỗi request theo route (đường dẫn mẫu, không phải URL thật)
+- instrument_engine(engine): đếm số truy vấn và thời gian truy vấn của từng request
+- render_metrics(): nội dung cho endpoint /metrics
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Ngưỡng (giây) của histogram thời gian xử lý request
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Ngưỡng số truy vấn trong một request; N+1 hiện ra ở các bucket lớn
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Ngưỡng (giây) của histogram thời gian truy vấn
+QUERY_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Route không khớp (404) được gộp một nhãn để số series không tăng theo URL tùy ý
+UNMATCHED_ROUTE = "unmatched"
+# Cho phép tắt đo đạc khi cần (METRICS_ENABLED=0)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+class Histogram:
+    """Histogram tích lũy theo nhãn, đủ để xuất dạng Prometheus."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            # [số đếm mỗi bucket..., +Inf, tổng]
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        else:
+            series[len(self.buckets)] += 1
+        series[-1] += value
+
+    def items(self):
+        return list(self._series.items())
+
+
+class RequestStats:
+    """Số truy vấn và thời gian truy vấn của request đang xử lý"""
+
+    __slots__ = ("queries", "query_seconds", "scope")
+
+    def __init__(self, scope=None):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.scope = scope
+
+
+# Gắn theo request; SQLAlchemy async chạy cursor trong greenlet dùng chung context nên hook đọc được
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.request_latency = Histogram(LATENCY_BUCKETS)
+        self.request_queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.request_query_time = Histogram(LATENCY_BUCKETS)
+        self.query_latency = Histogram(QUERY_LATENCY_BUCKETS)
+        self.requests_in_progress = 0
+
+    def observe_request(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        with self._lock:
+            self.request_latency.observe((method, route, str(status)), elapsed)
+            self.request_queries.observe((method, route), stats.queries)
+            self.request_query_time.observe((method, route), stats.query_seconds)
+
+    def observe_query(self, statement_type: str, elapsed: float) -> None:
+        with self._lock:
+            self.query_latency.observe((statement_type,), elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                self.request_latency.items(),
+                self.request_queries.items(),
+                self.request_query_time.items(),
+                self.query_latency.items(),
+                self.requests_in_progress,
+            )
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware đo thời gian xử lý và số truy vấn của từng request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with metrics._lock:
+            metrics.requests_in_progress += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            with metrics._lock:
+                metrics.requests_in_progress -= 1
+            metrics.observe_request(scope.get("method", ""), route_label(scope), status_code, elapsed, stats)
+
+
+def route_label(scope) -> str:
+    """Đường dẫn mẫu của route đã khớp; router của Starlette ghi route vào scope"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _statement_type(statement: str) -> str:
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    metrics.observe_query(_statement_type(statement), elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+
+
+def instrument_engine(engine) -> None:
+    """Gắn hook đo truy vấn vào engine (AsyncEngine hoặc Engine)"""
+    if not METRICS_ENABLED:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Số liệu truy vấn của request hiện tại (None nếu ngoài request)"""
+    return _request_stats.get()
+
+
+def current_endpoint() -> Optional[str]:
+    """"METHOD route" của request hiện tại, dùng để ghi nguồn gốc truy vấn"""
+    stats = _request_stats.get()
+    if stats is None or stats.scope is None:
+        return None
+    return f"{stats.scope.get('method', '')} {route_label(stats.scope)}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def histogram_lines(name: str, help_text: str, label_names: Tuple[str, ...], histogram_items, buckets) -> List[str]:
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for labels, series in sorted(histogram_items):
+        cumulative = 0
+        for bound, count in zip(buckets, series):
+            cumulative += count
+            le = 'le="%s"' % bound
+            lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+        cumulative += series[len(buckets)]
+        le = 'le="+Inf"'
+        lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(label_names, labels)} {_format_value(series[-1])}")
+        lines.append(f"{name}_count{_labels(label_names, labels)} {cumulative}")
+    return lines
+
+
+def gauge_lines(name: str, help_text: str, samples, metric_type: str = "gauge") -> List[str]:
+    """samples: danh sách (dict nhãn, giá trị)"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        label_names = tuple(labels)
+        lines.append(f"{name}{_labels(label_names, tuple(labels[key] for key in label_names))} {_format_value(value)}")
+    return lines
+
+
+def pool_status_lines(status: dict) -> List[str]:
+    """Chuyển trạng thái pool (get_db_pool_status) sang dạng Prometheus"""
+    pool = status.get("metrics", {})
+    return (
+        gauge_lines("db_pool_checked_out", "Số kết nối đang được dùng", [({}, status.get("checked_out", 0))])
+        + gauge_lines("db_pool_checked_in", "Số kết nối rảnh trong pool", [({}, status.get("checked_in", 0))])
+        + gauge_lines("db_pool_overflow", "Số kết nối vượt pool_size", [({}, status.get("overflow", 0))])
+        + gauge_lines("db_pool_capacity", "Số kết nối tối đa", [({}, status.get("capacity", 0))])
+        + gauge_lines("db_pool_checkouts_total", "Số lần lấy kết nối", [({}, pool.get("checkouts", 0))], "counter")
+        + gauge_lines("db_pool_timeouts_total", "Số lần hết thời gian chờ kết nối", [({}, pool.get("timeouts", 0))], "counter")
+        + gauge_lines("db_pool_wait_seconds_total", "Tổng thời gian chờ kết nối", [({}, pool.get("wait_total_seconds", 0.0))], "counter")
+    )
+
+
+def render_metrics(*extra_sections: List[str]) -> str:
+    """Nội dung /metrics: số liệu request, truy vấn và các phần bổ sung (pool, cache, ...)"""
+    request_latency, request_queries, request_query_time, query_latency, in_progress = metrics.snapshot()
+    lines = []
+    lines += histogram_lines(
+        "http_request_duration_seconds", "Thời gian xử lý request theo route",
+        ("method", "route", "status"), request_latency, LATENCY_BUCKETS,
+    )
+    lines += histogram_lines(
+        "http_request_db_queries", "Số truy vấn cơ sở dữ liệu trong một request",
+        ("method", "route"), request_queries, QUERY_COUNT_BUCKETS,
+    )
+    lines += histogram_lines(
+        "http_request_db_seconds", "Tổng thời gian truy vấn cơ sở dữ liệu trong một request",
+        ("method", "route"), request_query_time, LATENCY_BUCKETS,
+    )
+    lines += histogram_lines(
+        "db_query_duration_seconds", "Thời gian thực thi từng truy vấn theo loại câu lệnh",
+        ("statement",), query_latency, QUERY_LATENCY_BUCKETS,
+    )
+    lines += gauge_lines("http_requests_in_progress", "Số request đang xử lý", [({}, in_progress)])
+    lines += gauge_lines("process_start_time_seconds", "Thời điểm process khởi động", [({}, metrics.started_at)])
+    for section in extra_sections:
+        lines += section
+    return "\n".join(lines) + "\n"
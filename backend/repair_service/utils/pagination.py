@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Date, DateTime, and_, false, or_
+
+# Header chứa cursor của trang kế tiếp
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Mã hóa giá trị khóa của bản ghi cuối trang thành cursor (base64 url-safe)"""
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _coerce(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> List[Any]:
+    """Giải mã cursor thành danh sách giá trị tương ứng với các cột khóa"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("Số lượng giá trị không khớp")
+        return [_coerce(column, value) for column, value in zip(columns, values)]
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor không hợp lệ")
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(column, value, descending: bool):
+    # MySQL coi NULL là nhỏ nhất: đứng đầu khi ASC, đứng cuối khi DESC
+    if descending:
+        if value is None:
+            return false()
+        return or_(column < value, column.is_(None)) if column.nullable else column < value
+    return column.isnot(None) if value is None else column > value
+
+
+def _keyset_condition(columns: Sequence, values: Sequence, descending: bool):
+    # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y), viết tách để MySQL dùng được index
+    conditions = []
+    for i, column in enumerate(columns):
+        equals = [_equal(columns[j], values[j]) for j in range(i)]
+        conditions.append(and_(*equals, _after(column, values[i], descending)))
+    return or_(*conditions)
+
+
+def paginate(
+    query,
+    columns: Sequence,
+    after: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    descending: bool = False,
+):
+    """
+    Sắp xếp và phân trang câu truy vấn theo các cột khóa.
+    Có cursor (after) thì phân trang keyset, không thì dùng offset như cũ.
+    """
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+    if after:
+        values = decode_cursor(after, columns)
+        query = query.where(_keyset_condition(columns, values, descending))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(response: Response, items: Sequence, limit: int, *attrs: str) -> None:
+    """Gắn cursor của trang kế tiếp vào header nếu trang hiện tại đã đầy"""
+    if items and len(items) >= limit:
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(last, attr) for attr in attrs])
@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Header, Query
+from fastapi.responses import StreamingResponse
+
+from utils.events import event_stream
+from utils.logger import get_logger
+from .url import URLS
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(URLS['EVENTS']['STREAM'])
+async def stream_events(
+    topics: List[str] = Query([], description="Tiền tố topic cần nhận, ví dụ reception, appointment.updated; bỏ trống để nhận tất cả"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """Kênh Server-Sent Events: nhận sự kiện tạo/cập nhật thay vì tải lại danh sách theo chu kỳ."""
+    return StreamingResponse(
+        event_stream(topics, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from db.session import get_db
 from crud import invoice as invoice_crud
-from schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
+from crud import invoice_stats as invoice_stats_crud
+from schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse, InvoiceStatsResponse, InvoiceStatsRebuildResponse
+from utils.auth import require_roles
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.export import ExportFormat, export_response
+from utils.responses import list_response
 from .url import URLS
 
 router = APIRouter()
@@ -31,8 +37,10 @@ async def create_invoice(invoice_data: InvoiceCreate, db: AsyncSession = Depends
 
 @router.get(URLS['INVOICE']['GET_ALL_INVOICES'], response_model=List[InvoiceResponse])
 async def get_all_invoices(
+    response: Response,
     skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
     limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -40,17 +48,20 @@ async def get_all_invoices(
     
     - Trả về danh sách các hóa đơn trong cơ sở dữ liệu.
     """
-    invoices = await invoice_crud.get_all_invoices(db, skip=skip, limit=limit)
+    invoices = await invoice_crud.get_all_invoices(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, invoices, limit, "invoice_id")
     logger.info("Fetched all invoices successfully")
     
-    return invoices
+    return list_response(invoices, InvoiceResponse, response)
 
 @router.get(URLS['INVOICE']['GET_INVOICES_BY_DATE_RANGE'], response_model=List[InvoiceResponse])
 async def get_invoices_by_date_range(
+    response: Response,
     start_date: datetime = Query(..., description="Ngày bắt đầu"),
     end_date: datetime = Query(..., description="Ngày kết thúc"),
     skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
     limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -63,15 +74,18 @@ async def get_invoices_by_date_range(
         logger.error("Ngày bắt đầu phải trước ngày kết thúc")
         raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
     
-    invoices = await invoice_crud.get_invoices_by_date_range(db, start_date, end_date, skip=skip, limit=limit)
+    invoices = await invoice_crud.get_invoices_by_date_range(db, start_date, end_date, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, invoices, limit, "create_at", "invoice_id")
     logger.info(f"Fetched {len(invoices)} invoices in date range successfully")
     
-    return invoices
+    return list_response(invoices, InvoiceResponse, response)
 
 @router.get(URLS['INVOICE']['GET_ALL_TODAY'], response_model=List[InvoiceResponse])
 async def get_invoices_today(
+    response: Response,
     skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
     limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -82,15 +96,18 @@ async def get_invoices_today(
     today_start = datetime.combine(today, datetime.min.time())
     today_end = datetime.combine(tomorrow, datetime.min.time())
     
-    invoices = await invoice_crud.get_invoices_by_date_range(db, today_start, today_end, skip=skip, limit=limit)
+    invoices = await invoice_crud.get_invoices_by_date_range(db, today_start, today_end, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, invoices, limit, "create_at", "invoice_id")
     logger.info(f"Fetched {len(invoices)} invoices for today successfully")
     
-    return invoices
+    return list_response(invoices, InvoiceResponse, response)
 
 @router.get(URLS['INVOICE']['FILTER'], response_model=List[InvoiceResponse])
 async def filter_invoices(
+    response: Response,
     skip: int = Query(0, ge=0, description="Số bản ghi bỏ qua"),
     limit: int = Query(100, ge=1, le=100, description="Số bản ghi lấy tối đa"),
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     staff_id: Optional[int] = Query(None, description="Lọc theo ID nhân viên"),
     start_date: Optional[datetime] = Query(None, description="Ngày bắt đầu"),
     end_date: Optional[datetime] = Query(None, description="Ngày kết thúc"),
@@ -108,12 +125,64 @@ async def filter_invoices(
         start_date=start_date, 
         end_date=end_date,
         skip=skip,
-        limit=limit
+        limit=limit,
+        after=after
     )
+    set_next_cursor(response, invoices, limit, "create_at", "invoice_id")
     
     logger.info("Fetched invoices with filters successfully")
     
-    return invoices
+    return list_response(invoices, InvoiceResponse, response)
+
+@router.get(URLS['INVOICE']['EXPORT'], response_class=StreamingResponse)
+async def export_invoices(
+    start_date: datetime = Query(..., description="Ngày bắt đầu (bao gồm)"),
+    end_date: datetime = Query(..., description="Ngày kết thúc (bao gồm)"),
+    format: ExportFormat = Query(ExportFormat.CSV, description="csv hoặc ndjson")
+):
+    """
+    Xuất toàn bộ hóa đơn trong khoảng thời gian (không giới hạn số dòng), gửi dần từng phần.
+    """
+    if start_date >= end_date:
+        raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
+    filename = f"invoices_{start_date:%Y%m%d}_{end_date:%Y%m%d}"
+    return export_response(invoice_crud.export_invoices_query(start_date, end_date), InvoiceResponse, format, filename)
+
+@router.get(URLS['INVOICE']['STATS'], response_model=InvoiceStatsResponse)
+async def get_invoice_stats(
+    start_date: date = Query(..., description="Ngày bắt đầu (bao gồm)"),
+    end_date: date = Query(..., description="Ngày kết thúc (bao gồm)"),
+    staff_id: Optional[int] = Query(None, description="Chỉ tính hóa đơn của nhân viên này"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Doanh thu, số hóa đơn và giá trị trung bình theo ngày, nhân viên và phương thức thanh toán.
+    
+    - Đọc từ bảng thống kê được cộng dồn khi tạo/cập nhật hóa đơn, không duyệt từng hóa đơn.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
+    if (end_date - start_date).days >= invoice_stats_crud.MAX_STATS_RANGE_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Khoảng thời gian tối đa {invoice_stats_crud.MAX_STATS_RANGE_DAYS} ngày"
+        )
+    return await invoice_stats_crud.get_invoice_stats(db, start_date, end_date, staff_id=staff_id)
+
+@router.post(URLS['INVOICE']['REBUILD_STATS'], response_model=InvoiceStatsRebuildResponse)
+async def rebuild_invoice_stats(
+    start_date: Optional[date] = Query(None, description="Ngày bắt đầu, bỏ trống để tính lại toàn bộ"),
+    end_date: Optional[date] = Query(None, description="Ngày kết thúc, bỏ trống để tính đến hóa đơn mới nhất"),
+    db: AsyncSession = Depends(get_db),
+    current_staff: dict = Depends(require_roles("manager"))
+):
+    """Tính lại bảng thống kê từ lịch sử hóa đơn (cũng chạy được bằng python -m crud.invoice_stats)"""
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="Ngày bắt đầu phải trước ngày kết thúc")
+    try:
+        return await invoice_stats_crud.rebuild_invoice_stats(db, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 # @router.get("/staff/{staff_id}", response_model=List[InvoiceResponse])
 # async def get_invoices_by_staff(
@@ -0,0 +1,71 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import PlainTextResponse
+
+from db.session import get_db_pool_status
+from schemas.monitoring import PoolStatusResponse, CacheStatsResponse, SlowQueryReportResponse
+from utils.cache import get_cache_stats
+from utils.auth import require_roles
+from utils.logger import get_logger
+from utils.metrics import gauge_lines, pool_status_lines, render_metrics
+from utils.slow_query import slow_query_log
+from .url import URLS
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.get(URLS['MONITORING']['DB_POOL'], response_model=PoolStatusResponse)
+async def get_db_pool_status_endpoint():
+    """Lấy trạng thái pool kết nối cơ sở dữ liệu."""
+    return get_db_pool_status()
+
+
+@router.get(URLS['MONITORING']['CACHE'], response_model=List[CacheStatsResponse])
+async def get_cache_stats_endpoint():
+    """Lấy số liệu hit/miss của các cache trong bộ nhớ."""
+    return get_cache_stats()
+
+
+def _cache_lines() -> list:
+    stats = get_cache_stats()
+    lines = []
+    for name, key, metric_type, help_text in (
+        ("cache_hits_total", "hits", "counter", "Số lần đọc trúng cache"),
+        ("cache_misses_total", "misses", "counter", "Số lần đọc trượt cache"),
+        ("cache_evictions_total", "evictions", "counter", "Số mục bị đẩy ra do đầy cache"),
+        ("cache_size", "size", "gauge", "Số mục đang có trong cache"),
+    ):
+        lines += gauge_lines(name, help_text, [({"cache": item["name"]}, item[key]) for item in stats], metric_type)
+    return lines
+
+
+@router.get(URLS['MONITORING']['METRICS'], response_class=PlainTextResponse)
+async def get_metrics_endpoint():
+    """Số liệu request, truy vấn, pool kết nối và cache theo định dạng text của Prometheus."""
+    return PlainTextResponse(
+        render_metrics(pool_status_lines(get_db_pool_status()), _cache_lines()),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get(URLS['MONITORING']['SLOW_QUERIES'], response_model=SlowQueryReportResponse)
+async def get_slow_queries_endpoint(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: str = Query("total", pattern="^(total|count|max|p95)$"),
+    current_staff: dict = Depends(require_roles("manager"))
+):
+    """Các truy vấn chậm gộp theo fingerprint, kèm hàm crud và endpoint đã gọi (chỉ quản lý)."""
+    return {
+        "threshold_ms": slow_query_log.threshold * 1000,
+        "dropped": slow_query_log.dropped,
+        "queries": slow_query_log.report(limit=limit, order_by=order_by),
+    }
+
+
+@router.delete(URLS['MONITORING']['SLOW_QUERIES'])
+async def reset_slow_queries_endpoint(current_staff: dict = Depends(require_roles("manager"))):
+    """Xóa số liệu truy vấn chậm đã ghi (chỉ quản lý)."""
+    return {"cleared": slow_query_log.reset()}
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.etag import check_not_modified
+from models.models import PartMotoType
 from db.session import get_db
 from schemas.part_moto_type import PartMotoTypeCreate, PartMotoTypeUpdate, PartMotoTypeResponse
 from crud import part_moto_type as part_moto_type_crud
@@ -43,7 +46,7 @@ async def get_part_moto_type_by_part_id_and_mototype_id(part_id: int, moto_type_
     Lấy thông tin loại phụ tùng theo ID phụ tùng và ID loại xe máy.
     """
     try:
-        db_part_moto_type = await part_moto_type_crud.get_part_moto_type_by_part_id_and_mototype_id(db=db, part_id=part_id, moto_type_id=moto_type_id)
+        db_part_moto_type = await part_moto_type_crud.get_part_moto_type_by_part_id_and_mototype_id_cached(db=db, part_id=part_id, moto_type_id=moto_type_id)
         if not db_part_moto_type:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Part Moto Type not found")
         return db_part_moto_type
@@ -52,15 +55,23 @@ async def get_part_moto_type_by_part_id_and_mototype_id(part_id: int, moto_type_
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 @router.get(URLS['PART_MOTO_TYPE']['GET_ALL_PART_MOTO_TYPES'], response_model=List[PartMotoTypeResponse])
-async def get_all_part_moto_types(skip: int = 0, limit: int = 100, db:AsyncSession = Depends(get_db)):
+async def get_all_part_moto_types(request: Request, response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db:AsyncSession = Depends(get_db)):
     """Lấy danh sách tất cả các loại phụ tùng"""
-    db_part_moto_type = await part_moto_type_crud.get_all_part_moto_types(db, skip=skip, limit=limit)
+    not_modified = check_not_modified(request, response, PartMotoType.__tablename__)
+    if not_modified:
+        return not_modified
+    db_part_moto_type = await part_moto_type_crud.get_all_part_moto_types(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_part_moto_type, limit, "part_mototype_id")
     return db_part_moto_type
 
 @router.get(URLS['PART_MOTO_TYPE']['GET_ALL_PART_MOTO_TYPES_BY_MOTOTYPE_ID'], response_model=List[PartMotoTypeResponse])
-async def get_all_part_moto_types_by_mototype_id(moto_type_id: int, skip: int = 0, limit: int = 100, db:AsyncSession = Depends(get_db)):
+async def get_all_part_moto_types_by_mototype_id(request: Request, response: Response, moto_type_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db:AsyncSession = Depends(get_db)):
     """Lấy danh sách tất cả các loại phụ tùng theo ID loại xe máy"""
-    db_part_moto_type = await part_moto_type_crud.get_all_part_moto_types_by_mototype_id(db, moto_type_id=moto_type_id, skip=skip, limit=limit)
+    not_modified = check_not_modified(request, response, PartMotoType.__tablename__)
+    if not_modified:
+        return not_modified
+    db_part_moto_type = await part_moto_type_crud.get_all_part_moto_types_by_mototype_id(db, moto_type_id=moto_type_id, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_part_moto_type, limit, "part_mototype_id")
     return db_part_moto_type
 
 @router.put(URLS['PART_MOTO_TYPE']['UPDATE_PART_MOTO_TYPE'], response_model=PartMotoTypeResponse)
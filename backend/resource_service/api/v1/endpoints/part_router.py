@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.responses import list_response
+from utils.etag import check_not_modified
+from models.models import Part
 from db.session import get_db
 from schemas.part import PartCreate, PartUpdate, PartResponse
 from crud import part as part_crud
@@ -30,10 +34,14 @@ async def create_part(part: PartCreate, db:AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 @router.get(URLS['PART']['GET_ALL_PARTS'], response_model=List[PartResponse])
-async def get_all_parts(skip: int = 0, limit: int = 100, db:AsyncSession = Depends(get_db)):
-    """Lấy danh sách đơn hàng"""
-    db_part = await part_crud.get_all_parts(db, skip=skip, limit=limit)
-    return db_part
+async def get_all_parts(request: Request, response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db:AsyncSession = Depends(get_db)):
+    """Lấy danh sách phụ tùng"""
+    not_modified = check_not_modified(request, response, Part.__tablename__)
+    if not_modified:
+        return not_modified
+    db_part = await part_crud.get_all_parts(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_part, limit, "part_id")
+    return list_response(db_part, PartResponse, response)
 
 @router.get(URLS['PART']['GET_PART_BY_ID'], response_model=PartResponse)
 async def get_part_by_id(part_id: int, db:AsyncSession = Depends(get_db)):
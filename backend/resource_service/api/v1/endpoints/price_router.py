@@ -0,0 +1,35 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from db.session import get_db
+from schemas.price import MotoTypePricesResponse
+from crud import price as price_crud
+from utils.logger import get_logger
+from .url import URLS
+
+router = APIRouter()
+
+logger = get_logger(__name__)
+
+# Giới hạn số ID mỗi loại trong một lần tra giá
+MAX_PRICE_IDS = 500
+
+@router.get(URLS['PRICE']['GET_PRICES_BY_MOTO_TYPE'], response_model=MotoTypePricesResponse)
+async def get_prices_by_moto_type(
+    moto_type_id: int,
+    service_ids: List[int] = Query([], description="Danh sách ID dịch vụ cần lấy giá"),
+    part_ids: List[int] = Query([], description="Danh sách ID phụ tùng cần lấy giá"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Lấy giá của nhiều dịch vụ và phụ tùng theo loại xe máy trong một lần gọi,
+    thay cho việc gọi từng /service-moto-type và /part-moto-type.
+    """
+    if len(service_ids) > MAX_PRICE_IDS or len(part_ids) > MAX_PRICE_IDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tối đa {MAX_PRICE_IDS} ID cho mỗi loại")
+    try:
+        return await price_crud.get_prices_by_moto_type(db, moto_type_id=moto_type_id, service_ids=service_ids, part_ids=part_ids)
+    except Exception as e:
+        logger.error(f"Lỗi khi lấy bảng giá theo loại xe: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
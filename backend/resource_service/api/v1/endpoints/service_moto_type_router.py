@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.etag import check_not_modified
+from models.models import ServiceMotoType
 from db.session import get_db
 from schemas.service_moto_type import ServiceMotoTypeCreate, ServiceMotoTypeUpdate, ServiceMotoTypeResponse
 from crud import service_moto_type as service_moto_type_crud
@@ -43,7 +46,7 @@ async def get_service_moto_type_by_service_id_and_mototype_id(service_id: int, m
     Lấy thông tin loại dịch vụ theo ID dịch vụ và ID loại xe máy.
     """
     try:
-        db_service_moto_type = await service_moto_type_crud.get_service_moto_type_by_service_id_and_mototype_id(db=db, service_id=service_id, moto_type_id=moto_type_id)
+        db_service_moto_type = await service_moto_type_crud.get_service_moto_type_by_service_id_and_mototype_id_cached(db=db, service_id=service_id, moto_type_id=moto_type_id)
         if not db_service_moto_type:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service Moto Type not found")
         return db_service_moto_type
@@ -52,15 +55,23 @@ async def get_service_moto_type_by_service_id_and_mototype_id(service_id: int, m
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal Server Error")
 
 @router.get(URLS['SERVICE_MOTO_TYPE']['GET_ALL_SERVICE_MOTO_TYPES'], response_model=List[ServiceMotoTypeResponse])
-async def get_all_service_moto_types(skip: int = 0, limit: int = 100, db:AsyncSession = Depends(get_db)):
+async def get_all_service_moto_types(request: Request, response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db:AsyncSession = Depends(get_db)):
     """Lấy danh sách tất cả các loại dịch vụ"""
-    db_service_moto_type = await service_moto_type_crud.get_all_service_moto_types(db, skip=skip, limit=limit)
+    not_modified = check_not_modified(request, response, ServiceMotoType.__tablename__)
+    if not_modified:
+        return not_modified
+    db_service_moto_type = await service_moto_type_crud.get_all_service_moto_types(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_service_moto_type, limit, "service_mototype_id")
     return db_service_moto_type
 
 @router.get(URLS['SERVICE_MOTO_TYPE']['GET_ALL_SERVICE_MOTO_TYPES_BY_MOTOTYPE_ID'], response_model=List[ServiceMotoTypeResponse])
-async def get_all_service_moto_types_by_mototype_id(moto_type_id: int, skip: int = 0, limit: int = 100, db:AsyncSession = Depends(get_db)):
+async def get_all_service_moto_types_by_mototype_id(request: Request, response: Response, moto_type_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db:AsyncSession = Depends(get_db)):
     """Lấy danh sách tất cả các loại dịch vụ theo ID loại xe máy"""
-    db_service_moto_type = await service_moto_type_crud.get_all_service_moto_types_by_mototype_id(db, moto_type_id=moto_type_id, skip=skip, limit=limit)
+    not_modified = check_not_modified(request, response, ServiceMotoType.__tablename__)
+    if not_modified:
+        return not_modified
+    db_service_moto_type = await service_moto_type_crud.get_all_service_moto_types_by_mototype_id(db, moto_type_id=moto_type_id, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_service_moto_type, limit, "service_mototype_id")
     return db_service_moto_type
 
 @router.put(URLS['SERVICE_MOTO_TYPE']['UPDATE_SERVICE_MOTO_TYPE'], response_model=ServiceMotoTypeResponse)
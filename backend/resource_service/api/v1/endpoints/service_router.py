@@ -1,5 +1,5 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
@@ -7,6 +7,10 @@ from db.session import get_db
 from crud import service as service_crud
 from schemas.service import ServiceResponse, ServiceCreate, ServiceUpdate
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
+from utils.responses import list_response
+from utils.etag import check_not_modified
+from models.models import Service
 from .url import URLS
 
 logger = get_logger(__name__)
@@ -17,10 +21,14 @@ router = APIRouter(tags=["Service"])
 from typing import List
 
 @router.get(URLS['SERVICE']['GET_ALL_SERVICES'], response_model=List[ServiceResponse])
-async def get_all_services(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
+async def get_all_services(request: Request, response: Response, skip: int = 0, limit: int = 100, after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"), db: AsyncSession = Depends(get_db)):
     """API lấy tất cả Service từ cơ sở dữ liệu."""
-    services = await service_crud.get_all_services(db, skip=skip, limit=limit)
-    return services
+    not_modified = check_not_modified(request, response, Service.__tablename__)
+    if not_modified:
+        return not_modified
+    services = await service_crud.get_all_services(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, services, limit, "service_id")
+    return list_response(services, ServiceResponse, response)
 
 
 @router.get(URLS['SERVICE']['GET_SERVICES_BY_SERVICE_TYPE_ID'])
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from sqlalchemy.exc import IntegrityError
 from utils.logger import get_logger
+from utils.etag import check_not_modified
+from models.models import ServiceType
 from db.session import get_db
 from schemas.service_type import ServiceTypeCreate, ServiceTypeResponse
 from crud import service_type as service_type_crud
@@ -13,10 +15,13 @@ router = APIRouter()
 logger = get_logger(__name__)
 
 @router.get(URLS['SERVICE_TYPE']['GET_ALL_SERVICE_TYPES'], response_model=List[ServiceTypeResponse])
-async def get_all_service_types(db:AsyncSession = Depends(get_db)) -> List[ServiceTypeResponse]:
+async def get_all_service_types(request: Request, response: Response, db:AsyncSession = Depends(get_db)) -> List[ServiceTypeResponse]:
     """
     Lấy danh sách tất cả các loại dịch vụ
     """
+    not_modified = check_not_modified(request, response, ServiceType.__tablename__)
+    if not_modified:
+        return not_modified
     service_types = await service_type_crud.get_all_service_types(db)
     return service_types
 
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
@@ -13,9 +13,10 @@ from schemas.staff import (
     StaffStatusEnum
 )
 from crud import staff as staff_crud
-from utils.security import create_access_token
+from utils.security import create_staff_access_token
 from db.session import get_db
 from utils.logger import get_logger
+from utils.pagination import set_next_cursor
 from .url import URLS
 
 
@@ -45,11 +46,14 @@ router = APIRouter()
 
 @router.get(URLS['STAFF']['GET_ALL_STAFF'], response_model=List[StaffResponse])
 async def get_all_staffs(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    after: Optional[str] = Query(None, description="Cursor trang kế tiếp (header X-Next-Cursor)"),
     db: AsyncSession = Depends(get_db)):
     
-    db_staffs = await staff_crud.get_all_staff(db, skip=skip, limit=limit)
+    db_staffs = await staff_crud.get_all_staff(db, skip=skip, limit=limit, after=after)
+    set_next_cursor(response, db_staffs, limit, "staff_id")
     return db_staffs
 
 @router.get(URLS['STAFF']['FILTER'], response_model=List[StaffResponse])
@@ -161,23 +165,20 @@ async def login_staff(login_data: StaffLogin, db: AsyncSession = Depends(get_db)
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        # Create access token with staff info
-        # access_token_expires = timedelta(minutes=30)
-        # access_token_expires = timedelta(hours=11)  # 1 week
-        # access_token = create_access_token(
-        #     data={"staff_id": str(staff.staff_id), "email": staff.email, "role": staff.role},
-        #     expires_delta=access_token_expires
-        # )
+        # Token mang sẵn vai trò và trạng thái, các service xác thực không cần truy vấn lại Staff
+        access_token = create_staff_access_token(staff)
         
         return {
-            # "access_token": access_token,
-            # "token_type": "bearer",
+            "access_token": access_token,
+            "token_type": "bearer",
             "staff_id": staff.staff_id,
             "role": staff.role,
             "fullname": staff.fullname,
             "email": staff.email
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Login error: {str(e)}")
         raise HTTPException(
@@ -61,8 +61,25 @@ URLS = {
         'GET_ALL_INVOICES': '/invoices',
         'GET_INVOICE_BY_ID': '/invoice/{invoice_id}',
         'GET_INVOICES_BY_DATE_RANGE': '/invoice/date-range',
+        'STATS': '/invoice/stats',
+        'REBUILD_STATS': '/invoice/stats/rebuild',
+        'EXPORT': '/invoice/export',
         'UPDATE_INVOICE': '/invoice/{invoice_id}',
         'GET_INVOICE_BY_ORDER_ID': '/invoice/order/{order_id}',
         # 'DELETE_INVOICE': '/invoice/{invoice_id}',
-    }
+    },
+
+    'PRICE': {
+        'GET_PRICES_BY_MOTO_TYPE' : '/prices/moto-type/{moto_type_id}',
+    },
+
+    'EVENTS': {
+        'STREAM': '/events/stream',
+    },
+    'MONITORING': {
+        'DB_POOL': '/monitoring/db-pool',
+        'METRICS': '/metrics',
+        'SLOW_QUERIES': '/monitoring/slow-queries',
+        'CACHE': '/monitoring/cache',
+    },
 }
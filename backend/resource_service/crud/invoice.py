@@ -10,6 +10,9 @@ from fastapi import status
 
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.events import publish_event
+from crud.invoice_stats import InvoiceStatDelta
 from models.models import Invoice
 from schemas.invoice import InvoiceCreate, InvoiceUpdate, InvoiceResponse
 
@@ -29,8 +32,13 @@ async def create_invoice(db: AsyncSession, invoice: InvoiceCreate) -> Invoice:
         )
         
         db.add(db_invoice)
+        # Cộng vào thống kê theo ngày trong cùng transaction
+        stats = InvoiceStatDelta()
+        stats.add(db_invoice)
+        await stats.apply(db)
         await db.commit()
         await db.refresh(db_invoice)
+        publish_event("invoice.created", db_invoice, InvoiceResponse)
         
         return db_invoice
     except IntegrityError as e:
@@ -86,32 +94,36 @@ async def get_invoices_by_date_range(
     start_date: datetime, 
     end_date: datetime,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[Invoice]:
     """Lấy danh sách hóa đơn trong khoảng thời gian"""
+    query = select(Invoice).where(
+        Invoice.create_at >= start_date,
+        Invoice.create_at <= end_date
+    )
     result = await db.execute(
-        select(Invoice)
-        .where(
-            Invoice.create_at >= start_date,
-            Invoice.create_at <= end_date
-        )
-        .order_by(Invoice.create_at.desc())
-        .offset(skip)
-        .limit(limit)
+        paginate(query, [Invoice.create_at, Invoice.invoice_id], after, skip, limit, descending=True)
     )
     return result.scalars().all()
 
+def export_invoices_query(start_date: datetime, end_date: datetime):
+    """Truy vấn xuất hóa đơn trong khoảng thời gian, theo thứ tự ngày lập"""
+    return (
+        select(Invoice)
+        .where(Invoice.create_at >= start_date, Invoice.create_at <= end_date)
+        .order_by(Invoice.create_at, Invoice.invoice_id)
+    )
+
 async def get_all_invoices(
     db: AsyncSession,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[Invoice]:
     """Lấy tất cả hóa đơn"""
     result = await db.execute(
-        select(Invoice)
-        .order_by(Invoice.invoice_id.asc())
-        .offset(skip)
-        .limit(limit)
+        paginate(select(Invoice), [Invoice.invoice_id], after, skip, limit)
     )
     return result.scalars().all()
 
@@ -122,7 +134,11 @@ async def update_invoice(
 ) -> Optional[Invoice]:
     """Cập nhật thông tin hóa đơn"""
     try:
-        db_invoice = await get_invoice_by_id(db, invoice_id)
+        # Khóa dòng hóa đơn để số liệu cũ bị trừ khỏi thống kê đúng với dữ liệu đang lưu
+        result = await db.execute(
+            select(Invoice).where(Invoice.invoice_id == invoice_id).with_for_update()
+        )
+        db_invoice = result.scalar_one_or_none()
         if not db_invoice:
             return None
         
@@ -131,13 +147,22 @@ async def update_invoice(
         
         # Cập nhật hóa đơn
         if update_data:
+            # Chuyển phần đóng góp của hóa đơn từ ô thống kê cũ sang ô mới
+            stats = InvoiceStatDelta()
+            current = {name: getattr(db_invoice, name) for name in ("create_at", "staff_id", "payment_method", "total_price", "is_paid")}
+            stats.add(current, sign=-1)
+            stats.add({**current, **update_data})
+
             stmt = update(Invoice).where(
                 Invoice.invoice_id == invoice_id
             ).values(**update_data)
             await db.execute(stmt)
+            await stats.apply(db)
         
         await db.commit()
-        return await get_invoice_by_id(db, invoice_id)
+        db_invoice = await get_invoice_by_id(db, invoice_id)
+        publish_event("invoice.updated", db_invoice, InvoiceResponse)
+        return db_invoice
         
     except Exception as e:
         await db.rollback()
@@ -154,10 +179,14 @@ async def delete_invoice(
         if not db_invoice:
             return False
         
-        # Xóa hóa đơn
+        # Xóa hóa đơn và trừ khỏi thống kê theo ngày
+        stats = InvoiceStatDelta()
+        stats.add(db_invoice, sign=-1)
         stmt = delete(Invoice).where(Invoice.invoice_id == invoice_id)
         await db.execute(stmt)
+        await stats.apply(db)
         await db.commit()
+        publish_event("invoice.deleted", {"invoice_id": invoice_id})
         
         return True
         
@@ -173,7 +202,8 @@ async def get_invoice_with_filter(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    after: Optional[str] = None
 ) -> List[Invoice]:
     """Lấy danh sách hóa đơn với các bộ lọc"""
     try:
@@ -196,9 +226,12 @@ async def get_invoice_with_filter(
                 Invoice.create_at <= end_date
             )
         
-        query = query.order_by(Invoice.create_at.desc()).offset(skip).limit(limit)
+        query = paginate(query, [Invoice.create_at, Invoice.invoice_id], after, skip, limit, descending=True)
         result = await db.execute(query)
         
+    except HTTPException:
+        # Cursor sai (400) từ paginate
+        raise
     except IntegrityError as e:
         await db.rollback()
         logger.error(f"Lỗi khi lấy danh sách hóa đơn: {str(e)}")
@@ -0,0 +1,250 @@
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, or_, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from utils.logger import get_logger
+from models.models import Invoice, InvoiceDailyStat
+
+logger = get_logger(__name__)
+
+# Số ngày được tính lại trong mỗi transaction khi backfill
+BACKFILL_BATCH_DAYS = 31
+# Khoảng ngày tối đa của một lần đọc thống kê
+MAX_STATS_RANGE_DAYS = 366
+
+_COUNTERS = ("invoice_count", "revenue", "paid_count", "paid_revenue")
+
+# (ngày lập, nhân viên, phương thức thanh toán)
+StatKey = Tuple[date, int, str]
+
+
+def invoice_stat_key(create_at, staff_id: Optional[int], payment_method: Optional[str]) -> Optional[StatKey]:
+    """Ô thống kê của một hóa đơn; hóa đơn chưa có ngày lập không được tính (giống lọc theo ngày)"""
+    if create_at is None:
+        return None
+    stat_date = create_at.date() if isinstance(create_at, datetime) else create_at
+    return (stat_date, staff_id or 0, payment_method or "")
+
+
+class InvoiceStatDelta:
+    """Gom chênh lệch số liệu theo ô để ghi trong cùng transaction với hóa đơn, trước khi commit"""
+
+    def __init__(self):
+        self._deltas: Dict[StatKey, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+
+    def add(self, invoice, sign: int = 1) -> None:
+        """invoice: đối tượng Invoice hoặc dict cùng tên trường; sign=-1 để trừ phần đã cộng trước đó"""
+        get = invoice.get if isinstance(invoice, dict) else (lambda name: getattr(invoice, name, None))
+        key = invoice_stat_key(get("create_at"), get("staff_id"), get("payment_method"))
+        if key is None:
+            return
+        total = get("total_price") or 0
+        counters = self._deltas[key]
+        counters[0] += sign
+        counters[1] += sign * total
+        if get("is_paid"):
+            counters[2] += sign
+            counters[3] += sign * total
+
+    async def apply(self, db: AsyncSession) -> None:
+        """
+        Cộng chênh lệch vào InvoiceDailyStat ngay trong transaction hiện tại.
+        Dùng cột = cột + delta để các request đồng thời không ghi đè lẫn nhau.
+        """
+        dialect = db.get_bind().dialect.name
+        for key in sorted(self._deltas):
+            deltas = dict(zip(_COUNTERS, self._deltas[key]))
+            if any(deltas.values()):
+                await _increment(db, dialect, key, deltas)
+        self._deltas.clear()
+
+
+async def _increment(db: AsyncSession, dialect: str, key: StatKey, deltas: Dict[str, int]) -> None:
+    stat_date, staff_id, payment_method = key
+    if dialect == "mysql":
+        # Một câu lệnh: chưa có ô thì chèn, có rồi thì cộng dồn
+        stmt = mysql_insert(InvoiceDailyStat).values(
+            stat_date=stat_date, staff_id=staff_id, payment_method=payment_method, **deltas
+        )
+        await db.execute(stmt.on_duplicate_key_update(
+            **{name: getattr(InvoiceDailyStat, name) + getattr(stmt.inserted, name) for name in deltas}
+        ))
+        return
+
+    # CSDL khác (SQLite khi phát triển): cập nhật, chưa có dòng thì chèn
+    result = await db.execute(
+        update(InvoiceDailyStat)
+        .where(
+            InvoiceDailyStat.stat_date == stat_date,
+            InvoiceDailyStat.staff_id == staff_id,
+            InvoiceDailyStat.payment_method == payment_method,
+        )
+        .values(**{name: getattr(InvoiceDailyStat, name) + amount for name, amount in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        await db.execute(insert(InvoiceDailyStat).values(
+            stat_date=stat_date, staff_id=staff_id, payment_method=payment_method, **deltas
+        ))
+
+
+def _bucket(invoice_count: int = 0, revenue: int = 0, paid_count: int = 0, paid_revenue: int = 0) -> dict:
+    return {
+        "invoice_count": invoice_count,
+        "revenue": revenue,
+        "paid_count": paid_count,
+        "paid_revenue": paid_revenue,
+    }
+
+
+def _add_to_bucket(bucket: dict, row: InvoiceDailyStat) -> None:
+    for name in _COUNTERS:
+        bucket[name] += getattr(row, name) or 0
+
+
+def _finish_bucket(bucket: dict) -> dict:
+    bucket["average_ticket"] = round(bucket["revenue"] / bucket["invoice_count"], 2) if bucket["invoice_count"] else 0.0
+    return bucket
+
+
+async def get_invoice_stats(db: AsyncSession, start_date: date, end_date: date, staff_id: Optional[int] = None) -> dict:
+    """
+    Doanh thu và số hóa đơn trong khoảng ngày (bao gồm hai đầu), theo ngày, nhân viên và phương thức thanh toán.
+    Chỉ đọc bảng InvoiceDailyStat: số dòng đọc phụ thuộc số ngày, không phụ thuộc số hóa đơn.
+    """
+    query = select(InvoiceDailyStat).where(
+        InvoiceDailyStat.stat_date >= start_date,
+        InvoiceDailyStat.stat_date <= end_date,
+    )
+    if staff_id is not None:
+        query = query.where(InvoiceDailyStat.staff_id == staff_id)
+    result = await db.execute(query)
+    rows = result.scalars().all()
+
+    totals = _bucket()
+    by_day: Dict[date, dict] = {}
+    by_staff: Dict[int, dict] = {}
+    by_payment_method: Dict[str, dict] = {}
+    for row in rows:
+        _add_to_bucket(totals, row)
+        _add_to_bucket(by_day.setdefault(row.stat_date, {"stat_date": row.stat_date, **_bucket()}), row)
+        _add_to_bucket(by_staff.setdefault(row.staff_id, {"staff_id": row.staff_id, **_bucket()}), row)
+        _add_to_bucket(by_payment_method.setdefault(row.payment_method, {"payment_method": row.payment_method, **_bucket()}), row)
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "staff_id": staff_id,
+        "totals": _finish_bucket(totals),
+        "by_day": [_finish_bucket(by_day[key]) for key in sorted(by_day)],
+        "by_staff": [_finish_bucket(by_staff[key]) for key in sorted(by_staff)],
+        "by_payment_method": [_finish_bucket(by_payment_method[key]) for key in sorted(by_payment_method)],
+    }
+
+
+def _aggregate_query(start_date: date, end_date: date):
+    # Gom hóa đơn theo đúng ô của InvoiceStatDelta, dùng cho INSERT ... SELECT
+    stat_date = func.date(Invoice.create_at)
+    staff_id = func.coalesce(Invoice.staff_id, 0)
+    payment_method = func.coalesce(Invoice.payment_method, "")
+    total = func.coalesce(Invoice.total_price, 0)
+    is_paid = Invoice.is_paid.is_(True)
+    return (
+        select(
+            stat_date,
+            staff_id,
+            payment_method,
+            func.count(Invoice.invoice_id),
+            func.coalesce(func.sum(total), 0),
+            func.coalesce(func.sum(case((is_paid, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_paid, total), else_=0)), 0),
+        )
+        .where(
+            Invoice.create_at >= datetime.combine(start_date, time.min),
+            Invoice.create_at < datetime.combine(end_date + timedelta(days=1), time.min),
+        )
+        .group_by(stat_date, staff_id, payment_method)
+    )
+
+
+async def rebuild_invoice_stats(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_days: int = BACKFILL_BATCH_DAYS,
+) -> dict:
+    """
+    Tính lại InvoiceDailyStat từ bảng Invoice, mỗi lượt batch_days ngày trong một transaction.
+    Không truyền khoảng ngày thì tính lại toàn bộ lịch sử và xóa các ô nằm ngoài khoảng có hóa đơn.
+    Nên chạy lúc ít giao dịch: hóa đơn được ghi đúng lúc đang tính lại ngày của nó có thể phải chờ khóa.
+    """
+    full_rebuild = start_date is None and end_date is None
+    try:
+        if start_date is None or end_date is None:
+            result = await db.execute(select(func.min(Invoice.create_at), func.max(Invoice.create_at)))
+            first, last = result.one()
+            start_date = start_date or (first.date() if first else date.today())
+            end_date = end_date or (last.date() if last else date.today())
+
+        if full_rebuild:
+            await db.execute(delete(InvoiceDailyStat).where(or_(
+                InvoiceDailyStat.stat_date < start_date,
+                InvoiceDailyStat.stat_date > end_date,
+            )))
+            await db.commit()
+
+        rows = 0
+        batch_start = start_date
+        while batch_start <= end_date:
+            batch_end = min(batch_start + timedelta(days=batch_days - 1), end_date)
+            await db.execute(delete(InvoiceDailyStat).where(
+                InvoiceDailyStat.stat_date >= batch_start,
+                InvoiceDailyStat.stat_date <= batch_end,
+            ))
+            result = await db.execute(
+                insert(InvoiceDailyStat).from_select(
+                    ["stat_date", "staff_id", "payment_method", *_COUNTERS],
+                    _aggregate_query(batch_start, batch_end),
+                )
+            )
+            await db.commit()
+            rows += max(result.rowcount or 0, 0)
+            batch_start = batch_end + timedelta(days=1)
+
+        logger.info(f"Đã tính lại thống kê hóa đơn từ {start_date} đến {end_date}: {rows} ô")
+        return {
+            "start_date": start_date,
+            "end_date": end_date,
+            "days": (end_date - start_date).days + 1,
+            "rows": rows,
+        }
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Lỗi khi tính lại thống kê hóa đơn: {str(e)}")
+        raise ValueError("Lỗi khi tính lại thống kê hóa đơn")
+
+
+async def _rebuild(start_date: Optional[date], end_date: Optional[date]) -> dict:
+    from db.session import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        return await rebuild_invoice_stats(db, start_date, end_date)
+
+
+if __name__ == "__main__":
+    # Chạy riêng từ thư mục service: python -m crud.invoice_stats [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tính lại thống kê doanh thu theo ngày từ bảng Invoice")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, default=None)
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(_rebuild(args.start_date, args.end_date))
+    print(f"Đã tính lại {report['days']} ngày ({report['start_date']} - {report['end_date']}), {report['rows']} ô thống kê")
@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -6,6 +7,8 @@ from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.etag import table_versions
 from models.models import Part
 from schemas.part import PartCreate, PartUpdate, PartResponse
 
@@ -17,6 +20,7 @@ async def create_part(db: AsyncSession, part: PartCreate) -> Part:
         db_part = Part(**part.dict())
         db.add(db_part)
         await db.commit()
+        table_versions.bump(Part.__tablename__)
         await db.refresh(db_part)
         return db_part
     except IntegrityError as e:
@@ -28,9 +32,9 @@ async def create_part(db: AsyncSession, part: PartCreate) -> Part:
         await db.rollback()
         raise e
 
-async def get_all_parts(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Part]:
+async def get_all_parts(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Part]:
     """Lấy danh sách tất cả các phần"""
-    result = await db.execute(select(Part).order_by(Part.part_id.asc()).offset(skip).limit(limit))
+    result = await db.execute(paginate(select(Part), [Part.part_id], after, skip, limit))
     return result.scalars().all()
     
 async def get_part_by_id(db: AsyncSession, part_id: int) -> Part:
@@ -47,6 +51,7 @@ async def update_part(db: AsyncSession, part_id: int, part: PartUpdate) -> Part:
     for key, value in update_data.items():
         setattr(db_part, key, value)
     await db.commit()
+    table_versions.bump(Part.__tablename__)
     await db.refresh(db_part)
     return db_part
     
@@ -63,4 +68,5 @@ async def delete_part(db: AsyncSession, part_id: int) -> Part:
     
     await db.delete(existing_part)
     await db.commit()
+    table_versions.bump(Part.__tablename__)
     logger.info(f"Deleted part with ID {part_id}.")
\ No newline at end of file
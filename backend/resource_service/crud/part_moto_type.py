@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
@@ -6,6 +7,9 @@ from sqlalchemy.exc import IntegrityError, MultipleResultsFound
 from sqlalchemy.orm import selectinload
 
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.etag import table_versions
+from utils.cache import price_cache, part_price_key
 from models.models import PartMotoType
 from schemas.part_moto_type import PartMotoTypeCreate, PartMotoTypeUpdate, PartMotoTypeResponse
 
@@ -17,7 +21,9 @@ async def create_part_moto_type(db: AsyncSession, part_moto_type: PartMotoTypeCr
         db_part_moto_type = PartMotoType(**part_moto_type.dict())
         db.add(db_part_moto_type)
         await db.commit()
+        table_versions.bump(PartMotoType.__tablename__)
         await db.refresh(db_part_moto_type)
+        price_cache.invalidate(part_price_key(db_part_moto_type.part_id, db_part_moto_type.moto_type_id))
         return db_part_moto_type
     except IntegrityError as e:
         logger.error(f"IntegrityError: {e}")
@@ -55,17 +61,31 @@ async def get_part_moto_type_by_part_id_and_mototype_id(db: AsyncSession, part_i
     part_moto_type = result.scalars().one_or_none()
     return part_moto_type
     
-async def get_all_part_moto_types(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[PartMotoType]:
+async def get_part_moto_type_by_part_id_and_mototype_id_cached(db: AsyncSession, part_id: int, moto_type_id: int) -> Optional[PartMotoTypeResponse]:
+    """Lấy giá phụ tùng theo loại xe máy, ưu tiên đọc từ cache"""
+    cache_key = part_price_key(part_id, moto_type_id)
+    cached = price_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    db_part_moto_type = await get_part_moto_type_by_part_id_and_mototype_id(db, part_id, moto_type_id)
+    if not db_part_moto_type:
+        return None
+    # Lưu schema thay vì đối tượng ORM để không phụ thuộc vào session đã đóng
+    part_moto_type = PartMotoTypeResponse.from_orm(db_part_moto_type)
+    price_cache.set(cache_key, part_moto_type)
+    return part_moto_type
+
+async def get_all_part_moto_types(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[PartMotoType]:
     """Lấy danh sách tất cả các loại phụ tùng"""
     result = await db.execute(
-        select(PartMotoType).order_by(PartMotoType.part_mototype_id.asc()).offset(skip).limit(limit)
+        paginate(select(PartMotoType), [PartMotoType.part_mototype_id], after, skip, limit)
     )
     return result.scalars().all()
 
-async def get_all_part_moto_types_by_mototype_id(db: AsyncSession, moto_type_id: int, skip: int = 0, limit: int = 100) -> list[PartMotoType]:
+async def get_all_part_moto_types_by_mototype_id(db: AsyncSession, moto_type_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[PartMotoType]:
     """Lấy danh sách tất cả các loại phụ tùng theo ID loại xe máy"""
     result = await db.execute(
-        select(PartMotoType).where(PartMotoType.moto_type_id == moto_type_id).order_by(PartMotoType.part_mototype_id.asc()).offset(skip).limit(limit)
+        paginate(select(PartMotoType).where(PartMotoType.moto_type_id == moto_type_id), [PartMotoType.part_mototype_id], after, skip, limit)
     )
     return result.scalars().all()
 
@@ -78,7 +98,9 @@ async def update_part_moto_type(db: AsyncSession, part_mototype_id: int, part_mo
     for key, value in update_data.items():
         setattr(db_part_moto_type, key, value)
     await db.commit()
+    table_versions.bump(PartMotoType.__tablename__)
     await db.refresh(db_part_moto_type)
+    price_cache.invalidate(part_price_key(db_part_moto_type.part_id, db_part_moto_type.moto_type_id))
     return db_part_moto_type
 
 async def update_part_moto_type_by_part_id_and_mototype_id(db: AsyncSession, part_id: int, moto_type_id: int, part_moto_type: PartMotoTypeUpdate) -> PartMotoType:
@@ -90,7 +112,9 @@ async def update_part_moto_type_by_part_id_and_mototype_id(db: AsyncSession, par
     for key, value in update_data.items():
         setattr(db_part_moto_type, key, value)
     await db.commit()
+    table_versions.bump(PartMotoType.__tablename__)
     await db.refresh(db_part_moto_type)
+    price_cache.invalidate(part_price_key(db_part_moto_type.part_id, db_part_moto_type.moto_type_id))
     return db_part_moto_type
 
 async def delete_part_moto_type(db: AsyncSession, part_mototype_id: int) -> None:
@@ -99,8 +123,11 @@ async def delete_part_moto_type(db: AsyncSession, part_mototype_id: int) -> None
         db_part_moto_type = await get_part_moto_type_by_id(db, part_mototype_id)
         if not db_part_moto_type:
             raise HTTPException(status_code=404, detail="Part Moto Type not found")
+        cache_key = part_price_key(db_part_moto_type.part_id, db_part_moto_type.moto_type_id)
         await db.delete(db_part_moto_type)
         await db.commit()
+        table_versions.bump(PartMotoType.__tablename__)
+        price_cache.invalidate(cache_key)
     except Exception as e:
         logger.error(f"Error deleting part moto type: {e}")
         await db.rollback()
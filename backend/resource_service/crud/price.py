@@ -0,0 +1,95 @@
+from typing import List
+
+from sqlalchemy import literal, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.models import ServiceMotoType, PartMotoType
+from schemas.service_moto_type import ServiceMotoTypeResponse
+from schemas.part_moto_type import PartMotoTypeResponse
+from schemas.price import MotoTypePricesResponse
+from utils.cache import price_cache, service_price_key, part_price_key
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SERVICE_KIND = "service"
+PART_KIND = "part"
+
+
+def _unique(ids: List[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+
+async def get_prices_by_moto_type(db: AsyncSession, moto_type_id: int, service_ids: List[int], part_ids: List[int]) -> MotoTypePricesResponse:
+    """
+    Lấy giá của nhiều dịch vụ và phụ tùng cho một loại xe máy.
+    Giá có trong cache được dùng ngay, phần còn lại lấy bằng một câu truy vấn UNION ALL.
+    """
+    service_ids = _unique(service_ids)
+    part_ids = _unique(part_ids)
+
+    services = {}
+    parts = {}
+    for service_id in service_ids:
+        cached = price_cache.get(service_price_key(service_id, moto_type_id))
+        if cached is not None:
+            services[service_id] = cached
+    for part_id in part_ids:
+        cached = price_cache.get(part_price_key(part_id, moto_type_id))
+        if cached is not None:
+            parts[part_id] = cached
+
+    pending_service_ids = [service_id for service_id in service_ids if service_id not in services]
+    pending_part_ids = [part_id for part_id in part_ids if part_id not in parts]
+
+    queries = []
+    if pending_service_ids:
+        queries.append(
+            select(
+                literal(SERVICE_KIND).label("kind"),
+                ServiceMotoType.service_mototype_id.label("id"),
+                ServiceMotoType.service_id.label("item_id"),
+                ServiceMotoType.price.label("price"),
+            ).where(
+                ServiceMotoType.moto_type_id == moto_type_id,
+                ServiceMotoType.service_id.in_(pending_service_ids),
+            )
+        )
+    if pending_part_ids:
+        queries.append(
+            select(
+                literal(PART_KIND).label("kind"),
+                PartMotoType.part_mototype_id.label("id"),
+                PartMotoType.part_id.label("item_id"),
+                PartMotoType.price.label("price"),
+            ).where(
+                PartMotoType.moto_type_id == moto_type_id,
+                PartMotoType.part_id.in_(pending_part_ids),
+            )
+        )
+
+    if queries:
+        statement = queries[0] if len(queries) == 1 else union_all(*queries)
+        result = await db.execute(statement)
+        for row in result.all():
+            if row.kind == SERVICE_KIND:
+                service = ServiceMotoTypeResponse(
+                    service_mototype_id=row.id, moto_type_id=moto_type_id, service_id=row.item_id, price=row.price
+                )
+                services[row.item_id] = service
+                price_cache.set(service_price_key(row.item_id, moto_type_id), service)
+            else:
+                part = PartMotoTypeResponse(
+                    part_mototype_id=row.id, moto_type_id=moto_type_id, part_id=row.item_id, price=row.price
+                )
+                parts[row.item_id] = part
+                price_cache.set(part_price_key(row.item_id, moto_type_id), part)
+
+    return MotoTypePricesResponse(
+        moto_type_id=moto_type_id,
+        services=[services[service_id] for service_id in service_ids if service_id in services],
+        parts=[parts[part_id] for part_id in part_ids if part_id in parts],
+        missing_service_ids=[service_id for service_id in service_ids if service_id not in services],
+        missing_part_ids=[part_id for part_id in part_ids if part_id not in parts],
+    )
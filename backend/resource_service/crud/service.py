@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError
@@ -6,12 +7,14 @@ from fastapi import HTTPException
 from schemas.service import ServiceCreate, ServiceResponse
 from models.models import Service
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.etag import table_versions
 
 logger = get_logger(__name__)
 
-async def get_all_services(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[Service]:
+async def get_all_services(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[Service]:
     """Lấy tất cả Service từ cơ sở dữ liệu."""
-    result = await db.execute(select(Service).order_by(Service.service_id.asc()).offset(skip).limit(limit))
+    result = await db.execute(paginate(select(Service), [Service.service_id], after, skip, limit))
     return result.scalars().all()
 
 async def get_services_by_service_type_id(db: AsyncSession, service_type_id) -> list[Service]:
@@ -32,6 +35,7 @@ async def create_service(db: AsyncSession, service: ServiceCreate) -> ServiceRes
         new_service = Service(**service.dict())
         db.add(new_service)
         await db.commit()
+        table_versions.bump(Service.__tablename__)
         await db.refresh(new_service)
         logger.info(f"Created new service with ID {new_service.service_id}.")
         return ServiceResponse.from_orm(new_service)
@@ -54,6 +58,7 @@ async def update_service(db: AsyncSession, service_id: int, service: ServiceCrea
     for key, value in service.dict(exclude_unset=True).items():
         setattr(existing_service, key, value)
     await db.commit()
+    table_versions.bump(Service.__tablename__)
     await db.refresh(existing_service)
     logger.info(f"Updated service with ID {service_id}.")
     return existing_service
@@ -70,4 +75,5 @@ async def delete_service(db: AsyncSession, service_id: int) -> None:
     
     await db.delete(existing_service)
     await db.commit()
+    table_versions.bump(Service.__tablename__)
     logger.info(f"Deleted service with ID {service_id}.")
\ No newline at end of file
@@ -1,3 +1,4 @@
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.exc import IntegrityError, MultipleResultsFound
@@ -7,6 +8,9 @@ from pydantic import ValidationInfo
 from models.models import ServiceMotoType
 from schemas.service_moto_type import ServiceMotoTypeResponse, ServiceMotoTypeCreate, ServiceMotoTypeUpdate
 from utils.logger import get_logger
+from utils.pagination import paginate
+from utils.etag import table_versions
+from utils.cache import price_cache, service_price_key
 
 logger = get_logger(__name__)
 
@@ -16,7 +20,9 @@ async def create_service_moto_type(db: AsyncSession, service_moto_type: ServiceM
         db_service_moto_type = ServiceMotoType(**service_moto_type.dict())
         db.add(db_service_moto_type)
         await db.commit()
+        table_versions.bump(ServiceMotoType.__tablename__)
         await db.refresh(db_service_moto_type)
+        price_cache.invalidate(service_price_key(db_service_moto_type.service_id, db_service_moto_type.moto_type_id))
         return db_service_moto_type
     except IntegrityError as e:
         logger.error(f"IntegrityError: {e}")
@@ -54,17 +60,31 @@ async def get_service_moto_type_by_service_id_and_mototype_id(db: AsyncSession,
     service_moto_type = result.scalars().one_or_none()
     return service_moto_type
     
-async def get_all_service_moto_types(db: AsyncSession, skip: int = 0, limit: int = 100) -> list[ServiceMotoType]:
+async def get_service_moto_type_by_service_id_and_mototype_id_cached(db: AsyncSession, service_id: int, moto_type_id: int) -> Optional[ServiceMotoTypeResponse]:
+    """Lấy giá dịch vụ theo loại xe máy, ưu tiên đọc từ cache"""
+    cache_key = service_price_key(service_id, moto_type_id)
+    cached = price_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    db_service_moto_type = await get_service_moto_type_by_service_id_and_mototype_id(db, service_id, moto_type_id)
+    if not db_service_moto_type:
+        return None
+    # Lưu schema thay vì đối tượng ORM để không phụ thuộc vào session đã đóng
+    service_moto_type = ServiceMotoTypeResponse.from_orm(db_service_moto_type)
+    price_cache.set(cache_key, service_moto_type)
+    return service_moto_type
+
+async def get_all_service_moto_types(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[ServiceMotoType]:
     """Lấy danh sách tất cả các loại dịch vụ"""
     result = await db.execute(
-        select(ServiceMotoType).order_by(ServiceMotoType.service_mototype_id.asc()).offset(skip).limit(limit)
+        paginate(select(ServiceMotoType), [ServiceMotoType.service_mototype_id], after, skip, limit)
     )
     return result.scalars().all()
 
-async def get_all_service_moto_types_by_mototype_id(db: AsyncSession, moto_type_id: int, skip: int = 0, limit: int = 100) -> list[ServiceMotoType]:
+async def get_all_service_moto_types_by_mototype_id(db: AsyncSession, moto_type_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> list[ServiceMotoType]:
     """Lấy danh sách tất cả các loại dịch vụ theo ID loại xe máy"""
     result = await db.execute(
-        select(ServiceMotoType).where(ServiceMotoType.moto_type_id == moto_type_id).order_by(ServiceMotoType.service_mototype_id.asc()).offset(skip).limit(limit)
+        paginate(select(ServiceMotoType).where(ServiceMotoType.moto_type_id == moto_type_id), [ServiceMotoType.service_mototype_id], after, skip, limit)
     )
     return result.scalars().all()
 
@@ -77,7 +97,9 @@ async def update_service_moto_type(db: AsyncSession, service_mototype_id: int, s
     for key, value in update_data.items():
         setattr(db_service_moto_type, key, value)
     await db.commit()
+    table_versions.bump(ServiceMotoType.__tablename__)
     await db.refresh(db_service_moto_type)
+    price_cache.invalidate(service_price_key(db_service_moto_type.service_id, db_service_moto_type.moto_type_id))
     return db_service_moto_type
 
 async def update_service_moto_type_by_service_id_and_mototype_id(db: AsyncSession, service_id: int, moto_type_id: int, service_moto_type: ServiceMotoTypeUpdate) -> ServiceMotoType:
@@ -89,7 +111,9 @@ async def update_service_moto_type_by_service_id_and_mototype_id(db: AsyncSessio
     for key, value in update_data.items():
         setattr(db_service_moto_type, key, value)
     await db.commit()
+    table_versions.bump(ServiceMotoType.__tablename__)
     await db.refresh(db_service_moto_type)
+    price_cache.invalidate(service_price_key(db_service_moto_type.service_id, db_service_moto_type.moto_type_id))
     return db_service_moto_type
 
 async def delete_service_moto_type(db: AsyncSession, service_mototype_id: int) -> None:
@@ -98,8 +122,11 @@ async def delete_service_moto_type(db: AsyncSession, service_mototype_id: int) -
         db_service_moto_type = await get_service_moto_type_by_id(db, service_mototype_id)
         if not db_service_moto_type:
             raise HTTPException(status_code=404, detail="Service Moto Type not found")
+        cache_key = service_price_key(db_service_moto_type.service_id, db_service_moto_type.moto_type_id)
         await db.delete(db_service_moto_type)
         await db.commit()
+        table_versions.bump(ServiceMotoType.__tablename__)
+        price_cache.invalidate(cache_key)
     except Exception as e:
         logger.error(f"Error deleting service moto type: {e}")
         await db.rollback()
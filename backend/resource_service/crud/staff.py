@@ -7,7 +7,9 @@ from fastapi import HTTPException, status
 from models.models import Staff
 from schemas.staff import StaffCreate, StaffUpdate, StaffRoleEnum, StaffStatusEnum
 from utils.security import get_password_hash, verify_password
+from utils.passwords import verify_and_update
 from utils.logger import get_logger
+from utils.pagination import paginate
 
 logger = get_logger(__name__)
 
@@ -21,9 +23,9 @@ async def get_staff_by_email(db: AsyncSession, email: str) -> Optional[Staff]:
     result = await db.execute(select(Staff).where(Staff.email == email))
     return result.scalars().first()
 
-async def get_all_staff(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Staff]:
+async def get_all_staff(db: AsyncSession, skip: int = 0, limit: int = 100, after: Optional[str] = None) -> List[Staff]:
     """Lấy danh sách tất cả nhân viên"""
-    result = await db.execute(select(Staff).order_by(Staff.staff_id.asc()).offset(skip).limit(limit))
+    result = await db.execute(paginate(select(Staff), [Staff.staff_id], after, skip, limit))
     return result.scalars().all()
 
 async def get_staffs(
@@ -156,20 +158,31 @@ async def authenticate_staff(db: AsyncSession, email: str, password: str) -> Opt
     """Xác thực thông tin đăng nhập của nhân viên"""
     staff = await get_staff_by_email(db, email)
 
+    if not staff:
+        return None
+
     if staff.status == StaffStatusEnum.OFF:
         logger.warning(f"Tài khoản {email} đã bị khóa")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Tài khoản đã bị khóa"
         )
-
-    if not staff:
-        return None
     
-    if not staff.password == password:
+    # bcrypt chạy trong thread pool; mật khẩu cũ dạng rõ được băm lại ngay khi đăng nhập đúng
+    valid, new_hash = await verify_and_update(password, staff.password)
+    if not valid:
         return None
-    # if not verify_password(password, staff.password):
-    #     return None
+
+    if new_hash:
+        staff_id = staff.staff_id
+        try:
+            staff.password = new_hash
+            await db.commit()
+        except Exception as e:
+            # Không lưu được chuỗi băm mới thì vẫn cho đăng nhập, lần sau sẽ thử lại
+            await db.rollback()
+            logger.error(f"Lỗi khi cập nhật mật khẩu đã băm cho nhân viên {staff_id}: {str(e)}")
+        staff = await get_staff_by_id(db, staff_id)
     
     return staff
 
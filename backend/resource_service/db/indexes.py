@@ -0,0 +1,44 @@
+import asyncio
+from typing import List
+
+from sqlalchemy import inspect
+
+from models.models import Base
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def ensure_indexes(sync_conn) -> List[str]:
+    """
+    Tạo các index được khai báo trong models nhưng chưa có trong CSDL.
+    create_all chỉ tạo index cho bảng mới, nên CSDL đang chạy cần bước này.
+    """
+    inspector = inspect(sync_conn)
+    created = []
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            if index.name in existing:
+                continue
+            # InnoDB thêm index ở chế độ online, bảng vẫn đọc/ghi được trong lúc tạo
+            index.create(sync_conn)
+            created.append(index.name)
+            logger.info(f"Đã tạo index {index.name} trên bảng {table.name}")
+    return created
+
+
+async def migrate_indexes() -> List[str]:
+    """Chạy ensure_indexes trên engine của service"""
+    from db.session import engine
+
+    async with engine.begin() as conn:
+        return await conn.run_sync(ensure_indexes)
+
+
+if __name__ == "__main__":
+    # Chạy riêng từ thư mục service: python -m db.indexes
+    created = asyncio.run(migrate_indexes())
+    print(f"Đã tạo {len(created)} index: {', '.join(created) or 'không có'}")
@@ -0,0 +1,142 @@
+import os
+import time
+import threading
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Tên biến môi trường cho từng tham số của pool.
+# Có thể ghi đè riêng cho từng service bằng tiền tố tên service,
+# ví dụ: CUSTOMER_SERVICE_DB_POOL_SIZE=30 sẽ ưu tiên hơn DB_POOL_SIZE.
+POOL_ENV_VARS = {
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_recycle": "DB_POOL_RECYCLE",
+    "pool_pre_ping": "DB_POOL_PRE_PING",
+}
+
+DEFAULT_POOL_SETTINGS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    # Nhỏ hơn wait_timeout của MySQL để không dùng lại kết nối đã bị server đóng
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+}
+
+# Ngưỡng (ms) của histogram thời gian chờ lấy kết nối từ pool
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+def _parse_bool(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_pool_settings(service_name: str) -> dict:
+    """Đọc cấu hình pool từ biến môi trường, biến riêng của service được ưu tiên."""
+    settings = dict(DEFAULT_POOL_SETTINGS)
+    prefix = service_name.upper()
+    for key, env_name in POOL_ENV_VARS.items():
+        raw = os.getenv(f"{prefix}_{env_name}", os.getenv(env_name))
+        if raw is None or raw.strip() == "":
+            continue
+        try:
+            if isinstance(DEFAULT_POOL_SETTINGS[key], bool):
+                settings[key] = _parse_bool(raw)
+            else:
+                settings[key] = int(raw)
+        except ValueError:
+            logger.warning(f"Giá trị không hợp lệ cho {env_name}: {raw}, dùng mặc định {settings[key]}")
+    return settings
+
+
+class PoolMetrics:
+    """Thống kê thời gian chờ checkout và mức độ bão hòa của pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.peak_checked_out = 0
+            self.buckets = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def record_checkout(self, elapsed: float, checked_out: int):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += elapsed
+            if elapsed > self.wait_max:
+                self.wait_max = elapsed
+            if checked_out > self.peak_checked_out:
+                self.peak_checked_out = checked_out
+            for i, bound in enumerate(CHECKOUT_BUCKETS_MS):
+                if elapsed_ms <= bound:
+                    self.buckets[i] += 1
+                    break
+            else:
+                self.buckets[-1] += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "wait_total_seconds": round(self.wait_total, 6),
+                "peak_checked_out": self.peak_checked_out,
+                "wait_histogram_ms": {
+                    **{str(bound): count for bound, count in zip(CHECKOUT_BUCKETS_MS, self.buckets)},
+                    "+Inf": self.buckets[-1],
+                },
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredAsyncPool(AsyncAdaptedQueuePool):
+    """Pool mặc định của engine async, có đo thời gian chờ lấy kết nối."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            pool_metrics.record_timeout()
+            logger.warning(f"Hết thời gian chờ kết nối từ pool: {self.status()}")
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+def get_pool_status(engine, settings: dict) -> dict:
+    """Trạng thái hiện tại của pool kèm số liệu checkout."""
+    pool = engine.sync_engine.pool
+    capacity = settings["pool_size"] + max(settings["max_overflow"], 0)
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    return {
+        "settings": settings,
+        "size": pool.size() if hasattr(pool, "size") else 0,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else 0,
+        "checked_out": checked_out,
+        "overflow": pool.overflow() if hasattr(pool, "overflow") else 0,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 4) if capacity > 0 else 0.0,
+        "metrics": pool_metrics.snapshot(),
+    }
@@ -4,6 +4,10 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from db.session import init_db
+from utils.auth import start_revocation_refresher, stop_revocation_refresher
+from utils.metrics import MetricsMiddleware
+from utils.events import start_event_backend, stop_event_backend
+from utils.responses import FastJSONResponse
 from api.v1.endpoints import service_router as service
 from api.v1.endpoints import staff_router as staff
 from api.v1.endpoints import part_router as part
@@ -11,8 +15,12 @@ from api.v1.endpoints import service_type_router as service_type
 from api.v1.endpoints import part_moto_type_router as part_moto_type
 from api.v1.endpoints import service_moto_type_router as service_moto_type
 from api.v1.endpoints import  invoice_router as invoice
+from api.v1.endpoints import price_router as price
+from api.v1.endpoints import monitoring_router as monitoring
+from api.v1.endpoints import events_router as events
 
-app = FastAPI(title="Resource Service API", version="1.0.0")
+# Response mặc định tuần tự hóa bằng orjson (nếu có)
+app = FastAPI(title="Resource Service API", version="1.0.0", default_response_class=FastJSONResponse)
 
 app.include_router(service_type.router, prefix="/api/v1", tags=["Service Types"])
 app.include_router(service.router, prefix="/api/v1", tags=["Service"])
@@ -21,6 +29,9 @@ app.include_router(part.router, prefix="/api/v1", tags=["Part"])
 app.include_router(part_moto_type.router, prefix="/api/v1", tags=["Part Moto Type"])
 app.include_router(service_moto_type.router, prefix="/api/v1", tags=["Service Moto Type"])
 app.include_router(invoice.router, prefix="/api/v1", tags=["Invoice"])
+app.include_router(price.router, prefix="/api/v1", tags=["Price"])
+app.include_router(monitoring.router, prefix="/api/v1", tags=["Monitoring"])
+app.include_router(events.router, prefix="/api/v1", tags=["Events"])
 
 # Cấu hình CORS cho phép truy cập từ các nguồn khác nhau
 app.add_middleware(
@@ -29,7 +40,10 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Cursor phân trang keyset
 )
+# Đo thời gian xử lý và số truy vấn của mỗi request (thêm sau cùng để bao ngoài các middleware khác)
+app.add_middleware(MetricsMiddleware)
 
 
 @app.exception_handler(RequestValidationError)
@@ -69,9 +83,19 @@ async def response_validation_exception_handler(request, exc):
 async def startup_event():
     """Khởi động ứng dụng và kết nối đến cơ sở dữ liệu."""
     await init_db()
+    # Làm mới định kỳ danh sách nhân viên bị khóa cho phần xác thực JWT
+    start_revocation_refresher()
+    # Kênh phát sự kiện cho SSE (/events/stream)
+    await start_event_backend()
     print("Accset docs: http://localhost:8000/docs")
     print("Server is running...")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Dừng các tác vụ nền khi tắt ứng dụng."""
+    await stop_revocation_refresher()
+    await stop_event_backend()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="localhost", port=8000, reload=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Unicode, String, Boolean, ForeignKey, DateTime, Text, Enum, CheckConstraint
+from sqlalchemy import Column, Integer, BigInteger, Unicode, String, Boolean, ForeignKey, Date, DateTime, Text, Enum, CheckConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -39,6 +39,8 @@ class ServiceMotoType(Base):
     # Check constraint với tên duy nhất
     __table_args__ = (
         CheckConstraint('price > 0', name='check_service_mototype_price_positive'),
+        Index('ix_servicemototype_service_moto', 'service_id', 'moto_type_id'),
+        Index('ix_servicemototype_moto_type', 'moto_type_id'),
     )
     
     # Relationships
@@ -70,6 +72,8 @@ class PartMotoType(Base):
     # Check constraint với tên duy nhất
     __table_args__ = (
         CheckConstraint('price >= 0', name='check_part_mototype_price_greater_than_or_equal_zero'),
+        Index('ix_partmototype_part_moto', 'part_id', 'moto_type_id'),
+        Index('ix_partmototype_moto_type', 'moto_type_id'),
     )
     
     # Relationships
@@ -104,6 +108,32 @@ class Invoice(Base):
     payment_method = Column(Unicode(50))
     is_paid = Column(Boolean, default=False)
     
+    # Index cho lọc theo ngày lập, nhân viên thu ngân và tra cứu theo đơn hàng
+    __table_args__ = (
+        Index('ix_invoice_create_at', 'create_at'),
+        Index('ix_invoice_staff_create', 'staff_id', 'create_at'),
+        Index('ix_invoice_order_id', 'order_id'),
+    )
+    
     # Relationships
     # order = relationship("Order", back_populates="invoices")
-    staff = relationship("Staff", back_populates="invoices")
\ No newline at end of file
+    staff = relationship("Staff", back_populates="invoices")
+
+class InvoiceDailyStat(Base):
+    """Số liệu hóa đơn cộng dồn theo ngày lập, nhân viên và phương thức thanh toán (crud/invoice_stats.py)"""
+    __tablename__ = 'InvoiceDailyStat'
+
+    stat_date = Column(Date, primary_key=True)
+    # 0: hóa đơn chưa gán nhân viên
+    staff_id = Column(Integer, primary_key=True, default=0)
+    # Chuỗi rỗng: chưa có phương thức thanh toán
+    payment_method = Column(Unicode(50), primary_key=True, default='')
+    invoice_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(BigInteger, nullable=False, default=0)
+    paid_count = Column(Integer, nullable=False, default=0)
+    paid_revenue = Column(BigInteger, nullable=False, default=0)
+
+    # Thống kê theo nhân viên trong khoảng ngày
+    __table_args__ = (
+        Index('ix_invoice_daily_stat_staff_date', 'staff_id', 'stat_date'),
+    )
\ No newline at end of file
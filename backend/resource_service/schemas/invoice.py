@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class InvoiceCreate(BaseModel):
     order_id: int = Field(..., description="ID of the order associated with the invoice")
@@ -52,4 +52,48 @@ class InvoiceResponse(BaseModel):
                 "payment_method": "credit_card",
                 "is_paid": True
             }
-        }
\ No newline at end of file
+        }
+
+class InvoiceStatBucket(BaseModel):
+    invoice_count: int = Field(..., description="Số hóa đơn")
+    revenue: int = Field(..., description="Tổng tiền các hóa đơn")
+    paid_count: int = Field(..., description="Số hóa đơn đã thanh toán")
+    paid_revenue: int = Field(..., description="Tổng tiền các hóa đơn đã thanh toán")
+    average_ticket: float = Field(..., description="Giá trị trung bình một hóa đơn")
+
+class InvoiceDailyStatItem(InvoiceStatBucket):
+    stat_date: date
+
+class InvoiceStaffStatItem(InvoiceStatBucket):
+    staff_id: int = Field(..., description="ID nhân viên, 0 nếu hóa đơn chưa gán nhân viên")
+
+class InvoicePaymentMethodStatItem(InvoiceStatBucket):
+    payment_method: str = Field(..., description="Phương thức thanh toán, rỗng nếu chưa có")
+
+class InvoiceStatsResponse(BaseModel):
+    start_date: date
+    end_date: date
+    staff_id: Optional[int] = None
+    totals: InvoiceStatBucket
+    by_day: List[InvoiceDailyStatItem]
+    by_staff: List[InvoiceStaffStatItem]
+    by_payment_method: List[InvoicePaymentMethodStatItem]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "start_date": "2025-05-01",
+                "end_date": "2025-05-31",
+                "staff_id": None,
+                "totals": {"invoice_count": 120, "revenue": 36000000, "paid_count": 118, "paid_revenue": 35400000, "average_ticket": 300000.0},
+                "by_day": [{"stat_date": "2025-05-01", "invoice_count": 4, "revenue": 1200000, "paid_count": 4, "paid_revenue": 1200000, "average_ticket": 300000.0}],
+                "by_staff": [{"staff_id": 3, "invoice_count": 60, "revenue": 18000000, "paid_count": 59, "paid_revenue": 17700000, "average_ticket": 300000.0}],
+                "by_payment_method": [{"payment_method": "cash", "invoice_count": 80, "revenue": 24000000, "paid_count": 80, "paid_revenue": 24000000, "average_ticket": 300000.0}]
+            }
+        }
+
+class InvoiceStatsRebuildResponse(BaseModel):
+    start_date: date
+    end_date: date
+    days: int = Field(..., description="Số ngày đã tính lại")
+    rows: int = Field(..., description="Số ô thống kê (ngày, nhân viên, phương thức) đã ghi")
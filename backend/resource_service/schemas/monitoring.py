@@ -0,0 +1,102 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Union
+
+class PoolStatusResponse(BaseModel):
+    """Schema trả về trạng thái pool kết nối cơ sở dữ liệu"""
+    settings: Dict[str, Union[int, bool]] = Field(..., description="Cấu hình pool đang dùng")
+    size: int = Field(..., description="Số kết nối cố định của pool")
+    checked_in: int = Field(..., description="Số kết nối đang rảnh trong pool")
+    checked_out: int = Field(..., description="Số kết nối đang được sử dụng")
+    overflow: int = Field(..., description="Số kết nối vượt mức pool_size")
+    capacity: int = Field(..., description="Số kết nối tối đa (pool_size + max_overflow)")
+    saturation: float = Field(..., description="Tỉ lệ checked_out / capacity")
+    metrics: dict = Field(..., description="Thống kê thời gian chờ lấy kết nối")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "settings": {"pool_size": 10, "max_overflow": 20, "pool_timeout": 30, "pool_recycle": 1800, "pool_pre_ping": True},
+                "size": 10,
+                "checked_in": 7,
+                "checked_out": 3,
+                "overflow": -7,
+                "capacity": 30,
+                "saturation": 0.1,
+                "metrics": {"checkouts": 1520, "timeouts": 0, "wait_avg_ms": 0.21, "wait_max_ms": 12.4}
+            }
+        }
+
+
+class CacheStatsResponse(BaseModel):
+    """Schema trả về số liệu của một cache trong bộ nhớ"""
+    name: str = Field(..., description="Tên cache")
+    ttl_seconds: float = Field(..., description="Thời gian sống của mỗi phần tử (giây)")
+    maxsize: int = Field(..., description="Số phần tử tối đa")
+    size: int = Field(..., description="Số phần tử hiện có")
+    hits: int = Field(..., description="Số lần đọc trúng cache")
+    misses: int = Field(..., description="Số lần đọc không có trong cache hoặc đã hết hạn")
+    hit_ratio: float = Field(..., description="Tỉ lệ hits / (hits + misses)")
+    evictions: int = Field(..., description="Số phần tử bị loại do vượt maxsize")
+    invalidations: int = Field(..., description="Số phần tử bị xóa do dữ liệu thay đổi")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "name": "price",
+                "ttl_seconds": 300,
+                "maxsize": 10000,
+                "size": 412,
+                "hits": 9520,
+                "misses": 480,
+                "hit_ratio": 0.952,
+                "evictions": 0,
+                "invalidations": 12
+            }
+        }
+
+
+class SlowQueryStats(BaseModel):
+    """Schema số liệu của một fingerprint truy vấn chậm"""
+    fingerprint: str = Field(..., description="Câu SQL đã thay giá trị cụ thể bằng ?")
+    example: str = Field(..., description="Câu SQL đầu tiên ghi nhận được của fingerprint")
+    count: int = Field(..., description="Số lần vượt ngưỡng")
+    total_ms: float = Field(..., description="Tổng thời gian (ms)")
+    avg_ms: float = Field(..., description="Thời gian trung bình (ms)")
+    max_ms: float = Field(..., description="Thời gian lớn nhất (ms)")
+    p50_ms: float = Field(..., description="Phân vị 50 (ms)")
+    p95_ms: float = Field(..., description="Phân vị 95 (ms)")
+    p99_ms: float = Field(..., description="Phân vị 99 (ms)")
+    sources: Dict[str, int] = Field(..., description="Hàm crud đã gọi và số lần")
+    endpoints: Dict[str, int] = Field(..., description="Endpoint đã gọi và số lần")
+    first_seen: float = Field(..., description="Thời điểm ghi nhận đầu tiên (unix time)")
+    last_seen: float = Field(..., description="Thời điểm ghi nhận gần nhất (unix time)")
+
+
+class SlowQueryReportResponse(BaseModel):
+    """Schema trả về danh sách truy vấn chậm"""
+    threshold_ms: float = Field(..., description="Ngưỡng đang dùng (ms)")
+    dropped: int = Field(..., description="Số fingerprint đã bị loại do vượt giới hạn")
+    queries: List[SlowQueryStats]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "threshold_ms": 200,
+                "dropped": 0,
+                "queries": [{
+                    "fingerprint": "SELECT ... FROM `Order` WHERE `Order`.status IN (...) ORDER BY `Order`.created_at DESC LIMIT ? OFFSET ?",
+                    "example": "SELECT ... FROM `Order` WHERE `Order`.status IN (%s, %s) ORDER BY `Order`.created_at DESC LIMIT %s OFFSET %s",
+                    "count": 42,
+                    "total_ms": 12650.4,
+                    "avg_ms": 301.2,
+                    "max_ms": 880.1,
+                    "p50_ms": 270.5,
+                    "p95_ms": 640.2,
+                    "p99_ms": 870.3,
+                    "sources": {"crud.order.get_orders_with_filters": 42},
+                    "endpoints": {"GET /orders": 42},
+                    "first_seen": 1718000000.0,
+                    "last_seen": 1718003600.0
+                }]
+            }
+        }
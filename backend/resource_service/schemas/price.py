@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+from schemas.service_moto_type import ServiceMotoTypeResponse
+from schemas.part_moto_type import PartMotoTypeResponse
+
+class MotoTypePricesResponse(BaseModel):
+    """Bảng giá dịch vụ và phụ tùng của một loại xe máy"""
+    moto_type_id: int = Field(..., description="ID loại xe máy")
+    services: List[ServiceMotoTypeResponse] = Field(default_factory=list, description="Giá các dịch vụ tìm thấy")
+    parts: List[PartMotoTypeResponse] = Field(default_factory=list, description="Giá các phụ tùng tìm thấy")
+    missing_service_ids: List[int] = Field(default_factory=list, description="ID dịch vụ chưa có giá cho loại xe này")
+    missing_part_ids: List[int] = Field(default_factory=list, description="ID phụ tùng chưa có giá cho loại xe này")
+
+    class Config:
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "moto_type_id": 1,
+                "services": [
+                    {"service_mototype_id": 1, "moto_type_id": 1, "service_id": 1, "price": 150000}
+                ],
+                "parts": [
+                    {"part_mototype_id": 4, "moto_type_id": 1, "part_id": 7, "price": 85000}
+                ],
+                "missing_service_ids": [],
+                "missing_part_ids": [9]
+            }
+        }
@@ -0,0 +1,66 @@
+"""
+Kiểm tra các bộ lọc thường dùng trong crud đi qua index (EXPLAIN QUERY PLAN của SQLite).
+Test sẽ hỏng nếu một truy vấn quét toàn bộ bảng đã có index cho bộ lọc đó.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from crud import invoice as invoice_crud
+
+START = datetime(2025, 1, 1)
+END = START + timedelta(days=7)
+
+
+async def _query_plans(engine, fn):
+    """Chạy fn(db) và trả về chi tiết plan của mọi câu SELECT mà nó phát ra"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as db:
+            await fn(db)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    details = []
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            details.extend(row[-1] for row in result.all())
+    return details
+
+
+def _assert_no_full_scan(details, table):
+    on_table = [detail for detail in details if detail.split(" ")[1:2] == [table]]
+    assert on_table, f"Không có truy vấn nào trên bảng {table}: {details}"
+    full_scans = [detail for detail in on_table if detail.startswith("SCAN ")]
+    assert not full_scans, f"Quét toàn bảng {table}: {full_scans}"
+
+
+@pytest.mark.parametrize("table, fn", [
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoices_by_date_range(db, START, END),
+                 id="invoice-date-range"),
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoice_with_filter(db, start_date=START, end_date=END),
+                 id="invoice-filter-date"),
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoice_with_filter(
+        db, staff_id=1, start_date=START, end_date=END), id="invoice-filter-staff-date"),
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoices_by_staff(db, staff_id=1),
+                 id="invoice-by-staff"),
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoices_by_order(db, order_id=1),
+                 id="invoice-by-order"),
+    pytest.param("Invoice", lambda db: invoice_crud.get_invoice_by_order_id(db, order_id=1),
+                 id="invoice-by-order-id"),
+])
+def test_hot_filters_use_index(run_db, table, fn):
+    async def check(engine):
+        if engine.dialect.name != "sqlite":
+            pytest.skip("EXPLAIN QUERY PLAN chỉ có trên SQLite")
+        _assert_no_full_scan(await _query_plans(engine, fn), table)
+    run_db(check)
@@ -0,0 +1,116 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bảng giá thay đổi vài lần mỗi ngày, các thay đổi trong process được xóa cache ngay.
+# TTL chỉ giới hạn độ trễ khi chạy nhiều worker (worker khác không biết để xóa).
+DEFAULT_PRICE_CACHE_TTL = 300
+DEFAULT_PRICE_CACHE_MAXSIZE = 10000
+
+_MISSING = object()
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning(f"Giá trị không hợp lệ cho {name}: {raw}, dùng mặc định {default}")
+        return default
+
+
+class TTLCache:
+    """Cache trong bộ nhớ có thời gian sống và giới hạn số phần tử (loại bỏ theo LRU)."""
+
+    def __init__(self, name: str, ttl: float, maxsize: int):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.maxsize > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] <= now:
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "name": self.name,
+                "ttl_seconds": self.ttl,
+                "maxsize": self.maxsize,
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Cache giá dịch vụ/phụ tùng theo loại xe, khóa là ("service" | "part", id, moto_type_id)
+price_cache = TTLCache(
+    "price",
+    ttl=_env_int("PRICE_CACHE_TTL", DEFAULT_PRICE_CACHE_TTL),
+    maxsize=_env_int("PRICE_CACHE_MAXSIZE", DEFAULT_PRICE_CACHE_MAXSIZE),
+)
+
+
+def service_price_key(service_id: int, moto_type_id: int) -> tuple:
+    return ("service", service_id, moto_type_id)
+
+
+def part_price_key(part_id: int, moto_type_id: int) -> tuple:
+    return ("part", part_id, moto_type_id)
+
+
+def get_cache_stats() -> list:
+    """Số liệu của các cache trong service."""
+    return [price_cache.stats()]
+
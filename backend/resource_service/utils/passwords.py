@@ -0,0 +1,102 @@
+import asyncio
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+from fastapi import HTTPException, status
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Độ khó bcrypt cho mật khẩu mới; đổi giá trị này thì mật khẩu cũ được băm lại ở lần đăng nhập kế tiếp
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Số luồng băm song song; số yêu cầu tối đa đang băm hoặc chờ trong thread pool, vượt quá thì trả 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8)))
+
+# bcrypt chỉ dùng 72 byte đầu của mật khẩu
+BCRYPT_MAX_BYTES = 72
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+
+# bcrypt nhả GIL khi tính, nên chạy trong luồng riêng không chặn event loop
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+# Số yêu cầu đang băm hoặc chờ; chỉ đổi trong event loop nên không cần khóa
+_pending = 0
+
+
+def _secret(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def is_hashed(value: Optional[str]) -> bool:
+    """Giá trị đã là chuỗi băm bcrypt hay còn là mật khẩu dạng rõ (dữ liệu cũ)"""
+    return bool(value) and value.startswith(BCRYPT_PREFIXES)
+
+
+def needs_rehash(hashed: str) -> bool:
+    """Chuỗi băm được tạo với độ khó khác cấu hình hiện tại"""
+    try:
+        return int(hashed.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def hash_password_sync(password: str) -> str:
+    return bcrypt.hashpw(_secret(password), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("ascii")
+
+
+def verify_password_sync(password: str, hashed: str) -> bool:
+    if not is_hashed(hashed):
+        # Mật khẩu cũ lưu dạng rõ, so sánh thời gian hằng để không lộ qua thời gian phản hồi
+        return bool(hashed) and hmac.compare_digest(password.encode("utf-8"), hashed.encode("utf-8"))
+    try:
+        return bcrypt.checkpw(_secret(password), hashed.encode("ascii"))
+    except ValueError:
+        logger.warning("Chuỗi băm mật khẩu không hợp lệ")
+        return False
+
+
+def _verify_and_update_sync(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    if not verify_password_sync(password, hashed):
+        return False, None
+    if not is_hashed(hashed) or needs_rehash(hashed):
+        return True, hash_password_sync(password)
+    return True, None
+
+
+async def _run(func, *args):
+    global _pending
+    # Hàng đợi đầy thì từ chối ngay: một đợt đăng nhập dồn dập không tạo hàng chờ không giới hạn
+    if _pending >= PASSWORD_HASH_MAX_PENDING:
+        logger.warning(f"Hàng đợi băm mật khẩu đầy ({_pending} yêu cầu), từ chối yêu cầu mới")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Hệ thống đang bận, vui lòng thử lại sau"
+        )
+    _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """Băm mật khẩu trong thread pool"""
+    return await _run(hash_password_sync, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    """Kiểm tra mật khẩu trong thread pool"""
+    return await _run(verify_password_sync, password, hashed)
+
+
+async def verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Kiểm tra mật khẩu, trả về (hợp lệ, chuỗi băm mới).
+    Chuỗi băm mới khác None khi cần lưu lại: mật khẩu cũ dạng rõ hoặc độ khó đã thay đổi.
+    """
+    return await _run(_verify_and_update_sync, password, hashed)
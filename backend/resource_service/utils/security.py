@@ -1,30 +1,30 @@
-from passlib.context import CryptContext
+import os
+
 import jwt
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from .logger import get_logger
+from .auth import JWT_SECRET_KEY, JWT_ALGORITHM, decode_token
+from .passwords import hash_password_sync, verify_password_sync
 
 
 logger = get_logger(__name__)
 
-# Password context for hashing and verifying
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-# JWT settings
-SECRET_KEY = "Su@chuedXem_jffffgM&ar"  # Should be stored in environment variables
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# JWT settings (khóa ký đọc từ biến môi trường JWT_SECRET_KEY, xem utils/auth.py)
+SECRET_KEY = JWT_SECRET_KEY
+ALGORITHM = JWT_ALGORITHM
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password"""
-    return pwd_context.hash(password)
+    """Hash a password (đồng bộ, trong handler async hãy dùng utils.passwords.hash_password)"""
+    return hash_password_sync(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify a password against a hash (đồng bộ, trong handler async hãy dùng utils.passwords.verify_password)"""
+    return verify_password_sync(plain_password, hashed_password)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -33,16 +33,18 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         to_encode = data.copy()
         
         # Set expiration time
+        # PyJWT coi datetime không có múi giờ là UTC, nên phải dùng giờ UTC
+        now = datetime.now(timezone.utc)
         if expires_delta:
-            expire = datetime.now() + expires_delta
+            expire = now + expires_delta
         else:
-            expire = datetime.now() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
             
-        to_encode.update({"exp": expire})
+        to_encode.update({"exp": expire, "iat": now})
         
         # Create JWT token
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        logger.info(f"JWT token created: {encoded_jwt}")
+        logger.debug(f"JWT token created for sub={to_encode.get('sub')}")
         return encoded_jwt
     except Exception as e:
         logger.error(f"Error creating JWT token: {str(e)}")
@@ -51,8 +53,18 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
 
 def decode_access_token(token: str) -> Dict[str, Any]:
     """Decode a JWT token"""
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.PyJWTError:
-        return None
+    return decode_token(token)
+
+
+def create_staff_access_token(staff, expires_delta: Optional[timedelta] = None) -> str:
+    """Tạo token cho nhân viên, kèm vai trò và trạng thái để các service không phải truy vấn lại"""
+    return create_access_token(
+        data={
+            "sub": str(staff.staff_id),
+            "role": getattr(staff.role, "value", staff.role),
+            "status": getattr(staff.status, "value", staff.status),
+            "email": staff.email,
+            "fullname": staff.fullname,
+        },
+        expires_delta=expires_delta,
+    )
@@ -0,0 +1,211 @@
+"""
+Ghi nhận truy vấn chậm theo fingerprint (câu SQL đã bỏ giá trị cụ thể).
+
+Mỗi fingerprint giữ số lần, tổng/max thời gian và một mẫu ngẫu nhiên (reservoir) để tính p50/p95/p99,
+kèm hàm crud và endpoint đã gọi. Chỉ truy vấn vượt ngưỡng SLOW_QUERY_THRESHOLD_MS mới được ghi.
+"""
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+
+from utils.metrics import current_endpoint
+
+try:
+    import greenlet
+except ImportError:  # greenlet luôn có khi dùng SQLAlchemy async
+    greenlet = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+# Ngưỡng (ms) để coi là truy vấn chậm, đặt 0 để ghi mọi truy vấn, số âm để tắt
+SLOW_QUERY_THRESHOLD_MS = _env_int("SLOW_QUERY_THRESHOLD_MS", 200)
+# Số fingerprint tối đa được giữ, vượt quá thì bỏ fingerprint ít gặp nhất
+SLOW_QUERY_MAX_FINGERPRINTS = _env_int("SLOW_QUERY_MAX_FINGERPRINTS", 500)
+# Số mẫu thời gian giữ cho mỗi fingerprint để tính phân vị
+SLOW_QUERY_SAMPLE_SIZE = _env_int("SLOW_QUERY_SAMPLE_SIZE", 256)
+# Số ký tự tối đa của câu SQL mẫu trả về
+MAX_STATEMENT_LENGTH = 2000
+# Số nguồn gọi (hàm crud, endpoint) giữ cho mỗi fingerprint
+MAX_SOURCES = 10
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PLACEHOLDER = re.compile(r"%\([^)]*\)s|%s|:\w+|\?")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_ROWS = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Chuẩn hóa câu SQL: thay chuỗi, số và tham số bằng ?, gộp danh sách IN/VALUES,
+    để các lần gọi cùng một truy vấn với giá trị khác nhau cho cùng fingerprint.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _NUMBER_LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _VALUE_LIST.sub("(...)", sql)
+    sql = _VALUES_ROWS.sub(r"\1", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class _FingerprintStats:
+    __slots__ = ("statement", "count", "total", "max", "samples", "sources", "endpoints", "first_seen", "last_seen")
+
+    def __init__(self, statement: str, now: float):
+        self.statement = statement[:MAX_STATEMENT_LENGTH]
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples: List[float] = []
+        self.sources: Counter = Counter()
+        self.endpoints: Counter = Counter()
+        self.first_seen = now
+        self.last_seen = now
+
+
+class SlowQueryLog:
+    """Tổng hợp truy vấn chậm trong bộ nhớ theo fingerprint"""
+
+    def __init__(self, threshold_ms: int, max_fingerprints: int, sample_size: int):
+        self.threshold = threshold_ms / 1000
+        self.max_fingerprints = max_fingerprints
+        self.sample_size = sample_size
+        self._stats: Dict[str, _FingerprintStats] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold >= 0 and self.max_fingerprints > 0
+
+    def record(self, statement: str, elapsed: float, source: Optional[str], endpoint: Optional[str]) -> None:
+        key = fingerprint(statement)
+        now = time.time()
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    # Bỏ fingerprint ít gặp nhất để giữ bộ nhớ cố định
+                    victim = min(self._stats, key=lambda k: self._stats[k].count)
+                    del self._stats[victim]
+                    self.dropped += 1
+                stats = self._stats[key] = _FingerprintStats(statement, now)
+            stats.count += 1
+            stats.total += elapsed
+            stats.last_seen = now
+            if elapsed > stats.max:
+                stats.max = elapsed
+            # Reservoir sampling: mọi lần gọi có xác suất như nhau được giữ làm mẫu
+            if len(stats.samples) < self.sample_size:
+                stats.samples.append(elapsed)
+            else:
+                slot = random.randrange(stats.count)
+                if slot < self.sample_size:
+                    stats.samples[slot] = elapsed
+            if source and (source in stats.sources or len(stats.sources) < MAX_SOURCES):
+                stats.sources[source] += 1
+            if endpoint and (endpoint in stats.endpoints or len(stats.endpoints) < MAX_SOURCES):
+                stats.endpoints[endpoint] += 1
+
+    def report(self, limit: int = 50, order_by: str = "total") -> List[dict]:
+        """Danh sách fingerprint sắp theo total | count | max | p95"""
+        with self._lock:
+            items = [(key, stats, sorted(stats.samples)) for key, stats in self._stats.items()]
+            rows = []
+            for key, stats, samples in items:
+                rows.append({
+                    "fingerprint": key,
+                    "example": stats.statement,
+                    "count": stats.count,
+                    "total_ms": round(stats.total * 1000, 3),
+                    "avg_ms": round(stats.total / stats.count * 1000, 3) if stats.count else 0.0,
+                    "max_ms": round(stats.max * 1000, 3),
+                    "p50_ms": round(_percentile(samples, 0.50) * 1000, 3),
+                    "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+                    "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+                    "sources": dict(stats.sources.most_common()),
+                    "endpoints": dict(stats.endpoints.most_common()),
+                    "first_seen": stats.first_seen,
+                    "last_seen": stats.last_seen,
+                })
+        sort_key = {"total": "total_ms", "count": "count", "max": "max_ms", "p95": "p95_ms"}.get(order_by, "total_ms")
+        rows.sort(key=lambda row: row[sort_key], reverse=True)
+        return rows[:limit]
+
+    def reset(self) -> int:
+        with self._lock:
+            cleared = len(self._stats)
+            self._stats.clear()
+            self.dropped = 0
+            return cleared
+
+
+slow_query_log = SlowQueryLog(SLOW_QUERY_THRESHOLD_MS, SLOW_QUERY_MAX_FINGERPRINTS, SLOW_QUERY_SAMPLE_SIZE)
+
+
+def _find_caller(frame) -> Optional[str]:
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename.replace("\\", "/")
+        if "/crud/" in filename:
+            return f"{frame.f_globals.get('__name__', filename)}.{code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _caller() -> Optional[str]:
+    """
+    Hàm crud đã phát ra truy vấn. Với engine async, cursor chạy trong greenlet con,
+    các frame của coroutine nằm ở greenlet cha đang chờ nên phải tìm thêm ở đó.
+    """
+    source = _find_caller(sys._getframe(2))
+    if source is None and greenlet is not None:
+        parent = greenlet.getcurrent().parent
+        if parent is not None:
+            source = _find_caller(parent.gr_frame)
+    return source
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("slow_query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("slow_query_start_time")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if elapsed < slow_query_log.threshold:
+        return
+    slow_query_log.record(statement, elapsed, _caller(), current_endpoint())
+
+
+def install_slow_query_log(engine) -> None:
+    """Gắn hook ghi truy vấn chậm vào engine (AsyncEngine hoặc Engine)"""
+    if not slow_query_log.enabled:
+        return
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
@@ -1688,8 +1688,7 @@ const TechnicianDashboard = () => {
             if (currentOrder.rawStatus === 'wait_confirm') {
                 // await repairService.order.updateOrderStatus(currentOrder.orderId, 'repairing');
                 await repairService.order.updateOrder(currentOrder.orderId, {
-                    status: 'repairing',
-                    total_price: totalSelectedAmount
+                    status: 'repairing'
                 });
                 
                 // Update local state